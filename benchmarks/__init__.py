@@ -0,0 +1,27 @@
+"""Micro-benchmarks.
+
+Run a benchmark as a module from the project root, e.g.
+``python -m benchmarks.get_col``.
+"""
+import os
+from timeit import Timer
+
+
+def setup(migrate=False):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.app.settings")
+    os.environ.setdefault("DATABASE_VENDOR", "sqlite")
+    os.environ.setdefault("DATABASES", "sqlite=sqlite://:memory:")
+
+    import django
+
+    django.setup()
+    if migrate:
+        from django.core.management import call_command
+
+        call_command("migrate", verbosity=0)
+
+
+def report(name: str, func, number: int = 1000, repeat: int = 5):
+    best = min(Timer(func).repeat(repeat, number)) / number
+    print(f"{name:<40} {best * 1e6:>12.2f} us/op")
+    return best
@@ -0,0 +1,21 @@
+"""Compile time of list queries that select many virtual fields."""
+from . import report, setup
+
+
+def main():
+    setup()
+    from examples.example_01.models import Person, Post
+
+    def people():
+        return Person.objects.filter(first_name="abc").query.sql_with_params()
+
+    def posts():
+        qs = Post.objects.select_related("author").filter(title="abc")
+        return qs.query.sql_with_params()
+
+    report("Person list query", people)
+    report("Post list query + select_related", posts)
+
+
+if __name__ == "__main__":
+    main()
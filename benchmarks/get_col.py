@@ -0,0 +1,69 @@
+"""Compile time of queries that touch virtual fields with joins.
+
+Each case is reported for the current `get_col` and for the baseline one, which
+found the compiled query by walking the interpreter stack.
+"""
+import inspect
+from contextlib import contextmanager
+
+from . import report, setup
+
+
+def nested(depth: int, func):
+    return func() if depth <= 0 else nested(depth - 1, func)
+
+
+@contextmanager
+def baseline_get_col():
+    """Patch `VirtualField.get_col` with its `inspect.stack()` implementation."""
+    from django.db.models.sql.compiler import SQLCompiler
+    from django.db.models.sql.query import Query
+
+    from virtual_fields import VirtualField
+
+    def get_col(self, alias, output_field=None, *, query=None):
+        if not self.has_joins:
+            return self.cached_col
+
+        call = query = this = None
+        try:
+            call = (inspect.stack()[1:2] or (None,))[0]
+            if not (hasattr(call, "frame") and hasattr(call.frame, "f_locals")):
+                pass
+            elif (this := call.frame.f_locals.get("self")) is not None:
+                query = this.query if isinstance(this, SQLCompiler) else this
+                if isinstance(query, Query) and self.name not in query.annotations:
+                    return self.final_expression.resolve_expression(query)
+        finally:
+            del call, query, this
+
+        return self.cached_col
+
+    current = VirtualField.get_col
+    VirtualField.get_col = get_col
+    try:
+        yield
+    finally:
+        VirtualField.get_col = current
+
+
+def main():
+    setup()
+    from examples.example_01.models import Post
+
+    def compile():
+        qs = Post.objects.filter(authored_by="abc", author_dob__isnull=False)
+        return qs.query.sql_with_params()
+
+    cases = [
+        ("stack depth ~0", compile),
+        ("stack depth ~50", lambda: nested(50, compile)),
+    ]
+    for label, func in cases:
+        report(f"compile ({label})", func)
+        with baseline_get_col():
+            report(f"compile ({label}, baseline)", func, number=100)
+
+
+if __name__ == "__main__":
+    main()
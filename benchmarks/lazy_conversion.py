@@ -0,0 +1,37 @@
+"""Iterating rows with the `height` conversion deferred and done eagerly."""
+import random
+
+from . import report, setup
+
+
+def main(rows: int = 100_000):
+    setup(migrate=True)
+    from tests.app.models import LazyVirtualModel
+
+    rand = random.Random(0)
+    LazyVirtualModel.objects.bulk_create(
+        (
+            LazyVirtualModel(title=f"Title{i}", data={"height": rand.uniform(1.4, 2.1)})
+            for i in range(rows)
+        ),
+        batch_size=5000,
+    )
+    field = LazyVirtualModel._meta.get_field("height")
+
+    def iterate():
+        for obj in LazyVirtualModel.objects.all():
+            obj.title
+
+    def iterate_access():
+        for obj in LazyVirtualModel.objects.all():
+            obj.height
+
+    for lazy in (True, False):
+        field.lazy_conversion = lazy
+        label = "lazy" if lazy else "eager"
+        report(f"Rows x {rows}, {label}", iterate, number=1, repeat=3)
+        report(f"Rows x {rows}, {label}, height", iterate_access, number=1, repeat=3)
+
+
+if __name__ == "__main__":
+    main()
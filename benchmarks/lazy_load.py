@@ -0,0 +1,25 @@
+"""Single-row lazy loads of deferred virtual fields."""
+from . import report, setup
+
+
+def main():
+    setup(migrate=True)
+    from examples.example_01.models import Person, Post
+
+    [Person.create() for _ in range(5)]
+    post = Post.create()
+    field = Post._meta.get_field("authored_by")
+
+    def load():
+        return field.fetch_db_value(post)
+
+    def load_orm():
+        qs = field.get_queryset_for_object(post)
+        return qs.values_list(field.name, flat=True).get()
+
+    report("lazy load (ORM pipeline)", load_orm)
+    report("lazy load (precompiled)", load)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Person list query time with and without `QuerySet.share_virtual()`."""
+import datetime
+import random
+
+from . import report, setup
+
+
+def main(rows: int = 20_000):
+    setup(migrate=True)
+    from django.db import connection
+
+    from examples.example_01.models import Person
+
+    rand = random.Random(0)
+    Person.objects.bulk_create(
+        Person(
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            dob=datetime.date(1950 + i % 50, 1 + i % 12, 1 + i % 28),
+            data={"height": rand.uniform(1.4, 2.1), "weight": rand.randint(40, 120)},
+            country="Kenya",
+        )
+        for i in range(rows)
+    )
+
+    def execute(qs):
+        sql, params = qs.query.sql_with_params()
+
+        def run():
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+
+        return run
+
+    for name, qs in [
+        ("inlined", Person.objects.all()),
+        ("shared", Person.objects.share_virtual()),
+    ]:
+        for fields in [("pk", "bmi_cat"), ("pk", "bmi_cat", "bmi", "height", "weight")]:
+            vqs = qs.values_list(*fields)
+            label = f"{name}, {len(fields)} columns"
+            report(f"{label}, SQL", execute(vqs), number=1, repeat=5)
+            report(f"{label}, ORM", lambda q=vqs: [*q.all()], number=1, repeat=5)
+        report(f"{name}, models, ORM", lambda q=qs: [*q.all()], number=1, repeat=5)
+
+
+if __name__ == "__main__":
+    main()
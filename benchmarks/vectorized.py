@@ -0,0 +1,43 @@
+"""`bmi` over a Person export, computed by SQL and with NumPy arrays."""
+import datetime
+import random
+
+from . import report, setup
+
+
+def main(rows: int = 100_000):
+    setup(migrate=True)
+    from examples.example_01.models import Person
+
+    rand = random.Random(0)
+    Person.objects.bulk_create(
+        (
+            Person(
+                first_name=f"First{i}",
+                last_name=f"Last{i}",
+                dob=datetime.date(1950 + i % 50, 1 + i % 12, 1 + i % 28),
+                data={
+                    "height": rand.uniform(1.4, 2.1),
+                    "weight": rand.randint(40, 120),
+                },
+                country="Kenya",
+            )
+            for i in range(rows)
+        ),
+        batch_size=5000,
+    )
+    qs = Person.objects.all()
+    fields = ("bmi", "height", "weight")
+
+    def sql():
+        return [*qs.order_by("pk").values_list("pk", *fields)]
+
+    def vectorized():
+        return qs.evaluate_virtual_vectorized(*fields, chunk_size=20_000)
+
+    report(f"{', '.join(fields)} x {rows}, SQL", sql, number=1, repeat=3)
+    report(f"{', '.join(fields)} x {rows}, NumPy", vectorized, number=1, repeat=3)
+
+
+if __name__ == "__main__":
+    main()
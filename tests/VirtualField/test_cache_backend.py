@@ -0,0 +1,107 @@
+import copy
+
+import pytest as pyt
+from django.core.cache import cache
+from django.db import models as m
+
+from tests.app.models import CachedVirtualModel
+from virtual_fields import _cache
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+@pyt.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pyt.fixture
+def objs():
+    parents = [CachedVirtualModel.objects.create(title=f"p{i}") for i in range(3)]
+    for i, parent in enumerate(parents):
+        for _ in range(i + 1):
+            CachedVirtualModel.objects.create(title="c", parent=parent)
+    return parents
+
+
+def _field():
+    return CachedVirtualModel._meta.get_field("num_children")
+
+
+def test_read_through(objs, django_assert_num_queries):
+    obj, key = objs[1], _field().shared_cache.make_key(objs[1].pk)
+    with django_assert_num_queries(2):
+        assert CachedVirtualModel.objects.get(pk=obj.pk).num_children == 2
+    assert cache.get(key) == 2
+    assert key.startswith(f"virtual_fields:app.cachedvirtualmodel:{obj.pk}:")
+
+    with django_assert_num_queries(1):
+        assert CachedVirtualModel.objects.get(pk=obj.pk).num_children == 2
+
+
+def test_batched_over_queryset(objs, django_assert_num_queries):
+    qs = CachedVirtualModel.objects.filter(parent=None).order_by("pk")
+    items = [*qs]
+    with django_assert_num_queries(1):
+        assert [o.num_children for o in items] == [1, 2, 3]
+
+    items = [*qs]
+    with django_assert_num_queries(0):
+        assert [o.num_children for o in items] == [1, 2, 3]
+
+
+def test_invalidated_on_refresh(objs):
+    obj = CachedVirtualModel.objects.get(pk=objs[0].pk)
+    assert obj.num_children == 1
+    CachedVirtualModel.objects.create(title="c", parent=obj)
+    assert CachedVirtualModel.objects.get(pk=obj.pk).num_children == 1
+
+    obj.refresh_from_db()
+    assert obj.num_children == 2
+    CachedVirtualModel.objects.create(title="c", parent=obj)
+    obj.title = "changed"
+    obj.save()
+    # The count does not depend on the columns written by the save.
+    assert CachedVirtualModel.objects.get(pk=obj.pk).num_children == 2
+    obj.refresh_from_db()
+    assert obj.num_children == 3
+
+
+def test_stampede(objs, monkeypatch):
+    shared, obj = _field().shared_cache, objs[2]
+    lock = f"{shared.make_key(obj.pk)}:lock"
+
+    def sleep(delay):
+        cache.set(shared.make_key(obj.pk), 42)
+
+    cache.add(lock, 1)
+    monkeypatch.setattr(_cache.time, "sleep", sleep)
+    assert CachedVirtualModel.objects.get(pk=obj.pk).num_children == 42
+
+    cache.delete(shared.make_key(obj.pk))
+    monkeypatch.setattr(_cache.time, "sleep", lambda delay: None)
+    monkeypatch.setattr(_cache._SharedCache, "lock_wait", 0)
+    assert CachedVirtualModel.objects.get(pk=obj.pk).num_children == 3
+    assert cache.get(shared.make_key(obj.pk)) is None
+
+
+def test_expression_change_resets_version():
+    field = copy.copy(_field())
+    shared = field.shared_cache
+    field.set_source_expressions(m.Count("children", distinct=True))
+    assert field.shared_cache is not shared
+    assert field.shared_cache.version != shared.version
+
+
+def test_cache_backend_checks():
+    assert _field().check() == []
+    field = copy.copy(_field())
+    field.cache_backend = "missing"
+    assert [e.id for e in field.check()] == ["virtual_fields.E003"]
+    field = copy.copy(_field())
+    field.cache = False
+    assert [e.id for e in field.check()] == ["virtual_fields.E003"]
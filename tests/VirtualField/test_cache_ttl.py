@@ -0,0 +1,80 @@
+import copy
+
+import pytest as pyt
+
+from tests.app.models import CachedVirtualModel
+from virtual_fields import _cache, fields
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+class Clock:
+    now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pyt.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fields, "monotonic", clock)
+    monkeypatch.setattr(_cache.time, "monotonic", clock)
+    return clock
+
+
+@pyt.fixture
+def objs():
+    for title in ("a", "bb", "ccc"):
+        CachedVirtualModel.objects.create(title=title)
+    return [*CachedVirtualModel.objects.order_by("pk")]
+
+
+def test_cache_ttl(objs, clock, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert [o.title_length for o in objs] == [1, 2, 3]
+
+    CachedVirtualModel.objects.update(title="dddd")
+    clock.now += 59
+    with django_assert_num_queries(0):
+        assert [o.title_length for o in objs] == [1, 2, 3]
+
+    clock.now += 1
+    with django_assert_num_queries(1):
+        assert [o.title_length for o in objs] == [4, 4, 4]
+    with django_assert_num_queries(0):
+        assert objs[0].title_length == 4
+
+
+@pyt.mark.django_db(transaction=True)
+def test_stale_while_revalidate(
+    objs, clock, monkeypatch: pyt.MonkeyPatch, django_assert_num_queries
+):
+    assert [o.title_upper for o in objs] == ["A", "BB", "CCC"]
+    monkeypatch.setattr(
+        _cache.connections, "close_all", lambda: pyt.fail("closed all connections")
+    )
+
+    CachedVirtualModel.objects.update(title="dddd")
+    clock.now += 60
+    with django_assert_num_queries(0):
+        assert objs[0].title_upper == "A"
+        assert objs[1].title_upper == "BB"
+
+    revalidator = type(objs[0]).title_upper.revalidator
+    revalidator.future.result()
+    # The thread leaves the instances alone, their next access takes the values.
+    assert [o.__dict__["title_upper"] for o in objs] == ["A", "BB", "CCC"]
+    with django_assert_num_queries(0):
+        assert [o.title_upper for o in objs] == ["DDDD"] * 3
+    assert not revalidator.results and not revalidator.waiting
+
+
+def test_cache_ttl_checks():
+    field = CachedVirtualModel._meta.get_field("title_length")
+    assert field.check() == []
+    field = copy.copy(field)
+    field.cache = False
+    assert [e.id for e in field.check()] == ["virtual_fields.E003"]
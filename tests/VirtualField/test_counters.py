@@ -0,0 +1,129 @@
+import copy
+from io import StringIO
+
+import pytest as pyt
+from django.core.management import call_command
+from django.db import connection
+from django.db import models as m
+
+from examples.example_01.models import Person, Post
+from tests.app.models import CounterTag, CounterVirtualModel
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+def _counts(obj):
+    names = "num_children", "total_score", "num_tags"
+    return CounterVirtualModel.objects.values_list(*names).get(pk=obj.pk)
+
+
+def test_counter_reads_column():
+    qs = CounterVirtualModel.objects.filter(num_children__gt=0, has_children=True)
+    sql = str(qs.values("num_tags", "total_score").query)
+    assert "JOIN" not in sql and "COUNT(" not in sql and "SUM(" not in sql
+
+
+def test_counter_reverse_fk(django_assert_num_queries):
+    parent = CounterVirtualModel.objects.create(title="parent")
+    assert _counts(parent) == (0, 0, 0)
+
+    with django_assert_num_queries(3):
+        a = CounterVirtualModel.objects.create(title="a", parent=parent, score=3)
+    b = CounterVirtualModel.objects.create(title="b", parent=parent, score=4)
+    assert _counts(parent) == (2, 7, 0)
+
+    b.score = 10
+    b.save()
+    assert _counts(parent) == (2, 13, 0)
+
+    b = CounterVirtualModel.objects.get(pk=b.pk)
+    b.parent = None
+    b.save()
+    a.delete()
+    assert _counts(parent) == (0, 0, 0)
+    assert CounterVirtualModel.objects.get(pk=parent.pk).has_children is False
+
+
+def test_counter_m2m():
+    obj = CounterVirtualModel.objects.create(title="obj")
+    x, y, z = (CounterTag.objects.create(name=n) for n in "xyz")
+
+    obj.tags.add(x, y)
+    z.items.add(obj)
+    obj.tags.add(x)
+    assert _counts(obj) == (0, 0, 3)
+    assert {*CounterTag.objects.values_list("num_items", flat=True)} == {1}
+
+    obj.tags.remove(y)
+    z.delete()
+    assert _counts(obj) == (0, 0, 1)
+    x.items.clear()
+    assert _counts(obj) == (0, 0, 0)
+
+    obj.tags.add(x, y)
+    obj.tags.clear()
+    assert {*CounterTag.objects.values_list("num_items", flat=True)} == {0}
+
+
+def test_counter_bulk_create():
+    obj = CounterVirtualModel.objects.create(title="obj")
+    children = CounterVirtualModel.objects.bulk_create(
+        [CounterVirtualModel(title=f"{i}", parent=obj, score=i) for i in range(5)]
+    )
+    assert _counts(obj) == (5, 10, 0)
+
+    children[0].score = 7
+    children[0].save()
+    assert _counts(obj) == (5, 17, 0)
+    CounterVirtualModel.objects.filter(parent=obj).delete()
+    assert _counts(obj) == (0, 0, 0)
+
+
+def test_counter_queryset_update(monkeypatch):
+    a, b = (CounterVirtualModel.objects.create(title=n) for n in "ab")
+    CounterVirtualModel.objects.bulk_create(
+        [CounterVirtualModel(title=f"{i}", parent=a, score=i) for i in range(5)]
+    )
+    qs = CounterVirtualModel.objects.filter(parent=a)
+    qs.filter(score__gte=3).update(score=m.F("score") + 10)
+    assert _counts(a) == (5, 30, 0)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(connection.features, "max_query_params", 2)
+        qs.filter(score__lt=10).update(parent=b)
+    assert (_counts(a), _counts(b)) == ((2, 27, 0), (3, 3, 0))
+
+    children = [*CounterVirtualModel.objects.filter(parent=b)]
+    for child in children:
+        child.parent = a
+    CounterVirtualModel.objects.bulk_update(children[:1], ["parent"])
+    assert (_counts(a), _counts(b)) == ((3, 27, 0), (2, 3, 0))
+
+    CounterVirtualModel.objects.exclude(parent=None).delete()
+    assert (_counts(a), _counts(b)) == ((0, 0, 0), (0, 0, 0))
+
+
+def test_counter_repair():
+    obj = CounterVirtualModel.objects.create(title="obj")
+    CounterVirtualModel.objects.bulk_create(
+        [CounterVirtualModel(title=f"{i}", parent=obj, score=i) for i in range(5)]
+    )
+    CounterVirtualModel.objects.update(num_children=None, total_score=None)
+    assert _counts(obj) == (0, 0, 0)
+
+    out = StringIO()
+    call_command("virtualfields_repair_counters", "app", chunk_size=2, stdout=out)
+    assert _counts(obj) == (5, 10, 0)
+    assert "app.CounterVirtualModel: 2 rows" in out.getvalue()
+
+
+def test_counter_checks():
+    field = copy.copy(Post._meta.get_field("num_likes"))
+    field.materialize = "counter"
+    assert field.check() == []
+    for model, name in [(Person, "age"), (Post, "authored_by")]:
+        field = copy.copy(model._meta.get_field(name))
+        field.materialize = "counter"
+        assert [e.id for e in field.check()] == ["virtual_fields.E001"]
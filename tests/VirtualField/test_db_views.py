@@ -0,0 +1,62 @@
+from io import StringIO
+
+import pytest as pyt
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db import models as m
+
+from examples.example_01.models import Person, Post
+from virtual_fields.db_views import get_view_name, view_model
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+def _call(*args, **kwargs):
+    out = StringIO()
+    call_command(*args, stdout=out, **kwargs)
+    return out.getvalue()
+
+
+def test_create_view():
+    [Person.create() for _ in range(4)]
+    [Post.create() for _ in range(4)]
+    out = _call("virtualfields_createview", "example_01.Person", "example_01.Post")
+    assert get_view_name(Person) in out and get_view_name(Post) in out
+    _call("virtualfields_createview", "example_01.Person", replace=True)
+
+    names = [
+        name
+        for name, field in Person._meta.virtual_fields.items()
+        if not isinstance(field.output_field, m.DecimalField)
+    ]
+    qs = Person.objects.order_by("pk").values_list("pk", *names)
+    view = view_model(Person)
+    assert view._meta.managed is False
+    assert [*view.objects.order_by("pk").values_list("pk", *names)] == [*qs]
+
+    view = view_model(Post)
+    for post in Post.objects.all():
+        row = view.objects.get(pk=post.pk)
+        assert (row.author_id, row.authored_by) == (post.author_id, post.authored_by)
+        assert row.num_comments == post.children.count()
+
+
+def test_view_aggregates_not_multiplied():
+    people = [Person.create() for _ in range(3)]
+    post = Post.create(type="article", author=people[0])
+    post.likes.set(people[:2])
+    for _ in range(3):
+        Post.create(type="comment", author=people[2], parent=post)
+    _call("virtualfields_createview", "example_01.Post", replace=True)
+
+    row = view_model(Post).objects.get(pk=post.pk)
+    assert (row.num_likes, row.num_comments) == (2, 3)
+
+
+@pyt.mark.skipif(connection.vendor == "postgresql", reason="not postgresql")
+def test_materialized_view_unsupported():
+    with pyt.raises(CommandError, match="not supported"):
+        _call("virtualfields_createview", "example_01.Person", materialized=True)
+    assert "Person" in _call("virtualfields_refreshview", "example_01")
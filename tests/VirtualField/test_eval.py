@@ -0,0 +1,213 @@
+import datetime
+from decimal import Decimal
+
+import pytest as pyt
+from django.db import connection
+from django.db import models as m
+from django.db.models.expressions import Case, ExpressionWrapper, F, Value, When
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast, Coalesce, Concat, Extract, Now
+
+from examples.example_01.models import Person, Post
+from virtual_fields._eval import _Fallback, compile_expression
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+ROWS = [
+    ("Ada", "Lovelace", datetime.date(1815, 12, 10), {"city": "London", "w": 55}),
+    ("Alan", "", datetime.date(1912, 6, 23), {"city": None, "w": 70, "h": 1.78}),
+    ("Grace", "Hopper", datetime.date(1906, 12, 9), {"w": "80", "tags": ["a", "b"]}),
+    ("Linus", "T", datetime.date(2000, 1, 2), {"w": -7, "h": 2, "n": {"x": 1}}),
+]
+
+EXPRESSIONS = {
+    "f": (F("first_name"), m.CharField()),
+    "value": (Value(3), m.IntegerField()),
+    "concat": (Concat("first_name", Value(" "), "last_name"), m.CharField()),
+    "concat-null": (Concat("first_name", KT("data__city")), m.CharField()),
+    "coalesce": (Coalesce(KT("data__city"), "last_name"), m.CharField()),
+    "add": (F("id") + 10, m.IntegerField()),
+    "sub-mul": ((F("id") - 7) * 3, m.IntegerField()),
+    "div": (F("data__w") / 3, m.IntegerField()),
+    "div-neg": (Value(-7) / F("id"), m.IntegerField()),
+    "mod": (Value(-7) % (F("id") + 1), m.IntegerField()),
+    "float-div": (KT("data__h") / 2, m.FloatField()),
+    "year": (F("dob__year"), m.IntegerField()),
+    "extract-month": (Extract("dob", "month"), m.IntegerField()),
+    "extract-quarter": (Extract("dob", "quarter"), m.IntegerField()),
+    "extract-week": (Extract("dob", "week"), m.IntegerField()),
+    "extract-week-day": (Extract("dob", "week_day"), m.IntegerField()),
+    "extract-iso-week-day": (Extract("dob", "iso_week_day"), m.IntegerField()),
+    "extract-iso-year": (Extract("dob", "iso_year"), m.IntegerField()),
+    "kt": (KT("data__city"), m.CharField()),
+    "kt-nested": (KT("data__n__x"), m.IntegerField()),
+    "kt-index": (KT("data__tags__1"), m.CharField()),
+    "case": (
+        Case(
+            When(dob__year__lt=1900, then=Value("old")),
+            When(m.Q(last_name="") | m.Q(id__in=[4]), then=Value("short")),
+            default=Value("other"),
+        ),
+        m.CharField(),
+    ),
+    "case-null": (
+        Case(When(~m.Q(data__city="London"), then=Value(1)), default=Value(0)),
+        m.IntegerField(),
+    ),
+    "case-isnull": (
+        Case(When(data__h__isnull=True, then="id"), default=Value(0)),
+        m.IntegerField(),
+    ),
+    "cast-char": (Cast("id", m.CharField()), None),
+    "cast-int": (Cast(KT("data__w"), m.IntegerField()), None),
+    "cast-float": (Cast("id", m.FloatField()), None),
+    "cast-decimal": (
+        Cast(KT("data__h"), m.DecimalField(max_digits=8, decimal_places=2)),
+        None,
+    ),
+}
+
+
+CONDITIONS = {
+    "exact-none": m.Q(parent=None),
+    "exact-none-negated": ~m.Q(parent=None),
+    "negated-nullable": ~m.Q(published_at__year=2020),
+    "negated-nullable-gt": ~m.Q(parent_id__gt=0),
+    "negated-nullable-rhs": ~m.Q(created_at=F("published_at")),
+    "double-negated": ~(m.Q(title="root") | ~m.Q(published_at__year=2020)),
+    "negated-or": ~m.Q(m.Q(parent_id__gt=0) | m.Q(published_at__year=2021)),
+}
+
+
+@pyt.fixture
+def people():
+    for first_name, last_name, dob, data in ROWS:
+        Person.objects.create(
+            first_name=first_name, last_name=last_name, dob=dob, data=data
+        )
+    return [*Person.objects.order_by("pk")]
+
+
+@pyt.mark.parametrize("key", EXPRESSIONS)
+def test_sqlite_parity(people, key):
+    expr, output_field = EXPRESSIONS[key]
+    annotation = expr if output_field is None else ExpressionWrapper(expr, output_field)
+    qs = Person.objects.order_by("pk").annotate(v=annotation)
+    expected = [*qs.values_list("v", flat=True)]
+
+    evaluate = compile_expression(Person, expr, output_field)
+    assert evaluate is not None
+    values = []
+    for obj in people:
+        try:
+            values.append(evaluate(obj))
+        except _Fallback:
+            values.append(_Fallback)
+    # Values without an exact local equivalent are left to the database.
+    assert values.count(_Fallback) <= 1
+    pairs = [(v, e) for v, e in zip(values, expected) if v is not _Fallback]
+    assert [v for v, _ in pairs] == [e for _, e in pairs]
+    assert [type(v) for v, _ in pairs] == [type(e) for _, e in pairs]
+
+
+@pyt.fixture
+def posts(people):
+    kw = {"content": "", "author": people[0]}
+    root = Post.objects.create(title="root", type="article", published_at=None, **kw)
+    Post.objects.create(title="reply", type="comment", parent=root, **kw)
+    published_at = datetime.datetime(2020, 6, 1)
+    Post.objects.create(title="other", type="article", published_at=published_at, **kw)
+    return [*Post.objects.order_by("pk")]
+
+
+@pyt.mark.parametrize("key", CONDITIONS)
+def test_condition_parity(posts, key):
+    expr = Case(When(CONDITIONS[key], then=Value(1)), default=Value(0))
+    qs = Post.objects.order_by("pk").annotate(v=expr)
+    evaluate = compile_expression(Post, expr, m.IntegerField())
+    assert [evaluate(obj) for obj in posts] == [*qs.values_list("v", flat=True)]
+
+
+@pyt.mark.parametrize(
+    "condition",
+    [
+        m.Q(data__has_key="city"),
+        m.Q(data__has_any_keys=["city", "h"]),
+        m.Q(data__city__icontains="lon"),
+        m.Q(data__city=None),
+        m.Q(first_name__icontains="a"),
+        m.Q(first_name__startswith="A"),
+    ],
+)
+def test_unsupported_lookups(people, condition):
+    # Left to the database, which still matches some rows.
+    expr = Case(When(condition, then=Value(1)), default=Value(0))
+    assert compile_expression(Person, expr, m.IntegerField()) is None
+    assert Person.objects.annotate(v=expr).filter(v=1).exists()
+
+
+def test_string_collations(people, monkeypatch: pyt.MonkeyPatch):
+    equal = Case(When(first_name="Ada", then=Value(1)), default=Value(0))
+    less = Case(When(first_name__lt="B", then=Value(1)), default=Value(0))
+    evaluate_equal = compile_expression(Person, equal, m.IntegerField())
+    evaluate_less = compile_expression(Person, less, m.IntegerField())
+    assert [evaluate_equal(o) for o in people] == [1, 0, 0, 0]
+    assert [evaluate_less(o) for o in people] == [1, 1, 0, 0]
+
+    # PostgreSQL orders strings by collation, MySQL also ignores case in `=`.
+    monkeypatch.setattr(connection, "vendor", "postgresql")
+    assert evaluate_equal(people[0]) == 1
+    with pyt.raises(_Fallback):
+        evaluate_less(people[0])
+    monkeypatch.setattr(connection, "vendor", "mysql")
+    with pyt.raises(_Fallback):
+        evaluate_equal(people[0])
+
+
+def test_cast_decimal_rounds(people):
+    # SQLite does not round the casts, other backends do.
+    field = m.DecimalField(max_digits=8, decimal_places=1)
+    evaluate = compile_expression(Person, Cast(KT("data__h"), field))
+    assert str(evaluate(people[1])) == "1.8"
+
+
+def test_unsupported():
+    assert compile_expression(Person, Extract(Now(), "year")) is None
+    assert compile_expression(Person, m.Count("id")) is None
+    assert compile_expression(Person, F("missing")) is None
+
+
+def test_descriptor(people, django_assert_num_queries):
+    obj = Person.objects.get(pk=people[0].pk)
+    with django_assert_num_queries(0):
+        assert obj.city == "London"
+        assert obj.height is None
+
+    obj = Person(first_name="A", last_name="B", data={"city": "Paris", "height": 1.5})
+    assert (obj.full_name, obj.city, obj.height) == ("A B", "Paris", Decimal("1.50"))
+
+
+def test_descriptor_loaded_row(people, django_assert_num_queries):
+    obj = Person.objects.defer("full_name").get(pk=people[0].pk)
+    Person.objects.filter(pk=obj.pk).update(last_name="King")
+    with django_assert_num_queries(1):
+        assert obj.full_name == "Ada King"
+
+    del obj.full_name
+    obj.first_name = "Augusta"
+    with django_assert_num_queries(0):
+        assert obj.full_name == "Augusta Lovelace"
+
+
+def test_descriptor_fallback(people, django_assert_num_queries):
+    obj = Person.objects.only("pk").get(pk=people[0].pk)
+    with django_assert_num_queries(1):
+        assert obj.city == "London"
+
+    # Lists have no SQL text equivalent, the value is queried.
+    obj = Person.objects.get(pk=people[2].pk)
+    obj.data["city"] = ["a"]
+    with django_assert_num_queries(1):
+        assert obj.city is None
@@ -0,0 +1,58 @@
+import copy
+
+import pytest as pyt
+from django.db import connection
+from django.db import models as m
+from django.db.models.functions import Concat
+
+from examples.example_01.models import Person, Post
+from tests.app.models import IndexedVirtualModel
+from virtual_fields._util import _inline_params, _SqlMemo
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+def test_indexes_created():
+    table = IndexedVirtualModel._meta.db_table
+    with connection.cursor() as cursor:
+        indexes = connection.introspection.get_constraints(cursor, table)
+
+    names = {index.name for index in IndexedVirtualModel._meta.indexes}
+    assert names == {"app_indexed_age_idx", "app_indexed_full_na_cfef95_idx"}
+    assert names <= {*indexes}
+
+
+@pyt.mark.skipif(connection.vendor != "sqlite", reason="sqlite query plans")
+def test_indexes_used():
+    objs = IndexedVirtualModel.objects
+    obj = objs.create(first_name="John", last_name="Doe")
+    for qs in [
+        objs.filter(full_name="John Doe"),
+        objs.filter(age=2000),
+        objs.order_by("-age", "last_name"),
+    ]:
+        assert "USING INDEX" in qs.explain()
+    assert [*objs.filter(full_name="John Doe")] == [obj]
+    assert [*objs.filter(full_name__startswith="J%")] == []
+
+
+def test_inline_params_percent():
+    sql, params = _inline_params(connection, "%s || (1 %% 2) || %s", ["50%", "%s"])
+    assert (sql, params) == ("'50%%' || (1 %% 2) || '%%s'", [])
+    assert sql % () == "'50%' || (1 % 2) || '%s'"
+
+    IndexedVirtualModel.objects.create(first_name="John", last_name="Doe")
+    expr = Concat("last_name", m.Value(" 50%"), output_field=m.CharField())
+    qs = IndexedVirtualModel.objects.annotate(label=_SqlMemo.attach(expr, True))
+    assert [*qs.values_list("label", flat=True)] == ["Doe 50%"]
+    assert qs.filter(label__endswith="0%").exists()
+
+
+def test_index_checks():
+    for model, name in [(Person, "age"), (Post, "authored_by"), (Post, "num_likes")]:
+        field = copy.copy(model._meta.get_field(name))
+        field.db_index = True
+        assert [e.id for e in field.check()] == ["virtual_fields.E002"]
+    assert IndexedVirtualModel._meta.get_field("age").check() == []
@@ -0,0 +1,72 @@
+import copy
+from decimal import Decimal
+
+import pytest as pyt
+
+from tests.app.models import InternVirtualModel
+from virtual_fields._util import _InternPool
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+@pyt.fixture
+def objs():
+    for i in range(4):
+        InternVirtualModel.objects.create(
+            data={
+                "city": "Nairobi",
+                "country": "Kenya",
+                "size": "Small",
+                "street": f"Street {i % 2}",
+            }
+        )
+    return [*InternVirtualModel.objects.order_by("pk")]
+
+
+def test_shared_values(objs):
+    cities = [o.city for o in objs]
+    assert cities == ["Nairobi"] * 4
+    assert all(c is cities[0] for c in cities)
+    assert all(o.country is objs[0].country for o in objs)
+    assert objs[0].street is not objs[2].street
+
+
+def test_values_list(objs):
+    rows = [*InternVirtualModel.objects.values_list("city", "size")]
+    assert {id(city) for city, _ in rows} == {id(rows[0][0])}
+    assert {id(size) for _, size in rows} == {id(rows[0][1])}
+
+
+def test_choices_by_default():
+    opts = InternVirtualModel._meta
+    assert opts.get_field("size").intern_pool is not None
+    assert opts.get_field("street").intern_pool is None
+
+
+def test_expression_change_resets_pool():
+    field = copy.copy(InternVirtualModel._meta.get_field("size"))
+    pool = field.intern_pool
+    field.set_source_expressions(*field.expressions)
+    assert field.intern_pool is not pool
+
+
+def test_pool():
+    seeded, other = "Obesity", "".join(["Obe", "sity"])
+    pool = _InternPool(3, [seeded])
+    assert pool.convert(other) is seeded
+
+    one, one_again = Decimal("1.0"), Decimal("1.0")
+    assert pool.convert(one) is one
+    assert pool.convert(one_again) is one
+    assert str(pool.convert(Decimal("1.00"))) == "1.00"
+
+    # The pool is full.
+    late = "".join(["la", "te"])
+    assert pool.convert(late) is late
+    assert pool.convert("".join(["la", "te"])) is not late
+
+    value = {"a": 1}
+    assert pool.convert(value) is value
+    assert pool.convert(None) is None
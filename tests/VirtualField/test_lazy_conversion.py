@@ -0,0 +1,82 @@
+import copy
+import pickle
+from decimal import Decimal
+
+import pytest as pyt
+
+from tests.app.models import LazyVirtualModel
+from virtual_fields._util import _LazyValue
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+@pyt.fixture
+def objs():
+    for i, data in enumerate(({"height": 1.5}, {"height": 1.8}, {})):
+        LazyVirtualModel.objects.create(title=f"title{i}", data=data)
+    return [*LazyVirtualModel.objects.order_by("pk")]
+
+
+def test_converted_on_access(objs, django_assert_num_queries):
+    obj = objs[0]
+    assert type(obj.__dict__["height"]) is _LazyValue
+    with django_assert_num_queries(0):
+        assert obj.height == Decimal("1.5")
+    assert type(obj.__dict__["height"]) is Decimal
+    assert obj.height is obj.height
+    assert objs[2].__dict__["height"] is None and objs[2].height is None
+
+
+def test_converted_once(objs):
+    calls, value = [], objs[1].__dict__["height"]
+    convert, *converters = value.converters
+    value.converters = [lambda *a: calls.append(a) or convert(*a), *converters]
+    assert objs[1].height == objs[1].height == Decimal("1.8")
+    assert len(calls) == 1
+
+
+def test_values_unaffected(objs):
+    qs = LazyVirtualModel.objects.order_by("pk")
+    assert [*qs.values_list("height", flat=True)] == [
+        Decimal("1.5"),
+        Decimal("1.8"),
+        None,
+    ]
+    assert type(qs.values("height").first()["height"]) is Decimal
+
+
+def test_select_related(objs):
+    LazyVirtualModel.objects.create(title="child", parent=objs[0])
+    child = LazyVirtualModel.objects.select_related("parent").get(title="child")
+    assert type(child.parent.__dict__["height"]) is _LazyValue
+    assert child.parent.height == Decimal("1.5")
+
+
+def test_set_and_delete(objs):
+    obj = objs[0]
+    obj.height = Decimal("2")
+    assert obj.height == Decimal("2")
+    del obj.height
+    assert "height" not in obj.__dict__
+    with pyt.raises(AttributeError):
+        del obj.height
+    assert obj.height == Decimal("1.5")
+
+
+def test_pickle_and_copy(objs):
+    value = objs[0].__dict__["height"]
+    assert pickle.loads(pickle.dumps(value)) == copy.deepcopy(value) == Decimal("1.5")
+    for clone in (pickle.loads(pickle.dumps(objs[0])), copy.deepcopy(objs[1])):
+        assert type(clone.__dict__.get("height")) is not _LazyValue
+    assert objs[0].height == Decimal("1.5")
+    assert copy.copy(objs[2]).height is None
+
+
+def test_lazy_conversion_checks():
+    field = LazyVirtualModel._meta.get_field("height")
+    assert field.check() == []
+    field = copy.copy(field)
+    field.cache = False
+    assert [e.id for e in field.check()] == ["virtual_fields.E003"]
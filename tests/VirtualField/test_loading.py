@@ -0,0 +1,327 @@
+import datetime
+import pickle
+
+import pytest as pyt
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from examples.example_01.models import Person, Post
+from tests.app.models import TimezoneVirtualModel
+from virtual_fields import _compat
+from virtual_fields import models as virtual_models
+from virtual_fields._util import _can_return_virtual
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+@pyt.fixture
+def people():
+    return [Person.create() for _ in range(6)]
+
+
+@pyt.fixture
+def posts(people):
+    return [Post.create() for _ in range(5)]
+
+
+def test_deferred_loads_peers(posts: list[Post], django_assert_num_queries):
+    expected = {p.pk: (p.num_likes, p.authored_by) for p in Post.objects.all()}
+    with django_assert_num_queries(3):
+        objs = [*Post.objects.all()]
+        likes = [o.num_likes for o in objs]
+        names = [o.authored_by for o in objs]
+
+    assert {o.pk: v for o, *v in zip(objs, likes, names)} == {
+        k: [*v] for k, v in expected.items()
+    }
+
+
+def test_deferred_loads_single(posts: list[Post], django_assert_num_queries):
+    obj = Post.objects.first()
+    with django_assert_num_queries(1):
+        obj.num_likes
+        obj.num_likes
+
+
+def test_deleted_peer_raises(posts: list[Post]):
+    # The last post has no comments, which would be deleted along with it.
+    single = Post.objects.order_by("pk").last()
+    objs = [*Post.objects.order_by("pk")]
+    Post.objects.filter(pk=objs[-1].pk).delete()
+    for obj in (single, objs[-1]):
+        for name in ("num_likes", "authored_by"):
+            with pyt.raises(Post.DoesNotExist, match="matching query does not exist"):
+                getattr(obj, name)
+    # The other peers were loaded along.
+    assert all("num_likes" in o.__dict__ for o in objs[:-1])
+
+
+def test_virtual_peers_not_pickled(posts: list[Post]):
+    obj = [*Post.objects.all()][0]
+    assert len(obj._state.virtual_peers) == len(posts)
+    assert pickle.loads(pickle.dumps(obj))._state.virtual_peers == []
+
+
+@pyt.fixture
+def reload_on_refresh(monkeypatch: pyt.MonkeyPatch):
+    models = []
+
+    def func(model, *names):
+        for name in names:
+            field = model._meta.get_field(name)
+            monkeypatch.setitem(field.__dict__, "on_model_refresh", field.RELOAD)
+        model._meta._expire_cache(forward=False)
+        models.append(model)
+
+    yield func
+    monkeypatch.undo()
+    for model in models:
+        model._meta._expire_cache(forward=False)
+
+
+def test_refresh_single_query(posts: list[Post], django_assert_num_queries):
+    obj = Post.objects.first()
+    obj.num_likes, obj.authored_by
+    person = obj.author
+    person.first_name = "Changed"
+    person.save()
+    obj.likes.add(*Person.objects.exclude(liked=obj)[:2])
+    Post.objects.filter(pk=obj.pk).update(title="Changed")
+
+    with django_assert_num_queries(1):
+        obj.refresh_from_db(fields=["title", "num_likes", "authored_by"])
+
+    assert obj.title == "Changed"
+    assert obj.num_likes == obj.likes.count()
+    assert obj.authored_by == person.full_name
+
+
+@pyt.fixture
+def counted_post(people):
+    """A post with 2 likes and 3 comments."""
+    post = Post.create(type="article", author=people[0])
+    post.likes.set(people[1:3])
+    for person in people[3:6]:
+        Post.create(type="comment", author=person, parent=post)
+    return Post.objects.get(pk=post.pk)
+
+
+def test_refresh_all_single_query(
+    counted_post: Post, reload_on_refresh, django_assert_num_queries
+):
+    reload_on_refresh(Post, "num_likes", "num_comments")
+    obj = counted_post
+    assert "num_likes" in Post._meta.virtual_fields_to_reload_on_refresh
+
+    with django_assert_num_queries(1):
+        obj.refresh_from_db()
+
+    with django_assert_num_queries(0):
+        assert (obj.num_likes, obj.num_comments) == (2, 3)
+
+
+def _reloaded_values(obj: Person):
+    names = obj._meta.virtual_fields_to_reload_on_save
+    return {k: getattr(obj, k) for k in obj.__dict__ if k in names}
+
+
+@pyt.fixture
+def no_returning(monkeypatch: pyt.MonkeyPatch):
+    monkeypatch.setattr(virtual_models, "_can_return_virtual", lambda *a, **kw: False)
+
+
+@pyt.mark.skipif(not _can_return_virtual(connection), reason="no RETURNING support")
+def test_save_returning(django_assert_num_queries):
+    with django_assert_num_queries(1):
+        obj = Person.create()
+    assert _reloaded_values(obj) == _reloaded_values(Person.objects.get(pk=obj.pk))
+
+    obj.first_name, obj.dob = "Changed", datetime.date(2000, 1, 1)
+    with django_assert_num_queries(1):
+        obj.save()
+    assert (obj.full_name, obj.yob) == (f"Changed {obj.last_name}", 2000)
+    assert _reloaded_values(obj) == _reloaded_values(Person.objects.get(pk=obj.pk))
+
+
+def test_save_fallback(no_returning, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        obj = Person.create()
+    assert _reloaded_values(obj) == _reloaded_values(Person.objects.get(pk=obj.pk))
+
+    obj.first_name = "Changed"
+    with django_assert_num_queries(2):
+        obj.save()
+    assert obj.full_name == f"Changed {obj.last_name}"
+
+
+def test_save_reloads_dependents(no_returning, django_assert_num_queries):
+    obj = Person.objects.get(pk=Person.create().pk)
+    obj.dob = datetime.date(2000, 1, 1)
+    with django_assert_num_queries(2) as ctx:
+        obj.save(update_fields=["dob"])
+    assert obj.yob == 2000
+    assert "first_name" not in ctx.captured_queries[-1]["sql"]
+
+
+def test_save_without_dependents(posts: list[Post], django_assert_num_queries):
+    obj = Post.objects.get(pk=posts[0].pk)
+    values = obj.num_likes, obj.authored_by
+    obj.content = "Changed"
+    with django_assert_num_queries(1):
+        obj.save(update_fields=["content"])
+    with django_assert_num_queries(0):
+        assert (obj.num_likes, obj.authored_by) == values
+
+
+def test_save_deletes_changed_dependents(posts: list[Post]):
+    obj = Post.objects.get(pk=posts[0].pk)
+    obj.num_likes, obj.authored_by
+    obj.author = Person.objects.exclude(pk=obj.author_id).first()
+    obj.save()
+    assert "num_likes" in obj.__dict__ and "authored_by" not in obj.__dict__
+    assert obj.authored_by == obj.author.full_name
+
+    obj.author = obj.author
+    obj.save()
+    assert "authored_by" in obj.__dict__
+
+
+def _new_people(n=4):
+    return [
+        Person(
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            dob=datetime.date(1990 + i, 1, 1),
+            data={"city": "City", "height": 1.7, "weight": 60},
+        )
+        for i in range(n)
+    ]
+
+
+@pyt.mark.skipif(
+    not _compat._can_bulk_return_virtual(connection), reason="no RETURNING support"
+)
+def test_bulk_create_returning(django_assert_num_queries):
+    with django_assert_num_queries(1):
+        objs = Person.objects.bulk_create(_new_people())
+
+    for obj in objs:
+        assert _reloaded_values(obj) == _reloaded_values(Person.objects.get(pk=obj.pk))
+        assert obj.full_name == f"{obj.first_name} {obj.last_name}"
+
+
+def test_bulk_create_fallback(
+    monkeypatch: pyt.MonkeyPatch, django_assert_max_num_queries
+):
+    monkeypatch.setattr(_compat, "_can_bulk_return_virtual", lambda *a: False)
+    with django_assert_max_num_queries(2):
+        objs = Person.objects.bulk_create(_new_people())
+    if objs[0].pk is None:
+        return pyt.skip("bulk_create does not set primary keys")
+
+    for obj in objs:
+        assert _reloaded_values(obj) == _reloaded_values(Person.objects.get(pk=obj.pk))
+
+
+def test_bulk_update(people: list[Person], django_assert_num_queries):
+    objs = [*Person.objects.all()]
+    for i, obj in enumerate(objs):
+        obj.first_name, obj.dob = f"Changed{i}", datetime.date(2000 + i, 1, 1)
+
+    with django_assert_num_queries(2):
+        Person.objects.bulk_update(objs, ["first_name", "dob"])
+
+    for i, obj in enumerate(objs):
+        assert (obj.full_name, obj.yob) == (f"Changed{i} {obj.last_name}", 2000 + i)
+        assert _reloaded_values(obj) == _reloaded_values(Person.objects.get(pk=obj.pk))
+
+
+def test_bulk_update_deletes(posts: list[Post], django_assert_num_queries):
+    objs, author = [*Post.objects.all()], Person.objects.first()
+    [(o.num_likes, o.authored_by) for o in objs]
+    for obj in objs:
+        obj.title = "Changed"
+
+    Post.objects.bulk_update(objs, ["title"])
+    assert all({"num_likes", "authored_by"} <= {*o.__dict__} for o in objs)
+    for obj in objs:
+        obj.author = author
+    Post.objects.bulk_update(objs, ["author"])
+    assert all("num_likes" in o.__dict__ for o in objs)
+    with django_assert_num_queries(1):
+        names = [o.authored_by for o in objs]
+    assert names == [author.full_name] * len(objs)
+
+
+def test_refresh_virtual(posts: list[Post], django_assert_num_queries):
+    objs = [*Post.objects.all()]
+    [(o.num_likes, o.authored_by) for o in objs]
+    for obj in objs[:3]:
+        obj.likes.add(*Person.objects.exclude(liked=obj)[:2])
+    Person.objects.update(first_name="Changed")
+
+    with django_assert_num_queries(1):
+        Post.objects.refresh_virtual(objs, "num_likes", "authored_by")
+
+    with django_assert_num_queries(0):
+        values = [(o.num_likes, o.authored_by) for o in objs]
+    assert values == [
+        (o.likes.count(), f"Changed {o.author.last_name}") for o in objs
+    ]
+
+
+def test_refresh_virtual_aggregates(counted_post: Post, django_assert_num_queries):
+    objs = [counted_post, *Post.objects.filter(parent=counted_post)]
+    with django_assert_num_queries(1):
+        Post.objects.refresh_virtual(objs, "num_likes", "num_comments", "authored_by")
+    assert (objs[0].num_likes, objs[0].num_comments) == (2, 3)
+    assert [o.num_comments for o in objs[1:]] == [0, 0, 0]
+    assert [o.num_likes for o in objs] == [o.likes.count() for o in objs]
+
+
+def test_refresh_virtual_chunks(posts: list[Post], django_assert_num_queries):
+    objs = [*Post.objects.all()]
+    with django_assert_num_queries(3):
+        Post.objects.all().refresh_virtual(objs, "num_likes", chunk_size=2)
+    assert all("num_likes" in o.__dict__ for o in objs)
+
+
+def test_lazy_load_precompiled(posts: list[Post], django_assert_num_queries):
+    field = Post._meta.get_field("authored_by")
+    field._pk_lookups.clear()
+    objs = [Post.objects.get(pk=p.pk) for p in posts]
+    with django_assert_num_queries(len(objs)):
+        values = [o.authored_by for o in objs]
+
+    assert values == [o.author.full_name for o in objs]
+    assert [*field._pk_lookups] == [(objs[0]._state.db, None)]
+    lookup = field._pk_lookups[objs[0]._state.db, None]
+    Post.objects.get(pk=posts[0].pk).authored_by
+    assert field._pk_lookups[objs[0]._state.db, None] is lookup
+
+    connection_created.send(type(connection), connection=connection)
+    assert not field._pk_lookups
+    assert Post.objects.get(pk=posts[0].pk).authored_by == values[0]
+
+
+def test_lazy_load_timezone(settings):
+    settings.USE_TZ = True
+    published_at = datetime.datetime(2000, 1, 1, 12, tzinfo=datetime.timezone.utc)
+    obj = TimezoneVirtualModel.objects.create(published_at=published_at)
+    field = TimezoneVirtualModel._meta.get_field("hour")
+    assert field.depends_on_timezone
+    assert field.fetch_db_value(obj) == 12
+    with timezone.override("Asia/Tokyo"):
+        assert field.fetch_db_value(obj) == 21
+    assert field.fetch_db_value(obj) == 12
+    assert not Post._meta.get_field("authored_by").depends_on_timezone
+
+
+def test_lazy_load_missing_row(posts: list[Post]):
+    obj = Post.objects.get(pk=posts[0].pk)
+    Post.objects.filter(pk=obj.pk).delete()
+    with pyt.raises(Post.DoesNotExist):
+        obj.authored_by
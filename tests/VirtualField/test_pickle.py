@@ -0,0 +1,109 @@
+import copy
+import datetime
+import pickle
+
+import pytest as pyt
+from django.db import models as m
+
+from examples.example_01.models import Person, Post
+from tests.app.models import SlottedVirtualModel
+from virtual_fields._cache import _LOADED
+from virtual_fields._util import _PACKED, _SLOTS
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+@pyt.fixture
+def person():
+    obj = Person.objects.create(
+        first_name="Ada",
+        last_name="Lovelace",
+        dob=datetime.date(1990, 1, 1),
+        data={"city": "London", "height": 1.7, "weight": 60},
+    )
+    obj = Person.objects.get(pk=obj.pk)
+    for name in Person._meta.cached_virtual_fields:
+        getattr(obj, name)
+    return obj
+
+
+def _values(obj):
+    return {name: getattr(obj, name) for name in obj._meta.cached_virtual_fields}
+
+
+def test_recomputed_values_left_out(person, django_assert_num_queries):
+    state = person.__reduce__()[2]
+    key, mask, values = state[_PACKED]
+    assert not {*person._meta.cached_virtual_fields} & {*state}
+    # `age` depends on the current date and `bmi` uses `Power`.
+    assert values == (person.age, person.bmi)
+
+    clone = pickle.loads(pickle.dumps(person))
+    with django_assert_num_queries(0):
+        assert _values(clone) == _values(person)
+
+
+def test_payload_size(person):
+    size = len(pickle.dumps(person))
+    assert size < len(pickle.dumps(m.Model.__reduce__(person))) * 0.8
+
+    obj = SlottedVirtualModel.objects.create(first_name="first", last_name="last")
+    obj.initials, obj.first_upper, obj.name_length
+    assert len(pickle.dumps(obj)) < len(pickle.dumps(m.Model.__reduce__(obj)))
+
+
+def test_packed_values(django_assert_num_queries):
+    obj = SlottedVirtualModel.objects.create(first_name="first", last_name="last")
+    obj = SlottedVirtualModel.objects.get(pk=obj.pk)
+    values = obj.full_name, obj.initials, obj.first_length
+    state = obj.__reduce__()[2]
+    assert _SLOTS not in state and _LOADED not in state
+
+    clone = pickle.loads(pickle.dumps(obj))
+    with django_assert_num_queries(0):
+        assert (clone.full_name, clone.initials, clone.first_length) == values
+    assert clone.__dict__[_SLOTS] is not obj.__dict__[_SLOTS]
+    assert "first_length" in clone.__dict__[_LOADED]
+
+
+def test_not_recomputed_values(person, django_assert_num_queries):
+    post = Post.objects.create(title="t", content="c", type="text", author=person)
+    post = Post.objects.get(pk=post.pk)
+    post.num_likes, post.authored_by
+    clone = copy.copy(post)
+    with django_assert_num_queries(0):
+        assert (clone.num_likes, clone.authored_by) == (0, "Ada Lovelace")
+
+
+def test_changed_fields(
+    person, monkeypatch: pyt.MonkeyPatch, django_assert_num_queries
+):
+    data = pickle.dumps(person)
+    key, fields = Person._meta.virtual_field_layout
+    monkeypatch.setitem(Person._meta.__dict__, "virtual_field_layout", (~key, fields))
+    clone = pickle.loads(data)
+    with django_assert_num_queries(1):
+        assert clone.age == person.age
+
+
+def test_expressions_by_reference():
+    field = Person._meta.get_field("bmi")
+    for expr in (field.final_expression, field.cached_col):
+        data = pickle.dumps(expr)
+        assert pickle.loads(data) is expr
+        assert len(data) < len(pickle.dumps(copy.copy(expr))) / 5
+        assert copy.copy(expr) is not expr and copy.deepcopy(expr) is not expr
+
+
+def test_queryset(person):
+    qs = Person.objects.filter(full_name="Ada Lovelace", bmi__gt=20)
+    query = pickle.loads(pickle.dumps(qs.query))
+    assert str(query) == str(qs.query)
+    clone = Person.objects.all()
+    clone.query = query
+    assert [*clone] == [person]
+
+    objs = pickle.loads(pickle.dumps(qs))
+    assert [o.bmi for o in objs] == [person.bmi]
@@ -0,0 +1,116 @@
+import datetime
+
+import pytest as pyt
+from django.core.exceptions import FieldError
+from django.utils import timezone
+
+from examples.example_01.models import Person, Post
+from tests.app.models import TimezoneVirtualModel
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+@pyt.fixture
+def posts():
+    [Person.create() for _ in range(6)]
+    return [Post.create() for _ in range(5)]
+
+
+def test_joined_filter(posts: list[Post]):
+    for post in posts:
+        name = post.author.full_name
+        qs = Post.objects.filter(authored_by=name)
+        assert {*qs} == {p for p in posts if p.author.full_name == name}
+        assert {*qs.values_list("authored_by", flat=True)} == {name}
+
+
+def test_joined_col_cache():
+    field = Post._meta.get_field("authored_by")
+    field._col_cache.clear()
+    qs = Post.objects.filter(authored_by="abc")
+    sql = str(qs.query)
+    assert not field._col_cache
+
+    for _ in range(3):
+        vqs = qs.filter(authored_by__startswith="a").values_list("authored_by")
+        assert str(vqs.query).count("JOIN") == sql.count("JOIN") == 1
+    assert len(field._col_cache) == 1
+
+
+def test_compiled_sql_memo():
+    field = Person._meta.get_field("full_name")
+    memo = field.cached_col._virtual_sql_
+    memo.entries.clear()
+    sql = str(Person.objects.filter(first_name="abc").query)
+    assert len(memo.entries) == 1
+    assert str(Person.objects.filter(last_name="abc").query).startswith(
+        sql.partition(" WHERE ")[0]
+    )
+    assert len(memo.entries) == 1
+
+    sub = Post.objects.filter(author__in=Person.objects.filter(full_name="abc"))
+    assert "U0" in str(sub.query)
+    assert Person.objects.filter(full_name="abc").count() == 0
+
+
+@pyt.fixture
+def noon_utc(settings):
+    settings.USE_TZ = True
+    published_at = datetime.datetime(2000, 1, 1, 12, tzinfo=datetime.timezone.utc)
+    return TimezoneVirtualModel.objects.create(published_at=published_at)
+
+
+def test_compiled_sql_memo_timezone(noon_utc):
+    qs = TimezoneVirtualModel.objects.values_list("hour", flat=True)
+    assert [*qs.all()] == [12]
+    with timezone.override("Asia/Tokyo"):
+        assert [*qs.all()] == [21]
+        assert [*qs.filter(hour=21)] == [21]
+    assert [*qs.all()] == [12]
+
+
+def test_set_source_expressions_invalidates():
+    field = Person._meta.get_field("yob")
+    expressions, col = field.expressions, field.cached_col
+    try:
+        field.set_source_expressions("dob__month")
+        assert field.cached_col is not col
+        where = str(Person.objects.filter(yob=1).query).partition(" WHERE ")[2]
+        assert "month" in where.lower()
+    finally:
+        field.set_source_expressions(*expressions)
+    where = str(Person.objects.filter(yob=1).query).partition(" WHERE ")[2]
+    assert "year" in where.lower()
+
+
+def test_share_virtual(posts: list[Post]):
+    names = [*Person._meta.concrete_virtual_fields, "bmi"]
+    qs = Person.objects.share_virtual().order_by("pk")
+    expected = [*Person.objects.order_by("pk").values_list(*names)]
+    assert [*qs.values_list(*names)] == expected
+    assert [[getattr(o, n) for n in names] for o in qs] == [[*v] for v in expected]
+
+    sql = str(qs.values_list("bmi_cat").query).upper()
+    assert sql.count("POWER(") == 1 and " FROM (SELECT " in sql
+
+    for lookup in [{"bmi__lt": 25}, {"bmi_cat": "Normal weight"}]:
+        ids = {*Person.objects.filter(**lookup).values_list("pk", flat=True)}
+        assert {*qs.filter(**lookup).values_list("pk", flat=True)} == ids
+        sub = Post.objects.filter(author__in=qs.filter(**lookup).values("pk"))
+        assert {p.author_id for p in sub} == {p.author_id for p in posts} & ids
+
+
+def test_share_virtual_timezone(noon_utc):
+    qs = TimezoneVirtualModel.objects.share_virtual().values_list("hour", "next_hour")
+    assert " FROM (SELECT " in str(qs.query).upper()
+    assert [*qs.all()] == [(12, 13)]
+    with timezone.override("Asia/Tokyo"):
+        assert [*qs.all()] == [(21, 22)]
+    assert [*qs.all()] == [(12, 13)]
+
+
+def test_share_virtual_invalid():
+    with pyt.raises(FieldError, match="num_likes"):
+        Post.objects.share_virtual("num_likes")
@@ -0,0 +1,140 @@
+import copy
+import json
+from io import StringIO
+
+import pytest as pyt
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Value
+from django.db.models.functions import Concat
+
+from examples.example_01.models import Post
+from tests.app.models import IndexedVirtualModel, ShadowVirtualModel
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+@pyt.fixture
+def objs():
+    author = IndexedVirtualModel.objects.create(first_name="John", last_name="Doe")
+    return [
+        ShadowVirtualModel.objects.create(author=author, title="x" * i)
+        for i in range(1, 6)
+    ]
+
+
+def _backfill(*args, **kwargs):
+    call_command("virtualfields_backfill", *args, stdout=StringIO(), **kwargs)
+
+
+def test_shadow_reads_column(objs: list[ShadowVirtualModel]):
+    qs = ShadowVirtualModel.objects.filter(authored_by="John Doe", title_length=3)
+    assert "JOIN" not in str(qs.query)
+    assert [*qs] == [objs[2]]
+    assert [o.title_length for o in objs] == [1, 2, 3, 4, 5]
+
+
+def test_shadow_save(objs: list[ShadowVirtualModel], django_assert_num_queries):
+    obj = objs[0]
+    obj.title = "abc"
+    obj.save()
+    assert obj.title_length == 3
+    assert ShadowVirtualModel.objects.get(pk=obj.pk).title_length == 3
+
+    obj = ShadowVirtualModel.objects.get(pk=obj.pk)
+    with django_assert_num_queries(1):
+        obj.save()
+
+
+def _columns(*names):
+    qs = ShadowVirtualModel.objects.order_by("pk")
+    return [*qs.values_list(*names)]
+
+
+def test_shadow_bulk_create():
+    author = IndexedVirtualModel.objects.create(first_name="John", last_name="Doe")
+    ShadowVirtualModel.objects.bulk_create(
+        [ShadowVirtualModel(author=author, title="x" * i) for i in range(1, 4)]
+    )
+    assert _columns("authored_by", "title_length") == [
+        ("John Doe", 1),
+        ("John Doe", 2),
+        ("John Doe", 3),
+    ]
+
+
+def test_shadow_queryset_update(objs: list[ShadowVirtualModel]):
+    ShadowVirtualModel.objects.filter(title="xx").update(title="abcd")
+    assert _columns("title_length") == [(1,), (4,), (3,), (4,), (5,)]
+
+    objs = [*ShadowVirtualModel.objects.order_by("pk")]
+    for obj in objs:
+        obj.title = "y"
+    ShadowVirtualModel.objects.bulk_update(objs[:2], ["title"])
+    assert _columns("title_length") == [(1,), (1,), (3,), (4,), (5,)]
+
+
+def test_shadow_queryset_update_subquery(
+    objs: list[ShadowVirtualModel], django_assert_num_queries
+):
+    author = objs[0].author
+    with django_assert_num_queries(2) as ctx:
+        ShadowVirtualModel.objects.filter(author=author).update(title="ab")
+    assert all(q["sql"].startswith("UPDATE") for q in ctx.captured_queries)
+    assert "SELECT" in ctx.captured_queries[1]["sql"]
+    assert _columns("title_length") == [(2,)] * 5
+
+    with django_assert_num_queries(2) as ctx:
+        IndexedVirtualModel.objects.filter(pk=author.pk).update(last_name="Roe")
+    assert all(q["sql"].startswith("UPDATE") for q in ctx.captured_queries)
+    assert {*_columns("authored_by")} == {("John Roe",)}
+
+
+def test_shadow_queryset_update_pages(objs: list[ShadowVirtualModel], monkeypatch):
+    features = connection.features
+    monkeypatch.setattr(features, "max_query_params", 2)
+    qs = ShadowVirtualModel.objects.filter(title_length__gt=1)
+    assert qs.update(title=Concat("title", Value("y"))) == 4
+    assert _columns("title_length") == [(1,), (3,), (4,), (5,), (6,)]
+
+
+def test_shadow_related_change(objs: list[ShadowVirtualModel]):
+    author = objs[0].author
+    author.last_name = "Roe"
+    author.save()
+    assert {*_columns("authored_by")} == {("John Roe",)}
+
+    IndexedVirtualModel.objects.update(first_name="Jane")
+    assert {*_columns("authored_by")} == {("Jane Roe",)}
+
+    other = IndexedVirtualModel.objects.create(first_name="Ann", last_name="Lee")
+    ShadowVirtualModel.objects.filter(pk=objs[0].pk).update(author=other)
+    assert _columns("authored_by")[:2] == [("Ann Lee",), ("Jane Roe",)]
+
+
+def test_shadow_checks():
+    assert ShadowVirtualModel._meta.get_field("authored_by").check() == []
+    field = copy.copy(Post._meta.get_field("num_likes"))
+    field.materialize = "shadow"
+    assert [e.id for e in field.check()] == ["virtual_fields.W001"]
+
+
+def test_shadow_backfill(objs: list[ShadowVirtualModel], tmp_path):
+    qs = ShadowVirtualModel.objects.order_by("pk")
+    IndexedVirtualModel.objects.update(last_name="Roe")
+    qs.update(title_length=None)
+
+    checkpoint = tmp_path / "checkpoint.json"
+    checkpoint.write_text(json.dumps({"app.ShadowVirtualModel": objs[1].pk}))
+    _backfill("app.ShadowVirtualModel", chunk_size=2, checkpoint=checkpoint)
+    assert [*qs.values_list("title_length", flat=True)] == [None, None, 3, 4, 5]
+    assert not checkpoint.exists()
+
+    _backfill("app.ShadowVirtualModel.authored_by", chunk_size=2)
+    assert {*qs.values_list("authored_by", flat=True)} == {"John Roe"}
+    assert [*qs.values_list("title_length", flat=True)][:2] == [None, None]
+
+    with pyt.raises(CommandError, match="not a shadow virtual field"):
+        _backfill("app.ShadowVirtualModel.title")
@@ -0,0 +1,96 @@
+import copy
+import pickle
+import tracemalloc
+
+import pytest as pyt
+
+from tests.app.models import SlottedVirtualModel
+from virtual_fields._util import _SLOTS
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+NAMES = ("full_name", "initials", "first_upper", "last_upper", "name_length")
+
+
+@pyt.fixture
+def objs():
+    for i in range(3):
+        SlottedVirtualModel.objects.create(first_name=f"first{i}", last_name="last")
+    return [*SlottedVirtualModel.objects.order_by("pk")]
+
+
+def test_values_in_slots(objs, django_assert_num_queries):
+    obj = objs[0]
+    with django_assert_num_queries(5):
+        values = [getattr(obj, name) for name in NAMES]
+    assert values == ["first0 last", "fl", "FIRST0", "LAST", 10]
+    assert not set(NAMES) & {*obj.__dict__}
+    assert all(name in obj.__dict__[_SLOTS] for name in NAMES)
+    with django_assert_num_queries(0):
+        assert [getattr(obj, name) for name in NAMES] == values
+
+
+def test_lazy_allocation(objs):
+    assert _SLOTS not in objs[0].__dict__
+    assert objs[0].first_length == 6
+    assert "first_length" in objs[0].__dict__[_SLOTS]
+
+
+def test_invalidation(objs):
+    obj = objs[1]
+    assert (obj.first_upper, obj.last_upper) == ("FIRST1", "LAST")
+    obj.first_name = "new"
+    slots = obj.__dict__[_SLOTS]
+    obj.save()
+    assert "first_upper" not in slots and "last_upper" in slots
+    assert obj.first_upper == "NEW"
+
+    del obj.first_upper
+    assert "first_upper" not in slots
+    with pyt.raises(AttributeError):
+        del obj.first_upper
+
+    assert obj.full_name == "new last"
+    obj.refresh_from_db()
+    assert "full_name" not in obj.__dict__[_SLOTS]
+
+
+def test_pickle(objs):
+    obj = objs[2]
+    values = [getattr(obj, name) for name in NAMES]
+    clone = pickle.loads(pickle.dumps(obj))
+    assert clone.__dict__[_SLOTS] is not obj.__dict__[_SLOTS]
+    assert [getattr(clone, name) for name in NAMES] == values
+
+
+def test_memory_per_instance():
+    def measure(store):
+        objs = [SlottedVirtualModel(pk=i, first_name="a") for i in range(2000)]
+        # Materialized first, as CPython keeps the attributes inline until then.
+        [obj.__dict__ for obj in objs]
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for obj in objs:
+                store(obj, {name: i for i, name in enumerate(NAMES)})
+            return (tracemalloc.get_traced_memory()[0] - before) / len(objs)
+        finally:
+            tracemalloc.stop()
+
+    def store_slots(obj, values):
+        for name, val in values.items():
+            setattr(obj, name, val)
+
+    in_dict, in_slots = measure(lambda o, v: o.__dict__.update(v)), measure(store_slots)
+    # e.g. 208 and 80 bytes for five values on CPython 3.11.
+    assert in_slots < in_dict / 2
+
+
+def test_storage_checks():
+    field = SlottedVirtualModel._meta.get_field("full_name")
+    assert field.check() == []
+    field = copy.copy(field)
+    field.cache = False
+    assert [e.id for e in field.check()] == ["virtual_fields.E003"]
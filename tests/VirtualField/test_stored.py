@@ -0,0 +1,80 @@
+import copy
+import datetime
+
+import pytest as pyt
+from django.apps import apps
+from django.db import connection
+from django.db.migrations.state import ProjectState
+from django.db.models.functions import ExtractYear, Now
+
+from examples.example_01.models import Person, Post
+from tests.app.models import StoredVirtualModel
+from virtual_fields.apps import check_virtual_fields
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+def _create(**kwargs):
+    defaults = dict(first_name="John", last_name="Doe", dob=datetime.date(2000, 1, 1))
+    return StoredVirtualModel.objects.create(**defaults | kwargs)
+
+
+def test_stored_reads_column(django_assert_num_queries):
+    obj = _create()
+    with django_assert_num_queries(2):
+        obj = StoredVirtualModel.objects.get(pk=obj.pk)
+        assert (obj.full_name, obj.yob) == ("John Doe", 2000)
+        assert obj.initials == "JD"
+
+    qs = StoredVirtualModel.objects.filter(full_name="John Doe", yob=2000)
+    where = str(qs.query).partition(" WHERE ")[2]
+    assert '"full_name"' in where and "||" not in where
+    assert [*qs] == [obj]
+    assert [*qs.values_list("initials", flat=True)] == ["JD"]
+
+
+def test_stored_save():
+    obj = _create()
+    obj.first_name, obj.dob = "Jane", None
+    obj.save()
+    assert (obj.full_name, obj.yob) == ("Jane Doe", None)
+    assert StoredVirtualModel.objects.get(pk=obj.pk).initials == "JD"
+
+    StoredVirtualModel.objects.filter(pk=obj.pk).update(last_name="Roe")
+    obj.refresh_from_db()
+    assert obj.full_name == "Jane Roe"
+
+
+def test_stored_checks():
+    assert check_virtual_fields([apps.get_app_config("app")]) == []
+    for model, name in [(Person, "age"), (Person, "bmi_cat"), (Post, "authored_by")]:
+        field = copy.copy(model._meta.get_field(name))
+        field.materialize = "stored"
+        assert [e.id for e in field.check()] == ["virtual_fields.E001"]
+
+    field = copy.copy(StoredVirtualModel._meta.get_field("yob"))
+    field.set_source_expressions(ExtractYear(Now()))
+    assert "not deterministic" in field.check()[0].msg
+
+
+@pyt.mark.django_db(transaction=True)
+def test_stored_schema_changes():
+    _create()
+    model = ProjectState.from_apps(apps).apps.get_model(StoredVirtualModel._meta.label)
+    old, field = model._meta.get_field("last_name"), model._meta.get_field("full_name")
+    new = copy.copy(old)
+    new.max_length = 150
+
+    with connection.schema_editor() as editor:
+        editor.alter_field(model, old, new)
+        editor.remove_field(model, field)
+    assert [*StoredVirtualModel.objects.values_list("last_name", flat=True)] == ["Doe"]
+
+    with connection.schema_editor() as editor:
+        editor.add_field(model, field)
+        editor.alter_field(model, new, old)
+    StoredVirtualModel.objects.update(first_name="Kate")
+    obj = StoredVirtualModel.objects.get()
+    assert (obj.full_name, obj.yob, obj.initials) == ("Kate Doe", 2000, "KD")
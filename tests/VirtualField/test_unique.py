@@ -0,0 +1,93 @@
+import copy
+import datetime
+
+import pytest as pyt
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import IntegrityError, connection, transaction
+
+from examples.example_01.models import Person, Post
+from tests.app.models import UniqueVirtualModel
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+
+def _new(first_name="John", last_name="Doe", joined=datetime.date(2000, 1, 1)):
+    return UniqueVirtualModel(first_name=first_name, last_name=last_name, joined=joined)
+
+
+def test_unique_constraints_created():
+    table = UniqueVirtualModel._meta.db_table
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+
+    names = {c.name for c in UniqueVirtualModel._meta.constraints}
+    assert names == {"app_uniquev_full_na_55e203_uq", "app_uniquev_initial_adbd89_uq"}
+    assert names <= {*constraints}
+
+    _new().save()
+    for obj in [_new(), _new("Jane", "Dee")]:
+        with pyt.raises(IntegrityError), transaction.atomic():
+            obj.save()
+    _new("Jane", "Dee", datetime.date(2001, 1, 1)).save()
+
+
+def test_unique_validation(django_assert_num_queries):
+    _new().save()
+    obj = _new()
+    with django_assert_num_queries(1), pyt.raises(ValidationError) as exc:
+        obj.full_clean()
+    errors = exc.value.error_dict
+    assert [(k, e[0].code) for k, e in errors.items()] == [
+        ("full_name", "unique"),
+        ("initials", "unique_for_date"),
+    ]
+
+    obj.first_name = "Jane"
+    with django_assert_num_queries(1), pyt.raises(ValidationError) as exc:
+        obj.full_clean(exclude=["initials"])
+    assert exc.value.error_dict[NON_FIELD_ERRORS][0].code == "unique_for_date"
+
+    with django_assert_num_queries(0):
+        obj.full_clean(exclude=["first_name"])
+
+    obj.joined = datetime.date(2001, 1, 1)
+    with django_assert_num_queries(1):
+        obj.full_clean()
+    obj.save()
+    with django_assert_num_queries(1):
+        obj.full_clean(exclude=["full_name", "initials"])
+
+
+def test_unique_validation_reentrant(monkeypatch: pyt.MonkeyPatch):
+    _new().save()
+    obj, nested = _new(), []
+
+    class Nested:
+        def validate(self, model, instance, exclude=None, using=None):
+            if not nested:
+                nested.append(None)
+                with pyt.raises(ValidationError) as exc:
+                    instance.validate_constraints()
+                nested[0] = sorted(exc.value.error_dict)
+
+    get_constraints = UniqueVirtualModel.get_constraints
+    monkeypatch.setattr(
+        UniqueVirtualModel,
+        "get_constraints",
+        lambda self: [(m, [*c, Nested()]) for m, c in get_constraints(self)],
+    )
+    with pyt.raises(ValidationError):
+        obj.validate_constraints()
+    assert nested == [["full_name", "initials"]]
+    assert "get_constraints" not in obj.__dict__
+
+
+def test_unique_checks():
+    for model, name in [(Person, "age"), (Post, "num_likes")]:
+        field = copy.copy(model._meta.get_field(name))
+        field._unique = True
+        assert [e.id for e in field.check()] == ["virtual_fields.E002"]
+        field._unique, field.unique_for_year = False, "dob"
+        assert [e.id for e in field.check()] == ["virtual_fields.E002"]
@@ -0,0 +1,110 @@
+import datetime
+from decimal import Decimal
+
+import pytest as pyt
+from django.core.exceptions import FieldError
+from django.db import models as m
+
+from examples.example_01.models import Person
+from tests.app.models import CachedVirtualModel
+from virtual_fields._vector import _VectorCompiler
+
+np = pyt.importorskip("numpy")
+
+pytestmark = [
+    pyt.mark.django_db,
+]
+
+FIELDS = ("bmi", "bmi_cat", "height", "weight")
+
+
+@pyt.fixture
+def people():
+    data = [
+        {"height": 1.8, "weight": 80},
+        {"height": 1.62, "weight": 45},
+        {"height": 2.1, "weight": 120},
+        {"height": 1.75, "weight": 70},
+        {"weight": 60},
+        {"height": 0, "weight": 60},
+    ]
+    return [
+        Person.objects.create(
+            first_name="A", last_name="B", dob=datetime.date(2000, 1, 1), data=d
+        )
+        for d in data
+    ]
+
+
+def test_sql_parity(people):
+    arrays = Person.objects.evaluate_virtual_vectorized(*FIELDS, chunk_size=4)
+    rows = Person.objects.order_by("pk").values_list("pk", *FIELDS)
+    assert arrays["pk"].tolist() == [p.pk for p in people]
+    for i, (pk, *values) in enumerate(rows):
+        for name, expected in zip(FIELDS, values):
+            value = arrays[name][i]
+            if expected is None:
+                assert np.isnan(value)
+            elif isinstance(value, str):
+                assert value == expected
+            else:
+                assert value == pyt.approx(float(expected), abs=1e-3)
+
+
+def test_null_division(people):
+    arrays = Person.objects.filter(pk=people[-1].pk).evaluate_virtual_vectorized("bmi")
+    assert np.isnan(arrays["bmi"]).all()
+    assert arrays["pk"].tolist() == [people[-1].pk]
+
+
+def test_attach(people, django_assert_num_queries):
+    objs = [*Person.objects.order_by("pk")]
+    with django_assert_num_queries(1):
+        Person.objects.evaluate_virtual_vectorized("bmi", "bmi_cat", attach=objs)
+    with django_assert_num_queries(0):
+        values = [(o.bmi, o.bmi_cat) for o in objs]
+    assert values[:2] == [
+        (Decimal("24.691"), "Normal weight"),
+        (Decimal("17.147"), "Underweight"),
+    ]
+    assert values[-1] == (None, "Obesity")
+
+
+def test_unsupported():
+    with pyt.raises(FieldError):
+        Person.objects.evaluate_virtual_vectorized("age")
+    with pyt.raises(FieldError):
+        Person.objects.evaluate_virtual_vectorized("name")
+    with pyt.raises(FieldError):
+        CachedVirtualModel.objects.evaluate_virtual_vectorized("num_children")
+    with pyt.raises(FieldError):
+        Person.objects.evaluate_virtual_vectorized("missing")
+
+
+def test_three_valued_conditions():
+    compiler = _VectorCompiler(Person)
+    node = compiler.compile(
+        m.Case(
+            m.When(~m.Q(id__lt=20), then=m.Value("a")),
+            m.When(m.Q(id__isnull=True) | m.Q(id__in=[5]), then=m.Value("b")),
+            default=m.Value("c"),
+        )
+    )
+    cols = {"pk": np.arange(4), "_vv0": np.array([10, np.nan, 30, 5])}
+    assert node(cols).values.tolist() == ["c", "b", "a", "b"]
+
+
+@pyt.mark.parametrize(
+    "q",
+    [
+        m.Q(first_name__icontains="a"),
+        m.Q(first_name__startswith="a"),
+        m.Q(data__has_key="height"),
+        m.Q(data__height__contains=1),
+        m.Q(missing__exact=1),
+    ],
+)
+def test_unsupported_lookups(q):
+    compiler = _VectorCompiler(Person)
+    with pyt.raises(FieldError):
+        compiler.compile(m.Case(m.When(q, then=m.Value("a"))))
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:52
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+import virtual_fields.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredVirtualModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("first_name", models.CharField(max_length=100)),
+                ("last_name", models.CharField(max_length=100)),
+                ("dob", models.DateField(blank=True, null=True)),
+                (
+                    "full_name",
+                    virtual_fields.fields.VirtualField(
+                        django.db.models.functions.text.Concat(
+                            "first_name", models.Value(" "), "last_name"
+                        ),
+                        defer=False,
+                        materialize="stored",
+                        max_length=201,
+                        output_field=models.CharField(max_length=201),
+                    ),
+                ),
+                (
+                    "yob",
+                    virtual_fields.fields.VirtualField(
+                        models.F("dob__year"),
+                        defer=False,
+                        materialize="stored",
+                        null=True,
+                        output_field=models.IntegerField(null=True),
+                    ),
+                ),
+                (
+                    "initials",
+                    virtual_fields.fields.VirtualField(
+                        django.db.models.functions.text.Concat(
+                            django.db.models.functions.text.Left("first_name", 1),
+                            django.db.models.functions.text.Left("last_name", 1),
+                        ),
+                        defer=True,
+                        materialize="stored",
+                        max_length=2,
+                        output_field=models.CharField(max_length=2),
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:58
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+import virtual_fields.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0002_storedvirtualmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexedVirtualModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("first_name", models.CharField(max_length=100)),
+                ("last_name", models.CharField(max_length=100)),
+                ("dob", models.DateField(blank=True, null=True)),
+                (
+                    "full_name",
+                    virtual_fields.fields.VirtualField(
+                        django.db.models.functions.text.Concat(
+                            "first_name", models.Value(" "), "last_name"
+                        ),
+                        db_index=True,
+                        defer=False,
+                        max_length=201,
+                        output_field=models.CharField(max_length=201),
+                    ),
+                ),
+                (
+                    "yob",
+                    virtual_fields.fields.VirtualField(
+                        models.F("dob__year"),
+                        defer=False,
+                        null=True,
+                        output_field=models.IntegerField(null=True),
+                    ),
+                ),
+                (
+                    "age",
+                    virtual_fields.fields.VirtualField(
+                        models.F("yob"), output_field=models.IntegerField()
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        models.OrderBy(
+                            virtual_fields.fields.VirtualRef("age"), descending=True
+                        ),
+                        models.F("last_name"),
+                        name="app_indexed_age_idx",
+                    ),
+                    models.Index(
+                        virtual_fields.fields.VirtualRef("full_name"),
+                        name="app_indexed_full_na_cfef95_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:03
+
+import django.db.models.functions.datetime
+import django.db.models.functions.text
+from django.db import migrations, models
+
+import virtual_fields.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0003_indexedvirtualmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UniqueVirtualModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("first_name", models.CharField(max_length=100)),
+                ("last_name", models.CharField(max_length=100)),
+                ("joined", models.DateField()),
+                (
+                    "full_name",
+                    virtual_fields.fields.VirtualField(
+                        django.db.models.functions.text.Concat(
+                            "first_name", models.Value(" "), "last_name"
+                        ),
+                        max_length=201,
+                        output_field=models.CharField(max_length=201),
+                        unique=True,
+                    ),
+                ),
+                (
+                    "initials",
+                    virtual_fields.fields.VirtualField(
+                        django.db.models.functions.text.Concat(
+                            django.db.models.functions.text.Left("first_name", 1),
+                            django.db.models.functions.text.Left("last_name", 1),
+                        ),
+                        max_length=2,
+                        output_field=models.CharField(max_length=2),
+                        unique_for_year="joined",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="uniquevirtualmodel",
+            constraint=models.UniqueConstraint(
+                virtual_fields.fields.VirtualRef("full_name"),
+                name="app_uniquev_full_na_55e203_uq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="uniquevirtualmodel",
+            constraint=models.UniqueConstraint(
+                virtual_fields.fields.VirtualRef("initials"),
+                django.db.models.functions.datetime.ExtractYear("joined"),
+                name="app_uniquev_initial_adbd89_uq",
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:07
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+import virtual_fields.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0004_uniquevirtualmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShadowVirtualModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=100)),
+                (
+                    "authored_by",
+                    virtual_fields.fields.VirtualField(
+                        models.F("author__full_name"),
+                        defer=False,
+                        materialize="shadow",
+                        max_length=201,
+                        null=True,
+                        output_field=models.CharField(max_length=201, null=True),
+                    ),
+                ),
+                (
+                    "title_length",
+                    virtual_fields.fields.VirtualField(
+                        django.db.models.functions.text.Length("title"),
+                        defer=False,
+                        materialize="shadow",
+                        null=True,
+                        output_field=models.IntegerField(null=True),
+                    ),
+                ),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="app.indexedvirtualmodel",
+                    ),
+                ),
+            ],
+        ),
+    ]
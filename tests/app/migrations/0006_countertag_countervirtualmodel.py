@@ -0,0 +1,100 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:11
+
+import django.db.models.aggregates
+import django.db.models.deletion
+from django.db import migrations, models
+
+import virtual_fields.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0005_shadowvirtualmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CounterTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                (
+                    "num_items",
+                    virtual_fields.fields.VirtualField(
+                        django.db.models.aggregates.Count("items"),
+                        defer=False,
+                        materialize="counter",
+                        null=True,
+                        output_field=models.IntegerField(null=True),
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="CounterVirtualModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=100)),
+                ("score", models.IntegerField(default=0)),
+                (
+                    "num_children",
+                    virtual_fields.fields.VirtualField(
+                        django.db.models.aggregates.Count("children"),
+                        defer=False,
+                        materialize="counter",
+                        null=True,
+                        output_field=models.IntegerField(null=True),
+                    ),
+                ),
+                (
+                    "total_score",
+                    virtual_fields.fields.VirtualField(
+                        django.db.models.aggregates.Sum("children__score"),
+                        defer=False,
+                        materialize="counter",
+                        null=True,
+                        output_field=models.IntegerField(null=True),
+                    ),
+                ),
+                (
+                    "num_tags",
+                    virtual_fields.fields.VirtualField(
+                        django.db.models.aggregates.Count("tags"),
+                        defer=False,
+                        materialize="counter",
+                        null=True,
+                        output_field=models.IntegerField(null=True),
+                    ),
+                ),
+                (
+                    "parent",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="children",
+                        to="app.countervirtualmodel",
+                    ),
+                ),
+                (
+                    "tags",
+                    models.ManyToManyField(related_name="items", to="app.countertag"),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0006_countertag_countervirtualmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CachedVirtualModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=100)),
+                (
+                    "parent",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="children",
+                        to="app.cachedvirtualmodel",
+                    ),
+                ),
+            ],
+        ),
+    ]
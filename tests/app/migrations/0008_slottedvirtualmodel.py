@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0007_cachedvirtualmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlottedVirtualModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("first_name", models.CharField(max_length=100)),
+                ("last_name", models.CharField(max_length=100)),
+            ],
+        ),
+    ]
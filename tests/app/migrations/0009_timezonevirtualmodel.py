@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0008_slottedvirtualmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TimezoneVirtualModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("published_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0009_timezonevirtualmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InternVirtualModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data", models.JSONField(default=dict)),
+            ],
+        ),
+    ]
@@ -11,6 +11,9 @@ from uuid import UUID
 from django.core.exceptions import FieldDoesNotExist
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models as m
+from django.db.models import Value
+from django.db.models.fields.json import KT
+from django.db.models.functions import Concat, Left, Length, Upper
 from typing_extensions import Self
 
 from examples.faker import ufaker
@@ -246,3 +249,166 @@ class ProxyMeta:
     def __init_subclass__(cls) -> None:
         cls.proxy = cls.__dict__.get("proxy", True)
         cls.app_label = cls.__dict__.get("app_label", "app")
+
+
+class StoredVirtualModel(m.Model):
+    first_name = m.CharField(max_length=100)
+    last_name = m.CharField(max_length=100)
+    dob = m.DateField(blank=True, null=True)
+
+    full_name = VirtualField[m.CharField](
+        Concat("first_name", Value(" "), "last_name"),
+        materialize="stored",
+        max_length=201,
+    )
+    yob = VirtualField[m.IntegerField]("dob__year", materialize="stored", null=True)
+    initials = VirtualField[m.CharField](
+        Concat(Left("first_name", 1), Left("last_name", 1)),
+        materialize="stored",
+        max_length=2,
+        defer=True,
+    )
+
+
+class IndexedVirtualModel(m.Model):
+    first_name = m.CharField(max_length=100)
+    last_name = m.CharField(max_length=100)
+    dob = m.DateField(blank=True, null=True)
+
+    full_name = VirtualField[m.CharField](
+        Concat("first_name", Value(" "), "last_name"),
+        max_length=201,
+        db_index=True,
+        defer=False,
+    )
+    yob = VirtualField[m.IntegerField]("dob__year", null=True, defer=False)
+    age = VirtualField[m.IntegerField]("yob")
+
+    class Meta:
+        indexes = [
+            m.Index(fields=["-age", "last_name"], name="app_indexed_age_idx"),
+        ]
+
+
+class UniqueVirtualModel(m.Model):
+    first_name = m.CharField(max_length=100)
+    last_name = m.CharField(max_length=100)
+    joined = m.DateField()
+
+    full_name = VirtualField[m.CharField](
+        Concat("first_name", Value(" "), "last_name"), max_length=201, unique=True
+    )
+    initials = VirtualField[m.CharField](
+        Concat(Left("first_name", 1), Left("last_name", 1)),
+        max_length=2,
+        unique_for_year="joined",
+    )
+
+
+class ShadowVirtualModel(m.Model):
+    author = m.ForeignKey(IndexedVirtualModel, m.CASCADE)
+    title = m.CharField(max_length=100)
+
+    authored_by = VirtualField[m.CharField](
+        "author__full_name", materialize="shadow", max_length=201
+    )
+    title_length = VirtualField[m.IntegerField](Length("title"), materialize="shadow")
+
+
+class CounterTag(m.Model):
+    name = m.CharField(max_length=100)
+
+    num_items = VirtualField[m.IntegerField](m.Count("items"), materialize="counter")
+
+
+class CounterVirtualModel(m.Model):
+    title = m.CharField(max_length=100)
+    score = m.IntegerField(default=0)
+    parent = m.ForeignKey("self", m.CASCADE, null=True, related_name="children")
+    tags = m.ManyToManyField(CounterTag, related_name="items")
+
+    num_children = VirtualField[m.IntegerField](
+        m.Count("children"), materialize="counter"
+    )
+    total_score = VirtualField[m.IntegerField](
+        m.Sum("children__score"), materialize="counter"
+    )
+    num_tags = VirtualField[m.IntegerField](m.Count("tags"), materialize="counter")
+    has_children = VirtualField[m.BooleanField](m.Q(num_children__gt=0))
+
+
+class CachedVirtualModel(m.Model):
+    title = m.CharField(max_length=100)
+    parent = m.ForeignKey("self", m.CASCADE, null=True, related_name="children")
+
+    num_children = VirtualField[m.IntegerField](
+        m.Count("children"), cache_backend="default", cache_timeout=60
+    )
+    title_length = VirtualField[m.IntegerField](Length("title"), cache_ttl=60)
+    title_upper = VirtualField[m.CharField](
+        Upper("title"), cache_ttl=60, stale_while_revalidate=True, max_length=100
+    )
+
+
+class SlottedVirtualModel(m.Model):
+    first_name = m.CharField(max_length=100)
+    last_name = m.CharField(max_length=100)
+
+    full_name = VirtualField[m.CharField](
+        Concat("first_name", Value(" "), "last_name"), storage="slots", max_length=201
+    )
+    initials = VirtualField[m.CharField](
+        Concat(Left("first_name", 1), Left("last_name", 1)),
+        storage="slots",
+        max_length=2,
+    )
+    first_upper = VirtualField[m.CharField](
+        Upper("first_name"), storage="slots", max_length=100
+    )
+    last_upper = VirtualField[m.CharField](
+        Upper("last_name"), storage="slots", max_length=100
+    )
+    name_length = VirtualField[m.IntegerField](
+        Length("first_name") + Length("last_name"), storage="slots"
+    )
+    first_length = VirtualField[m.IntegerField](
+        Length("first_name"), storage="slots", cache_ttl=60
+    )
+
+
+class TimezoneVirtualModel(m.Model):
+    published_at = m.DateTimeField()
+
+    hour = VirtualField[m.IntegerField]("published_at__hour")
+    next_hour = VirtualField[m.IntegerField](m.F("hour") + 1)
+
+
+class InternSize(m.TextChoices):
+    small = "Small"
+    large = "Large"
+
+
+class InternVirtualModel(m.Model):
+    data = m.JSONField(default=dict)
+
+    city = VirtualField[m.CharField](KT("data__city"), intern=True)
+    country = VirtualField[m.CharField](KT("data__country"), defer=False, intern=True)
+    size = VirtualField[m.CharField](
+        KT("data__size"), defer=False, choices=InternSize.choices
+    )
+    street = VirtualField[m.CharField](KT("data__street"), defer=False)
+
+
+class LazyVirtualModel(m.Model):
+    title = m.CharField(max_length=100)
+    data = m.JSONField(default=dict)
+    parent = m.ForeignKey("self", m.CASCADE, null=True, related_name="children")
+
+    height = VirtualField[m.DecimalField](
+        KT("data__height"),
+        decimal_places=2,
+        max_digits=8,
+        defer=False,
+        cast=True,
+        lazy_conversion=True,
+    )
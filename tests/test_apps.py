@@ -0,0 +1,44 @@
+import pytest as pyt
+from django.apps import apps
+from django.core.exceptions import FieldError, ImproperlyConfigured
+
+from examples.example_01.models import Person, Post
+from virtual_fields.apps import warm_up
+
+
+def _cleared(*models):
+    for model in models:
+        for field in model._meta.virtual_fields.values():
+            for name in ("has_joins", "is_returnable", "on_model_save"):
+                field.__dict__.pop(name, None)
+    return models
+
+
+def test_warm_up():
+    warm_up(_cleared(Person, Post))
+    for model in (Person, Post):
+        for field in model._meta.virtual_fields.values():
+            assert {*field._warm_up_attrs_} <= {*field.__dict__}
+
+
+def test_warm_up_errors(monkeypatch: pyt.MonkeyPatch):
+    field = Post._meta.get_field("num_likes")
+
+    def fail():
+        raise FieldError("bad expression")
+
+    monkeypatch.setattr(field, "warm_up", fail)
+    with pyt.raises(ImproperlyConfigured, match="num_likes.*bad expression"):
+        warm_up([Post])
+
+
+def test_warm_up_on_ready(settings):
+    config = apps.get_app_config("virtual_fields")
+    _cleared(Person)
+    settings.VIRTUAL_FIELDS_WARM_UP = False
+    config.ready()
+    assert "has_joins" not in Person._meta.get_field("yob").__dict__
+
+    settings.VIRTUAL_FIELDS_WARM_UP = True
+    config.ready()
+    assert "has_joins" in Person._meta.get_field("yob").__dict__
@@ -0,0 +1,172 @@
+import time
+from collections import abc
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import md5
+from logging import getLogger
+from threading import Lock
+from typing import TYPE_CHECKING
+from weakref import ref
+
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import connections, router
+from django.db.models import DEFERRED
+
+if TYPE_CHECKING:
+    from .fields import VirtualField, VirtualFieldDescriptor
+    from .models import VirtualizedModel
+
+logger = getLogger(__name__)
+
+_LOADED = "_virtual_loaded_"
+_executor: ThreadPoolExecutor | None = None
+
+
+class _SharedCache:
+    """The values of a virtual field in one of the project's cache backends."""
+
+    __slots__ = ("field", "alias", "timeout", "version")
+
+    lock_timeout = 10
+    lock_wait = 0.5
+
+    def __init__(self, field: "VirtualField"):
+        self.field, self.alias = field, field.cache_backend
+        self.timeout = field.cache_timeout
+        out = field.output_field
+        schema = repr((field.raw_expression, out and out.deconstruct()[1:]))
+        self.version = md5(schema.encode()).hexdigest()[:8]
+
+    @property
+    def backend(self) -> BaseCache:
+        return caches[self.alias]
+
+    def make_key(self, pk) -> str:
+        label, name = self.field.model._meta.label_lower, self.field.name
+        return f"virtual_fields:{label}:{pk}:{name}:{self.version}"
+
+    def get_many(self, pks: abc.Collection, using=None) -> dict:
+        """The values for `pks`, read through the cache.
+
+        Only one caller computes a missing key, the others wait for it up to
+        `lock_wait` seconds before computing it too.
+        """
+        backend, keys = self.backend, {self.make_key(pk): pk for pk in pks}
+        values = {keys[k]: v for k, v in backend.get_many(keys).items()}
+        if missing := [pk for pk in pks if pk not in values]:
+            locks = {pk: f"{self.make_key(pk)}:lock" for pk in missing}
+            owned = {
+                pk for pk in missing if backend.add(locks[pk], 1, self.lock_timeout)
+            }
+            try:
+                fetched = dict(self.field.iter_db_values(owned, using))
+                backend.set_many(
+                    {self.make_key(pk): v for pk, v in fetched.items()},
+                    self.timeout,
+                )
+            finally:
+                owned and backend.delete_many([locks[pk] for pk in owned])
+            values.update(fetched)
+
+            waiting = [pk for pk in missing if pk not in owned]
+            values.update(self.wait_for(waiting))
+            if waiting := [pk for pk in waiting if pk not in values]:
+                values.update(self.field.iter_db_values(waiting, using))
+        return values
+
+    def wait_for(self, pks: list) -> dict:
+        backend, values, delay = self.backend, {}, 0.01
+        deadline = time.monotonic() + self.lock_wait
+        while pks and time.monotonic() < deadline:
+            time.sleep(delay)
+            keys = {self.make_key(pk): pk for pk in pks}
+            values.update((keys[k], v) for k, v in backend.get_many(keys).items())
+            pks, delay = [pk for pk in pks if pk not in values], delay * 2
+        return values
+
+    def delete_many(self, pks: abc.Iterable):
+        if keys := [self.make_key(pk) for pk in pks if pk is not None]:
+            self.backend.delete_many(keys)
+
+
+def _invalidate_shared(
+    objs: abc.Iterable["VirtualizedModel"], fields: abc.Iterable["VirtualField"]
+):
+    """Drop the shared cache entries of `fields` for `objs`."""
+    fields = [f for f in fields if f.cache_backend is not None]
+    if fields:
+        pks = [obj.pk for obj in objs]
+        for field in fields:
+            field.shared_cache.delete_many(pks)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(1, thread_name_prefix="virtual_fields")
+    return _executor
+
+
+class _Revalidator:
+    """Stale values of a descriptor, reloaded in batches by a background thread.
+
+    The thread only queries the database. The reloaded values wait in `results`
+    until the descriptor takes them on the next access to a stale instance.
+    """
+
+    __slots__ = ("descriptor", "lock", "queued", "waiting", "results", "future")
+
+    def __init__(self, descriptor: "VirtualFieldDescriptor"):
+        self.descriptor, self.lock = descriptor, Lock()
+        self.queued: dict[str, set] = {}
+        self.waiting: set[tuple] = set()
+        self.results: dict[tuple, tuple] = {}
+        self.future = None
+
+    @staticmethod
+    def get_key(obj: "VirtualizedModel") -> tuple:
+        return obj._state.db or router.db_for_read(type(obj), instance=obj), obj.pk
+
+    def is_waiting(self, obj: "VirtualizedModel") -> bool:
+        return self.get_key(obj) in self.waiting
+
+    def schedule(self, objs: abc.Iterable["VirtualizedModel"]):
+        with self.lock:
+            submit = not self.queued
+            for obj in objs:
+                key = self.get_key(obj)
+                if key[1] is not None and key not in self.waiting:
+                    self.queued.setdefault(key[0], set()).add(key[1])
+                    self.waiting.add(key)
+            if submit and self.queued:
+                self.future = _get_executor().submit(self.flush)
+
+    def take(self, obj: "VirtualizedModel"):
+        """The reloaded value for `obj`, `DEFERRED` if there is none yet."""
+        with self.lock:
+            landed = self.results.pop(self.get_key(obj), None)
+        if landed is None:
+            return DEFERRED
+        val = landed[0]
+        return self.descriptor.get_default() if val is None else val
+
+    def flush(self):
+        with self.lock:
+            queued, self.queued = self.queued, {}
+        field, ttl = self.descriptor.field, self.descriptor.ttl
+        for using, pks in queued.items():
+            rows = ()
+            try:
+                rows = [*field.iter_db_values(pks, using)]
+            except Exception:
+                logger.exception("Failed to revalidate %s.", field)
+            finally:
+                connections[using].close()
+            now = time.monotonic()
+            with self.lock:
+                # Values that nothing took within a ttl are dropped.
+                expired = [k for k, (_, t) in self.results.items() if t + ttl <= now]
+                for key in expired:
+                    del self.results[key]
+                self.results.update(((using, pk), (v, now)) for pk, v in rows)
+                self.waiting.difference_update((using, pk) for pk in pks)
@@ -1,17 +1,46 @@
 from abc import ABC, abstractmethod
 from collections import abc
+from contextvars import ContextVar
 from functools import cached_property, partial, wraps
 from typing import TYPE_CHECKING, ClassVar, TypeVar
-from weakref import WeakSet
+from weakref import WeakSet, ref
+from zlib import crc32
 
 from django.apps import apps
+from django.core.exceptions import FieldError
+from django.db import connections
 from django.db import models as m
+from django.db import transaction
+from django.db.models.expressions import Col
+from django.db.models.manager import BaseManager
 from django.db.models.options import Options
-from django.db.models.query import QuerySet
+from django.db.models.query import ModelIterable, QuerySet
 from django.dispatch import receiver
 from typing_extensions import Self
 
+from ._cache import _invalidate_shared
+from ._counters import get_child_counters
+from ._shadow import get_related_shadows
+from ._util import (
+    _affected_by,
+    _can_return_virtual,
+    _db_instance_qs,
+    _drop_virtual,
+    _forget_changed,
+    _inline_params,
+    _iter_nodes,
+    _iter_pk_chunks,
+    _LazyConversion,
+    _Peers,
+    _update_shadow_columns,
+    _VirtualReload,
+    _VirtualSlots,
+    _VirtualTable,
+)
+
 if TYPE_CHECKING:
+    import numpy as np
+    from django.db.models.sql.query import Query
     from .fields import VirtualField
     from .models import VirtualizedModel, VirtualizedOptions
 
@@ -19,6 +48,31 @@ if TYPE_CHECKING:
 _T_Model = TypeVar("_T_Model", bound="VirtualizedModel", covariant=True)
 _T_Field = TypeVar("_T_Field", bound=m.Field, covariant=True)
 
+_active_query: ContextVar["Query | None"] = ContextVar("_active_query", default=None)
+_pending_reload: ContextVar["_VirtualReload | None"] = ContextVar(
+    "_pending_reload", default=None
+)
+_pending_returning: ContextVar["_VirtualReload | None"] = ContextVar(
+    "_pending_returning", default=None
+)
+
+_virtual_options_properties = (
+    "virtual_fields",
+    "cached_virtual_fields",
+    "deferred_virtual_fields",
+    "concrete_virtual_fields",
+    "shadow_virtual_fields",
+    "virtual_fields_to_delete_on_refresh",
+    "virtual_fields_to_reload_on_refresh",
+    "virtual_fields_to_delete_on_save",
+    "virtual_fields_to_reload_on_save",
+    "virtual_fields_to_delete_on_add",
+    "virtual_fields_to_reload_on_add",
+    "virtual_field_dependents",
+    "virtual_field_slots",
+    "virtual_field_layout",
+)
+
 
 def _on_class_prepared(sender: type["VirtualizedModel"], *, disconnect=None, **kwds):
     from .models import ImplementsVirtualFields
@@ -100,6 +154,29 @@ def _patch_model_options():
     def concrete_virtual_fields(self: "VirtualizedOptions"):
         return {k for k, v in self.virtual_fields.items() if v.concrete}
 
+    @patch(wrap=cached_property)
+    def shadow_virtual_fields(self: "VirtualizedOptions"):
+        return {k: v for k, v in self.virtual_fields.items() if v.is_shadow}
+
+    @patch(wrap=cached_property)
+    def virtual_field_dependents(self: "VirtualizedOptions"):
+        dependents = {}
+        for name, field in self.virtual_fields.items():
+            for attname in field.concrete_dependencies or ():
+                dependents.setdefault(attname, []).append(name)
+        return {k: tuple(v) for k, v in dependents.items()}
+
+    @patch(wrap=cached_property)
+    def virtual_field_slots(self: "VirtualizedOptions"):
+        names = [n for n, f in self.virtual_fields.items() if f.storage == "slots"]
+        return _VirtualSlots.define(self.model, names)
+
+    @patch(wrap=cached_property)
+    def virtual_field_layout(self: "VirtualizedOptions"):
+        fields = tuple(self.cached_virtual_fields.values())
+        key = crc32(",".join(f.attname for f in fields).encode())
+        return key, fields
+
     @patch(wrap=cached_property)
     def virtual_fields_to_delete_on_refresh(self: "VirtualizedOptions"):
         from virtual_fields.fields import Behaviour
@@ -142,29 +219,555 @@ def _patch_model_options():
         fields = self._iter_virtual_fields("on_model_add", Behaviour.RELOAD)
         return {field.name: field for field in fields}
 
-    Options.REVERSE_PROPERTIES |= {
-        "virtual_fields",
-        "cached_virtual_fields",
-        "deferred_virtual_fields",
-        "concrete_virtual_fields",
-        "virtual_fields_to_delete_on_refresh",
-        "virtual_fields_to_reload_on_refresh",
-        "virtual_fields_to_delete_on_save",
-        "virtual_fields_to_reload_on_save",
-        "virtual_fields_to_delete_on_add",
-        "virtual_fields_to_reload_on_add",
-    }
+    Options.REVERSE_PROPERTIES |= {*_virtual_options_properties}
 
 
-def _install():
-    _patch_model_options()
-    if not hasattr(QuerySet, "select_virtual"):
+def _patch_queryset():
+    patch = _patcher(cls=QuerySet)
 
-        def select_virtual(self: QuerySet[_T_Model], *fields) -> QuerySet[_T_Model]:
-            opts, qs = self.model._meta, self._chain()
-            allowed = opts.virtual_fields
-            for name in fields:
-                qs = allowed[name].add_to_query(qs)
-            return qs
+    @patch()
+    def select_virtual(self: QuerySet[_T_Model], *fields) -> QuerySet[_T_Model]:
+        opts, qs = self.model._meta, self._chain()
+        allowed = opts.virtual_fields
+        for name in fields:
+            qs = allowed[name].add_to_query(qs)
+        return qs
+
+    @patch()
+    def share_virtual(self: QuerySet[_T_Model], *fields) -> QuerySet[_T_Model]:
+        opts, qs = self.model._meta, self._chain()
+        allowed = {n: f for n, f in opts.virtual_fields.items() if f.is_returnable}
+        if invalid := [n for n in fields if n not in allowed]:
+            raise FieldError(
+                f"Cannot share virtual fields {', '.join(invalid)}. Only fields "
+                f"without joins, aggregates, windows or subqueries can be shared."
+            )
+        query, fields = qs.query, tuple(fields or allowed)
+        table = query.alias_map[alias := query.get_initial_alias()]
+        table = _VirtualTable(table.table_name, alias, qs.model, fields)
+        query.alias_map[alias] = table
+        return qs
 
-        QuerySet.select_virtual = select_virtual
+    @patch()
+    def refresh_virtual(
+        self: QuerySet[_T_Model],
+        objs: abc.Iterable[_T_Model],
+        *fields: str,
+        chunk_size: int = None,
+    ) -> None:
+        fields, groups = fields or [*self.model._meta.cached_virtual_fields], {}
+        for obj in objs:
+            groups.setdefault(self._db or obj._state.db or self.db, []).append(obj)
+        for using, items in groups.items():
+            _VirtualReload(self.model, fields).load(items, using, chunk_size)
+
+    @patch()
+    def evaluate_virtual_vectorized(
+        self: QuerySet[_T_Model],
+        *fields: str,
+        chunk_size: int = 10_000,
+        attach: abc.Iterable[_T_Model] = None,
+    ) -> dict[str, "np.ndarray"]:
+        from ._vector import _VectorPlan
+
+        opts = self.model._meta
+        if invalid := [n for n in fields if n not in opts.virtual_fields]:
+            raise FieldError(f"Unknown virtual fields {', '.join(invalid)}.")
+        fields = [opts.virtual_fields[name] for name in fields]
+        arrays = _VectorPlan(self.model, fields).evaluate(self, chunk_size)
+        if attach is not None:
+            index = {pk: i for i, pk in enumerate(arrays["pk"].tolist())}
+            for obj in attach:
+                if (i := index.get(obj.pk)) is None:
+                    continue
+                for field in fields:
+                    value = _VectorPlan.to_python(field, arrays[field.name][i])
+                    setattr(obj, field.attname, value)
+        return arrays
+
+    for name in (
+        "select_virtual",
+        "share_virtual",
+        "refresh_virtual",
+        "evaluate_virtual_vectorized",
+    ):
+        _patcher(cls=BaseManager)(name, _manager_method(name))
+
+    _orig = QuerySet._fetch_all
+    if getattr(_orig, "_supports_virtual_fields_", False):
+        return
+
+    @wraps(_orig)
+    def _fetch_all(self: QuerySet[_T_Model]):
+        if fetched := self._result_cache is None:
+            if (reload := _pending_reload.get()) is not None:
+                if reload.values is None and reload.model is self.model:
+                    reload.add_to_query(self)
+                else:
+                    reload = None
+
+        _orig(self)
+        if fetched and issubclass(self._iterable_class, ModelIterable):
+            if reload is not None:
+                reload.collect(self._result_cache)
+            if self.model._meta.deferred_virtual_fields:
+                _set_virtual_peers(self._result_cache)
+
+    _fetch_all._supports_virtual_fields_ = True
+    QuerySet._fetch_all = _fetch_all
+
+    _insert = QuerySet._insert
+
+    @wraps(_insert)
+    def _insert_impl(self: QuerySet, objs, fields, returning_fields=None, *a, **kw):
+        # `bulk_create()` inserts `opts.concrete_fields`, which includes the
+        # non-deferred virtual fields.
+        fields = [f for f in fields if getattr(f, "is_virtual", False) is not True]
+        returning = _pending_returning.get()
+        if returning is None or returning_fields is None or not objs:
+            return _insert(self, objs, fields, returning_fields, *a, **kw)
+        elif self.model._meta.concrete_model is not returning.model:
+            return _insert(self, objs, fields, returning_fields, *a, **kw)
+
+        virtual, n = objs[0]._meta.virtual_fields, len(returning_fields)
+        extra = [virtual[name] for name in returning.fields]
+        rows = _insert(self, objs, fields, [*returning_fields, *extra], *a, **kw)
+        returning.assign(objs, (row[n:] for row in rows))
+        return [row[:n] for row in rows]
+
+    _insert_impl._supports_virtual_fields_ = True
+    QuerySet._insert = _insert_impl
+
+    _bulk_create = QuerySet.bulk_create
+
+    @wraps(_bulk_create)
+    def bulk_create(self: QuerySet[_T_Model], objs, *args, **kwargs):
+        opts = self.model._meta
+        deletes = opts.virtual_fields_to_delete_on_add
+        reloads = opts.virtual_fields_to_reload_on_add
+        shadows = opts.shadow_virtual_fields
+        counters = get_child_counters(self.model)
+        deferred = opts.deferred_virtual_fields
+        if not (deletes or reloads or shadows or counters or deferred):
+            return _bulk_create(self, objs, *args, **kwargs)
+
+        self._for_write, returning = True, None
+        if reloads and _can_bulk_return_virtual(connections[self.db]):
+            names = [n for n, f in reloads.items() if f.is_returnable]
+            returning = _VirtualReload(opts.concrete_model, names) if names else None
+
+        token = _pending_returning.set(returning)
+        try:
+            objs = _bulk_create(self, objs, *args, **kwargs)
+        finally:
+            _pending_returning.reset(token)
+
+        _fill_shadow_columns(self, objs, shadows)
+        for counter in counters:
+            counter.on_bulk_create(self.db, objs)
+        _apply_bulk_behaviours(self, objs, deletes, reloads, returning)
+        return objs
+
+    bulk_create._supports_virtual_fields_ = True
+    QuerySet.bulk_create = bulk_create
+
+    _bulk_update = QuerySet.bulk_update
+
+    @wraps(_bulk_update)
+    def bulk_update(self: QuerySet[_T_Model], objs, fields, *args, **kwargs):
+        opts = self.model._meta
+        changed = {opts.get_field(name).attname for name in fields}
+        deletes = _affected_by(opts.virtual_fields_to_delete_on_save, changed)
+        reloads = _affected_by(opts.virtual_fields_to_reload_on_save, changed)
+        if not (deletes or reloads or opts.deferred_virtual_fields):
+            return _bulk_update(self, objs, fields, *args, **kwargs)
+
+        objs = tuple(objs)
+        rows = _bulk_update(self, objs, fields, *args, **kwargs)
+        for obj in objs:
+            _forget_changed(obj, changed)
+        _apply_bulk_behaviours(self, objs, deletes, reloads)
+        return rows
+
+    bulk_update._supports_virtual_fields_ = True
+    QuerySet.bulk_update = bulk_update
+
+    _update = QuerySet.update
+
+    @wraps(_update)
+    def update(self: QuerySet[_T_Model], **kwargs):
+        opts = self.model._meta
+        # Shadow and counter columns written alone do not affect other columns.
+        fields = [opts.get_field(name) for name in kwargs]
+        changed = {f.attname for f in fields if not getattr(f, "is_virtual", False)}
+        shadows = changed and {
+            name: field
+            for name, field in _affected_by(opts.shadow_virtual_fields, changed).items()
+            if name not in kwargs
+        }
+        related = changed and [
+            r for r in get_related_shadows(self.model) if r.is_affected(changed)
+        ]
+        counters = changed and [
+            c for c in get_child_counters(self.model) if c.is_affected(changed)
+        ]
+        if not (shadows or related or counters) or self.query.is_sliced:
+            return _update(self, **kwargs)
+
+        # The parents children move away from are only known before the update.
+        moved = any(c.relation.field.attname in changed for c in counters)
+        self._for_write = True
+        with transaction.atomic(using=self.db, savepoint=False):
+            if not moved and _has_stable_filters(self, changed):
+                # Updated rows are selected again through a subquery.
+                rows, paged = _update(self, **kwargs), False
+                pages = [self.values("pk")]
+            else:
+                # Each page is selected before the update may change which rows
+                # the filters match.
+                rows, pages, paged = 0, _iter_pk_pages(self), True
+            for pks in pages:
+                old = {c: {*c.get_parents(self.db, pks)} for c in counters if moved}
+                if paged:
+                    page = _db_instance_qs(self.model, self.db).filter(pk__in=pks)
+                    rows += _update(page, **kwargs)
+                if shadows:
+                    _update_shadow_columns(shadows.values(), self.db, pk__in=pks)
+                for relation in related:
+                    relation.refresh(self.db, pks)
+                for counter in counters:
+                    parents = counter.get_parents(self.db, pks)
+                    if moved:
+                        parents = {*parents, *old[counter]}
+                    counter.refresh(self.db, parents)
+        return rows
+
+    update._supports_virtual_fields_ = True
+    QuerySet.update = update
+
+
+def _has_stable_filters(qs: QuerySet, changed: abc.Set[str]) -> bool:
+    """Whether the rows `qs` matches stay the same when `changed` is written."""
+    if not connections[qs.db].features.update_can_self_select:
+        return False
+    for node in _iter_nodes(qs.query.where):
+        if getattr(node, "subquery", False):
+            return False
+        if isinstance(node, Col) and (
+            node.target.attname in changed or getattr(node.target, "is_virtual", False)
+        ):
+            return False
+    return True
+
+
+def _iter_pk_pages(qs: QuerySet):
+    """The pks of `qs` page by page, each selected after the previous one is used."""
+    size = connections[qs.db].features.max_query_params or 10_000
+    qs, pks = qs.order_by("pk").values_list("pk", flat=True), None
+    while pks is None or len(pks) == size:
+        pks = [*(qs if pks is None else qs.filter(pk__gt=pks[-1]))[:size]]
+        if pks:
+            yield pks
+
+
+def _manager_method(name: str):
+    def method(self: BaseManager, *args, **kwargs):
+        return getattr(self.get_queryset(), name)(*args, **kwargs)
+
+    method.__name__ = method.__qualname__ = name
+    return method
+
+
+def _can_bulk_return_virtual(connection):
+    if not connection.features.can_return_rows_from_bulk_insert:
+        return False
+    return _can_return_virtual(connection)
+
+
+def _fill_shadow_columns(
+    qs: QuerySet[_T_Model],
+    objs: abc.Sequence["VirtualizedModel"],
+    shadows: abc.Mapping[str, "VirtualField"],
+):
+    if not shadows or not objs:
+        return
+    elif None not in (pks := [obj.pk for obj in objs]):
+        for chunk in _iter_pk_chunks(pks, qs.db):
+            _update_shadow_columns(shadows.values(), qs.db, pk__in=chunk)
+        return
+    # Without the primary keys, fill the rows whose columns were never computed.
+    for name, field in shadows.items():
+        _update_shadow_columns((field,), qs.db, **{f"{name}__isnull": True})
+
+
+def _apply_bulk_behaviours(
+    qs: QuerySet[_T_Model],
+    objs: abc.Sequence["VirtualizedModel"],
+    deletes: abc.Mapping[str, "VirtualField"],
+    reloads: abc.Mapping[str, "VirtualField"],
+    returning: "_VirtualReload | None" = None,
+):
+    _invalidate_shared(objs, [*deletes.values(), *reloads.values()])
+    if returning and returning.values is not None:
+        reloads = [n for n in reloads if n not in returning.fields]
+
+    if deletes:
+        for obj in objs:
+            _drop_virtual(obj, deletes)
+
+    if reloads:
+        _VirtualReload(qs.model, reloads).load(objs, qs.db)
+
+    if qs.model._meta.deferred_virtual_fields:
+        _set_virtual_peers(objs)
+
+
+def _set_virtual_peers(objs: abc.Sequence["VirtualizedModel"]):
+    if len(objs) > 1:
+        peers = _Peers(map(ref, objs))
+        for obj in objs:
+            obj._state.virtual_peers = peers
+
+
+def _patch_sql_query():
+    from django.db.models.sql.compiler import SQLCompiler, SQLInsertCompiler
+    from django.db.models.sql.query import Query
+
+    if not getattr(_get_col := Query._get_col, "_supports_virtual_fields_", False):
+
+        @wraps(_get_col)
+        def _get_col_impl(self: Query, target, field, alias):
+            if getattr(target, "is_virtual", False) is True:
+                alias = alias if self.alias_cols else None
+                return target.get_col(alias, field, query=self)
+            return _get_col(self, target, field, alias)
+
+        _get_col_impl._supports_virtual_fields_ = True
+        Query._get_col = _get_col_impl
+
+    def activate(cls, name, get_query):
+        _orig = getattr(cls, name)
+        if getattr(_orig, "_supports_virtual_fields_", False):
+            return
+
+        @wraps(_orig)
+        def impl(self, *args, **kwargs):
+            token = _active_query.set(get_query(self))
+            try:
+                return _orig(self, *args, **kwargs)
+            finally:
+                _active_query.reset(token)
+
+        impl._supports_virtual_fields_ = True
+        setattr(cls, name, impl)
+
+    _as_sql = SQLInsertCompiler.as_sql
+    if not getattr(_as_sql, "_supports_virtual_fields_", False):
+
+        @wraps(_as_sql)
+        def as_sql(self: SQLInsertCompiler):
+            fields = self.returning_fields or ()
+            virtual = [f for f in fields if getattr(f, "is_virtual", False) is True]
+            if not virtual:
+                return _as_sql(self)
+
+            self.returning_fields = [f for f in fields if f not in virtual]
+            try:
+                [(sql, params)] = _as_sql(self)
+            finally:
+                self.returning_fields = fields
+
+            table = self.query.get_meta().db_table
+            cols = [self.compile(f.get_col(table)) for f in virtual]
+            sep = ", " if len(fields) > len(virtual) else " RETURNING "
+            sql = f"{sql}{sep}{', '.join(s for s, _ in cols)}"
+            return [(sql, (*params, *(p for _, ps in cols for p in ps)))]
+
+        as_sql._supports_virtual_fields_ = True
+        SQLInsertCompiler.as_sql = as_sql
+
+    _compile = SQLCompiler.compile
+    if not getattr(_compile, "_supports_virtual_fields_", False):
+
+        @wraps(_compile)
+        def compile(self: SQLCompiler, node):
+            memo = getattr(node, "_virtual_sql_", None)
+            if memo is None:
+                return _compile(self, node)
+            elif memo.aliases is not None and memo.node() is node:
+                return memo.compile(self, _compile)
+            sql, params = _compile(self, node)
+            if memo.inline and params:
+                return _inline_params(self.connection, sql, params)
+            return sql, params
+
+        compile._supports_virtual_fields_ = True
+        SQLCompiler.compile = compile
+
+    _get_converters = SQLCompiler.get_converters
+    if not getattr(_get_converters, "_supports_virtual_fields_", False):
+
+        @wraps(_get_converters)
+        def get_converters(self: SQLCompiler, expressions):
+            converters = _get_converters(self, expressions)
+            if not converters or not self.klass_info or self.query.values_select:
+                return converters
+            positions = _iter_model_positions(self.klass_info)
+            for pos in positions.intersection(converters):
+                convs, expr = converters[pos]
+                target = getattr(expr, "target", None)
+                if getattr(target, "lazy_conversion", False) is True:
+                    # Converted by the descriptor when the value is first read.
+                    converters[pos] = [_LazyConversion(convs)], expr
+            return converters
+
+        get_converters._supports_virtual_fields_ = True
+        SQLCompiler.get_converters = get_converters
+
+    for name in ("add_fields", "resolve_ref"):
+        activate(Query, name, lambda self: self)
+    for name in ("pre_sql_setup", "get_default_columns"):
+        activate(SQLCompiler, name, lambda self: self.query)
+
+
+def _iter_model_positions(klass_info: dict) -> set[int]:
+    """The select positions of the columns that populate model instances."""
+    positions = {*klass_info["select_fields"]}
+    for info in klass_info.get("related_klass_infos", ()):
+        positions |= _iter_model_positions(info)
+    return positions
+
+
+def _has_plain_column(field):
+    return getattr(field, "materialize", None) in ("shadow", "counter")
+
+
+def _patch_migrations():
+    from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+    from django.db.backends.sqlite3.schema import DatabaseSchemaEditor
+    from django.db.backends.utils import strip_quotes
+    from django.db.migrations.state import ModelState
+    from django.db.models.signals import class_prepared
+
+    _from_model = ModelState.from_model.__func__
+    if not getattr(_from_model, "_supports_virtual_fields_", False):
+
+        @wraps(_from_model)
+        def from_model(cls, model, *args, **kwargs):
+            state = _from_model(cls, model, *args, **kwargs)
+            for field in model._meta.private_fields:
+                if getattr(field, "materialize", None) or getattr(
+                    field, "is_indexed", False
+                ):
+                    for f in (*field.dependencies, field):
+                        if f.model is field.model:
+                            state.fields.setdefault(f.name, f.clone())
+            for name in ("indexes", "constraints"):
+                # Those added for `db_index` and `unique` are not in `original_attrs`.
+                items = getattr(model._meta, name)
+                if items and not state.options.get(name):
+                    state.options[name] = [i.clone() for i in items]
+            return state
+
+        from_model._supports_virtual_fields_ = True
+        ModelState.from_model = classmethod(from_model)
+
+    _alter_field = BaseDatabaseSchemaEditor.alter_field
+    if not getattr(_alter_field, "_supports_virtual_fields_", False):
+
+        @wraps(_alter_field)
+        def alter_field(self: BaseDatabaseSchemaEditor, model, old, new, *a, **kw):
+            fields = old, new
+            plain = all(_has_plain_column(f) for f in fields)
+            if not plain and any(getattr(f, "is_virtual", False) for f in fields):
+                conn = self.connection
+                if (old.db_parameters(conn), old.null) != (
+                    new.db_parameters(conn),
+                    new.null,
+                ):
+                    self.remove_field(model, old)
+                    return self.add_field(model, new)
+                elif not all(getattr(f, "is_stored", False) for f in fields):
+                    return
+            return _alter_field(self, model, old, new, *a, **kw)
+
+        alter_field._supports_virtual_fields_ = True
+        BaseDatabaseSchemaEditor.alter_field = alter_field
+
+    def remake(name, kwarg):
+        _orig = getattr(DatabaseSchemaEditor, name)
+        if getattr(_orig, "_supports_virtual_fields_", False):
+            return
+
+        @wraps(_orig)
+        def impl(self: DatabaseSchemaEditor, model, field):
+            if getattr(field, "is_stored", False):
+                return self._remake_table(model, **{kwarg: field})
+            elif getattr(field, "is_virtual", False) and not _has_plain_column(field):
+                return
+            return _orig(self, model, field)
+
+        impl._supports_virtual_fields_ = True
+        setattr(DatabaseSchemaEditor, name, impl)
+
+    remake("add_field", "create_field")
+    remake("remove_field", "delete_field")
+
+    _remake_table = DatabaseSchemaEditor._remake_table
+    if not getattr(_remake_table, "_supports_virtual_fields_", False):
+
+        @wraps(_remake_table)
+        def _remake_table_impl(
+            self: DatabaseSchemaEditor,
+            model,
+            create_field=None,
+            delete_field=None,
+            alter_fields=None,
+        ):
+            opts, alter_fields = model._meta, [*(alter_fields or ())]
+            fields = opts.local_concrete_fields
+            hidden = [f for f in fields if getattr(f, "is_stored", False)]
+            stored = {f.name: f for f in hidden}
+            if getattr(create_field, "is_stored", False):
+                stored[create_field.name], create_field = create_field, None
+            if getattr(delete_field, "is_stored", False):
+                stored.pop(delete_field.name, None)
+                delete_field = None
+            for old, new in [*alter_fields]:
+                # Both are stored with the same column, see `alter_field()`.
+                if getattr(new, "is_stored", False):
+                    alter_fields.remove((old, new))
+                    stored.pop(old.name, None)
+                    stored[new.name] = new
+            args = model, create_field, delete_field, alter_fields
+            if not (hidden or stored):
+                return _remake_table(self, *args)
+
+            # SQLite cannot copy into generated columns: the rebuild leaves the
+            # stored fields out and they are added to the models it prepares.
+            tables = {opts.db_table, f"new__{strip_quotes(opts.db_table)}"}
+
+            def add_stored(sender, **kwargs):
+                meta = sender._meta
+                if meta.app_label == opts.app_label and meta.db_table in tables:
+                    for name, field in stored.items():
+                        field.clone().contribute_to_class(sender, name)
+
+            uid = "virtual_fields.remake:%s" % opts.label
+            opts.local_concrete_fields = [f for f in fields if f not in hidden]
+            class_prepared.connect(add_stored, weak=False, dispatch_uid=uid)
+            try:
+                return _remake_table(self, *args)
+            finally:
+                class_prepared.disconnect(dispatch_uid=uid)
+                del opts.local_concrete_fields
+
+        _remake_table_impl._supports_virtual_fields_ = True
+        DatabaseSchemaEditor._remake_table = _remake_table_impl
+
+
+def _install():
+    _patch_model_options()
+    _patch_queryset()
+    _patch_sql_query()
+    _patch_migrations()
@@ -0,0 +1,213 @@
+from collections import abc
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models as m
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+)
+
+from ._util import _iter_pk_chunks, _update_shadow_columns
+
+if TYPE_CHECKING:
+    from .fields import VirtualField
+
+_STATE = "_virtual_counters_"
+_children: dict[type[m.Model], list["_Counter"]] = {}
+
+
+class _Counter(NamedTuple):
+    """A `Count` or `Sum` virtual field kept in a column of the parent row."""
+
+    field: "VirtualField"
+    relation: m.ForeignObjectRel | m.ManyToManyField
+    summed: m.Field | None = None
+
+    @property
+    def key(self):
+        return self.field.model._meta.label, self.field.name
+
+    @property
+    def m2m(self) -> m.ManyToManyField | None:
+        if isinstance(self.relation, m.ManyToManyField):
+            return self.relation
+        elif self.relation.many_to_many:
+            return self.relation.field
+
+    def add(self, using, delta, **lookup):
+        name, model = self.field.name, self.field.model
+        qs = model._base_manager.using(using).filter(**lookup)
+        return qs.update(**{name: m.F(name) + delta})
+
+    def apply(self, using, contribution: tuple, sign=1):
+        parent, amount = contribution
+        if parent is not None and amount:
+            self.add(using, sign * amount, pk=parent)
+
+    def connect(self):
+        uid = "virtual_fields.counter:%s.%s" % self.key
+        if (f := self.m2m) is None:
+            child, signals = self.relation.related_model, (
+                (post_init, self.on_init),
+                (post_save, self.on_save),
+                (post_delete, self.on_delete),
+            )
+        else:
+            m2m_changed.connect(
+                self.on_m2m_changed, f.remote_field.through, False, uid
+            )
+            child = f.related_model if self.relation is f else f.model
+            signals = ((pre_delete, self.on_other_delete),)
+
+        for model in apps.get_models():
+            if issubclass(model, child):
+                for signal, receiver in signals:
+                    signal.connect(receiver, model, False, uid)
+                counters = _children.setdefault(model, [])
+                if self.m2m is None and self not in counters:
+                    counters.append(self)
+
+    def is_affected(self, changed: abc.Set[str]):
+        summed = self.summed and self.summed.attname
+        return self.relation.field.attname in changed or summed in changed
+
+    def get_parents(self, using, pks) -> m.QuerySet:
+        """The parents of the children `pks`, a list or a queryset of pks."""
+        child, attname = self.relation.related_model, self.relation.field.attname
+        qs = child._base_manager.using(using).filter(pk__in=pks)
+        return qs.values_list(attname, flat=True)
+
+    def refresh(self, using, parents):
+        """Recompute the counter of `parents`, pks or a queryset of pks."""
+        if isinstance(parents, m.QuerySet):
+            return _update_shadow_columns((self.field,), using, pk__in=parents)
+        for chunk in _iter_pk_chunks(parents, using):
+            _update_shadow_columns((self.field,), using, pk__in=chunk)
+
+    def get_contribution(self, obj) -> tuple:
+        parent = getattr(obj, self.relation.field.attname)
+        if parent is None:
+            return None, 0
+        elif self.summed is None:
+            return parent, 1
+        return parent, getattr(obj, self.summed.attname) or 0
+
+    def on_init(self, sender, instance, **kwargs):
+        attrs, names = instance.__dict__, [self.relation.field.attname]
+        self.summed and names.append(self.summed.attname)
+        if all(n in attrs for n in names):
+            attrs.setdefault(_STATE, {})[self.key] = self.get_contribution(instance)
+
+    def on_save(self, sender, instance, created, raw, using, **kwargs):
+        new, state = self.get_contribution(instance), instance.__dict__
+        old = None if created else state.get(_STATE, {}).get(self.key)
+        if created or old is not None:
+            if old != new:
+                old and self.apply(using, old, -1)
+                self.apply(using, new)
+        elif new[0] is not None:
+            expr = self.field.get_shadow_expression()
+            qs = self.field.model._base_manager.using(using).filter(pk=new[0])
+            qs.update(**{self.field.name: expr})
+        state.setdefault(_STATE, {})[self.key] = new
+
+    def on_bulk_create(self, using, objs: abc.Iterable):
+        contributions = [(obj, self.get_contribution(obj)) for obj in objs]
+        self.refresh(using, {parent for _, (parent, _) in contributions} - {None})
+        for obj, contribution in contributions:
+            obj.__dict__.setdefault(_STATE, {})[self.key] = contribution
+
+    def on_delete(self, sender, instance, using, **kwargs):
+        old = instance.__dict__.get(_STATE, {}).pop(self.key, None)
+        self.apply(using, old or self.get_contribution(instance), -1)
+
+    def get_sides(self, reverse: bool):
+        """The through fields of the changed instance and the counted rows."""
+        f = self.m2m
+        names = f.m2m_field_name(), f.m2m_reverse_field_name()
+        return names[::-1] if reverse else names
+
+    def is_counted_side(self, reverse: bool):
+        return reverse is not (self.relation is self.m2m)
+
+    def on_m2m_changed(self, sender, instance, action, reverse, pk_set, using, **kw):
+        counted, sign = self.is_counted_side(reverse), -1 if "remove" in action else 1
+        if action in ("post_add", "post_remove"):
+            if counted:
+                self.add(using, sign * len(pk_set), pk=instance.pk)
+            elif pk_set:
+                self.add(using, sign, pk__in=pk_set)
+        elif action == "pre_clear" and not counted:
+            pks = self.get_linked_pks(instance, using, reverse)
+            instance.__dict__.setdefault(_STATE, {})[self.key] = pks
+        elif action == "post_clear" and counted:
+            qs = self.field.model._base_manager.using(using).filter(pk=instance.pk)
+            qs.update(**{self.field.name: 0})
+        elif action == "post_clear":
+            if pks := instance.__dict__.get(_STATE, {}).pop(self.key, None):
+                self.add(using, -1, pk__in=pks)
+
+    def on_other_delete(self, sender, instance, using, **kwargs):
+        reverse = self.relation is self.m2m
+        if pks := self.get_linked_pks(instance, using, reverse):
+            self.add(using, -1, pk__in=pks)
+
+    def get_linked_pks(self, instance, using, reverse: bool) -> list:
+        through = self.m2m.remote_field.through
+        src, dst = map(through._meta.get_field, self.get_sides(reverse))
+        qs = through._base_manager.using(using).filter(**{src.attname: instance.pk})
+        return [*qs.values_list(dst.attname, flat=True)]
+
+
+def _get_counter(field: "VirtualField") -> _Counter | str:
+    """The counter of `field` or the reason it cannot be maintained as one."""
+    expr = field.raw_expression
+    reason = (
+        "it is not a `Count` over a reverse foreign key or many-to-many relation "
+        "nor a `Sum` over a reverse foreign key"
+    )
+    if type(expr) not in (m.Count, m.Sum) or expr.filter is not None:
+        return reason
+    elif not isinstance(src := expr.get_source_expressions()[0], m.F):
+        return reason
+
+    first, *rest = src.name.split(LOOKUP_SEP)
+    summed = None
+    try:
+        relation = field.model._meta.get_field(first)
+        if rest and isinstance(expr, m.Sum):
+            summed = relation.related_model._meta.get_field(rest[0])
+    except (AttributeError, FieldDoesNotExist):
+        return reason
+
+    if relation.many_to_many and not rest and isinstance(expr, m.Count):
+        if relation.remote_field.model is field.model:
+            return "it counts a relation of the model to itself"
+        return _Counter(field, relation)
+    elif not (relation.one_to_many and relation.auto_created):
+        return reason
+    elif isinstance(expr, m.Count) and rest in ([], ["pk"]):
+        return _Counter(field, relation)
+    elif summed is not None and len(rest) == 1 and not summed.is_relation:
+        return _Counter(field, relation, summed)
+    return reason
+
+
+def get_child_counters(model: type[m.Model]) -> list[_Counter]:
+    """The reverse foreign key counters that count or sum rows of `model`."""
+    return _children.get(model, [])
+
+
+def connect_counters(models=None):
+    """Connect the signal receivers that maintain the counter columns."""
+    for model in apps.get_models() if models is None else models:
+        for field in model._meta.virtual_fields.values():
+            if field.is_counter and field.model is model:
+                if isinstance(counter := _get_counter(field), _Counter):
+                    counter.connect()
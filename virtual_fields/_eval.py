@@ -0,0 +1,554 @@
+import datetime
+import decimal
+import operator
+from collections import abc
+from typing import TYPE_CHECKING, Any
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db import models as m
+from django.db import router
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import (
+    Case,
+    CombinedExpression,
+    ExpressionWrapper,
+    F,
+    Value,
+    When,
+)
+from django.db.models.fields.json import KeyTextTransform, KeyTransform
+from django.db.models.functions import Cast, Coalesce, Concat, ConcatPair, Extract
+from django.db.models.lookups import Lookup
+from django.utils import timezone
+
+from ._util import _LazyValue
+
+if TYPE_CHECKING:
+    from .fields import VirtualField
+    from .models import VirtualizedModel
+
+_T_Eval = abc.Callable[["VirtualizedModel"], Any]
+
+
+class _Unsupported(Exception):
+    """Raised when an expression cannot be translated to Python."""
+
+
+class _Fallback(Exception):
+    """Raised when a value cannot be computed locally and must be queried."""
+
+
+def _fallback(*args):
+    raise _Fallback(*args)
+
+
+def _datetime_value(value):
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return timezone.localtime(value)
+    return value
+
+
+_EXTRACTS: dict[str, abc.Callable] = {
+    "year": lambda v: v.year,
+    "iso_year": lambda v: v.isocalendar()[0],
+    "quarter": lambda v: (v.month - 1) // 3 + 1,
+    "month": lambda v: v.month,
+    "week": lambda v: v.isocalendar()[1],
+    "day": lambda v: v.day,
+    "week_day": lambda v: v.isoweekday() % 7 + 1,
+    "iso_week_day": lambda v: v.isoweekday(),
+    "hour": lambda v: v.hour,
+    "minute": lambda v: v.minute,
+    "second": lambda v: v.second,
+}
+_TIME_EXTRACTS = {"hour", "minute", "second"}
+
+
+def _extract(name: str) -> abc.Callable:
+    if (fn := _EXTRACTS.get(name)) is None:
+        raise _Unsupported(f"Extract {name!r}")
+    timed = name in _TIME_EXTRACTS
+
+    def extract(value):
+        if value is None:
+            return None
+        elif isinstance(value, datetime.datetime):
+            return fn(_datetime_value(value))
+        elif not timed and isinstance(value, datetime.date):
+            return fn(value)
+        elif timed and isinstance(value, datetime.time):
+            return fn(value)
+        raise _Fallback(value)
+
+    return extract
+
+
+def _check_string_vendor(obj, vendors: set[str]):
+    """Fall back to SQL where the database compares strings by its collation."""
+    using = obj._state.db or router.db_for_read(obj.__class__, instance=obj)
+    if connections[using].vendor not in vendors:
+        raise _Fallback(using)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, decimal.Decimal)) and not isinstance(
+        value, bool
+    )
+
+
+def _trunc_div(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        q = abs(a) // abs(b)
+        return q if (a < 0) == (b < 0) else -q
+    return a / b
+
+
+def _trunc_mod(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return a - b * _trunc_div(a, b)
+    raise _Fallback(a, b)
+
+
+_CONNECTORS: dict[str, abc.Callable] = {
+    CombinedExpression.ADD: operator.add,
+    CombinedExpression.SUB: operator.sub,
+    CombinedExpression.MUL: operator.mul,
+    CombinedExpression.DIV: _trunc_div,
+    CombinedExpression.MOD: _trunc_mod,
+    CombinedExpression.POW: operator.pow,
+}
+
+_LOOKUPS: dict[str, abc.Callable] = {
+    "exact": operator.eq,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "in": lambda a, b: a in b,
+}
+# Backends whose default collations compare strings as Python does, by code point.
+_STRING_EQUALITY_VENDORS = {"sqlite", "postgresql"}
+_STRING_ORDER_VENDORS = {"sqlite"}
+
+_INTEGER_TYPES = {
+    "AutoField",
+    "BigAutoField",
+    "SmallAutoField",
+    "IntegerField",
+    "BigIntegerField",
+    "SmallIntegerField",
+    "PositiveIntegerField",
+    "PositiveBigIntegerField",
+    "PositiveSmallIntegerField",
+}
+_TEXT_TYPES = {"CharField", "TextField", "SlugField", "EmailField", "URLField"}
+_NUMBER_TYPES = {"FloatField", "DecimalField", "BooleanField"}
+_TEMPORAL_TYPES = {
+    "DateField": datetime.date,
+    "DateTimeField": datetime.datetime,
+    "TimeField": datetime.time,
+}
+
+
+def _decimal_converter(field: m.DecimalField) -> abc.Callable:
+    create = decimal.Context(prec=15).create_decimal_from_float
+    quantum = decimal.Decimal(1).scaleb(-field.decimal_places)
+
+    def convert(value):
+        if isinstance(value, decimal.Decimal):
+            return value.quantize(quantum, context=field.context)
+        return create(value).quantize(quantum, context=field.context)
+
+    return convert
+
+
+def _output_converter(field: m.Field | None) -> abc.Callable:
+    """The Python equivalent of the database converters of `field`."""
+    internal = field and field.get_internal_type()
+    if internal == "DecimalField":
+        decimal_convert = _decimal_converter(field)
+    elif internal in _TEMPORAL_TYPES:
+        temporal = _TEMPORAL_TYPES[internal]
+    elif internal not in _INTEGER_TYPES | _TEXT_TYPES | _NUMBER_TYPES | {None}:
+        raise _Unsupported(f"output to {internal}")
+
+    def convert(value):
+        if value is None or internal is None:
+            return value
+        elif internal in _TEXT_TYPES and isinstance(value, str):
+            return value
+        elif internal in _INTEGER_TYPES and isinstance(value, int):
+            return int(value)
+        elif internal == "FloatField" and _is_number(value):
+            return float(value)
+        elif internal == "DecimalField" and _is_number(value):
+            return decimal_convert(value)
+        elif internal == "BooleanField" and value in (0, 1):
+            return bool(value)
+        elif internal in _TEMPORAL_TYPES and isinstance(value, temporal):
+            return value
+        raise _Fallback(value)
+
+    return convert
+
+
+def _cast_converter(field: m.Field) -> abc.Callable:
+    """The Python equivalent of a `Cast` to `field`."""
+    internal = field.get_internal_type()
+    if internal == "DecimalField":
+        decimal_convert = _decimal_converter(field)
+
+    def cast(value):
+        if value is None:
+            return None
+        elif internal in _TEXT_TYPES and isinstance(value, str):
+            return value
+        elif internal in _TEXT_TYPES and _is_number(value) and isinstance(value, int):
+            return str(value)
+        elif internal in _INTEGER_TYPES:
+            if isinstance(value, int):
+                return int(value)
+            elif isinstance(value, str) and value.strip().lstrip("+-").isdigit():
+                return int(value)
+        elif internal == "FloatField" and _is_number(value):
+            return float(value)
+        elif internal == "DecimalField" and _is_number(value):
+            return decimal_convert(value)
+        elif internal == "BooleanField" and isinstance(value, bool):
+            return value
+        raise _Fallback(value)
+
+    if internal not in _TEXT_TYPES | _INTEGER_TYPES | _NUMBER_TYPES:
+        raise _Unsupported(f"Cast to {internal}")
+    return cast
+
+
+def _is_lookup(field: m.Field, path: list[str], name: str) -> bool:
+    """Whether Django reads `name` after `path` as a lookup, not a transform."""
+    field = getattr(field, "output_field", None) or field
+    if len(path) > 1 and isinstance(field, m.JSONField):
+        transform = KeyTransform(path[-1], path[0])
+        found = transform._get_lookup(name) or field.get_lookup(name)
+    elif len(path) > 1:
+        found = m.Field().get_lookup(name)
+    else:
+        found = field.get_lookup(name)
+    return found is not None and issubclass(found, Lookup)
+
+
+class _Compiler:
+    """Translates the expression tree of a virtual field to a Python callable.
+
+    The callables read the values loaded on an instance and raise `_Fallback`
+    when a column is not loaded or a value has no exact Python equivalent.
+    """
+
+    def __init__(self, model: type["VirtualizedModel"]):
+        self.model, self.opts = model, model._meta
+
+    def compile(self, expr) -> _T_Eval:
+        for cls in type(expr).__mro__:
+            if (method := self._dispatch.get(cls)) is not None:
+                return method(self, expr)
+        raise _Unsupported(type(expr).__name__)
+
+    def compile_value(self, expr: Value) -> _T_Eval:
+        value = expr.value
+        return lambda obj: value
+
+    def compile_f(self, expr: F) -> _T_Eval:
+        if type(expr) is not F:
+            raise _Unsupported(type(expr).__name__)
+        return self.compile_path(expr.name)
+
+    def compile_path(self, name: str, strict_null=False) -> _T_Eval:
+        from .fields import VirtualField
+
+        first, *rest = name.split(LOOKUP_SEP)
+        field = self.get_field(first)
+
+        if isinstance(field, VirtualField):
+            getter = self.get_virtual_getter(field)
+        elif field.concrete and not (field.is_relation and rest):
+            getter = self.get_column_getter(field.attname)
+        else:
+            raise _Unsupported(name)
+
+        if rest and isinstance(field, m.JSONField):
+            *keys, last = rest
+            for key in keys:
+                getter = self.get_key_getter(getter, key)
+            getter = self.get_key_getter(getter, last, strict_null)
+        else:
+            for part in rest:
+                getter = self.chain(getter, _extract(part))
+        return getter
+
+    @staticmethod
+    def chain(getter: _T_Eval, fn: abc.Callable) -> _T_Eval:
+        return lambda obj: fn(getter(obj))
+
+    @staticmethod
+    def get_column_getter(attname: str) -> _T_Eval:
+        def get(obj):
+            if (value := obj.__dict__.get(attname, _fallback)) is _fallback:
+                raise _Fallback(attname)
+            return value
+
+        return get
+
+    def get_virtual_getter(self, field: "VirtualField") -> _T_Eval:
+        name, descriptor = field.attname, getattr(self.model, field.attname)
+
+        def get(obj):
+            if name in (data := descriptor.get_cache_dict(obj)):
+                if type(value := data[name]) is _LazyValue:
+                    data[name] = value = value.resolve()
+                return value
+            elif (evaluate := field.python_evaluator) is None:
+                raise _Fallback(name)
+            return evaluate(obj)
+
+        return get
+
+    @staticmethod
+    def get_key_getter(getter: _T_Eval, key: str, strict_null=False) -> _T_Eval:
+        def get(obj):
+            value = getter(obj)
+            if isinstance(value, dict):
+                if strict_null and key in value and value[key] is None:
+                    # Backends disagree on JSON null, as NULL or "null".
+                    raise _Fallback(key)
+                return value.get(key)
+            elif isinstance(value, list) and key.isdigit():
+                return value[int(key)] if int(key) < len(value) else None
+            elif value is None:
+                return None
+            raise _Fallback(key)
+
+        return get
+
+    def compile_key_transform(self, expr: KeyTransform) -> _T_Eval:
+        text = isinstance(expr, KeyTextTransform)
+        getter = self.get_key_getter(
+            self.compile(expr.get_source_expressions()[0]), expr.key_name, text
+        )
+        if not text:
+            return getter
+
+        def get_text(obj):
+            if isinstance(value := getter(obj), (dict, list, bool)):
+                raise _Fallback(value)
+            return value
+
+        return get_text
+
+    def compile_concat(self, expr: Concat | ConcatPair) -> _T_Eval:
+        parts = [self.compile(e) for e in expr.get_source_expressions()]
+
+        def concat(obj):
+            values = []
+            for part in parts:
+                if (value := part(obj)) is None:
+                    continue
+                elif isinstance(value, bool) or not isinstance(value, (str, int)):
+                    raise _Fallback(value)
+                values.append(value if isinstance(value, str) else str(value))
+            return "".join(values)
+
+        return concat
+
+    def compile_coalesce(self, expr: Coalesce) -> _T_Eval:
+        parts = [self.compile(e) for e in expr.get_source_expressions()]
+
+        def coalesce(obj):
+            for part in parts:
+                if (value := part(obj)) is not None:
+                    return value
+
+        return coalesce
+
+    def compile_combined(self, expr: CombinedExpression) -> _T_Eval:
+        if (fn := _CONNECTORS.get(expr.connector)) is None:
+            raise _Unsupported(f"connector {expr.connector!r}")
+        lhs, rhs = map(self.compile, expr.get_source_expressions())
+
+        def combine(obj):
+            a, b = lhs(obj), rhs(obj)
+            if a is None or b is None:
+                return None
+            elif not (_is_number(a) and _is_number(b)):
+                raise _Fallback(a, b)
+            try:
+                return fn(a, b)
+            except (ArithmeticError, TypeError) as e:
+                raise _Fallback(a, b) from e
+
+        return combine
+
+    def compile_extract(self, expr: Extract) -> _T_Eval:
+        return self.chain(
+            self.compile(expr.get_source_expressions()[0]), _extract(expr.lookup_name)
+        )
+
+    def compile_cast(self, expr: Cast) -> _T_Eval:
+        return self.chain(
+            self.compile(expr.get_source_expressions()[0]),
+            _cast_converter(expr.output_field),
+        )
+
+    def compile_wrapper(self, expr: ExpressionWrapper) -> _T_Eval:
+        return self.chain(
+            self.compile(expr.expression),
+            _output_converter(expr.__dict__.get("output_field")),
+        )
+
+    def compile_case(self, expr: Case) -> _T_Eval:
+        whens = [
+            (self.compile_q(when.condition), self.compile(when.result))
+            for when in expr.cases
+        ]
+        default = self.compile(expr.default)
+
+        def case(obj):
+            for condition, result in whens:
+                if condition(obj):
+                    return result(obj)
+            return default(obj)
+
+        return case
+
+    def compile_when(self, expr: When) -> _T_Eval:
+        raise _Unsupported("When outside of Case")
+
+    def compile_q(self, q, negated=False) -> _T_Eval:
+        """A three-valued condition, `None` standing for SQL's unknown.
+
+        `negated` tells whether an enclosing `Q` is negated, which changes how
+        Django compiles lookups on nullable columns.
+        """
+        if not isinstance(q, m.Q):
+            raise _Unsupported(type(q).__name__)
+        inner = negated is not q.negated
+        parts = [
+            self.compile_lookup(*c, negated=inner)
+            if isinstance(c, tuple)
+            else self.compile_q(c, inner)
+            for c in q.children
+        ]
+        if q.connector not in (m.Q.AND, m.Q.OR):
+            raise _Unsupported(f"connector {q.connector!r}")
+        conjunction, negated = q.connector == m.Q.AND, q.negated
+
+        def condition(obj):
+            result = conjunction
+            for part in parts:
+                value = part(obj)
+                if value is (not conjunction):
+                    result = value
+                    break
+                elif value is None:
+                    result = None
+            return None if result is None else result is not negated
+
+        return condition
+
+    def compile_lookup(self, lookup: str, rhs, negated=False) -> _T_Eval:
+        *path, name = lookup.split(LOOKUP_SEP)
+        if name not in _LOOKUPS and name != "isnull":
+            if path and _is_lookup(self.get_field(path[0]), path, name):
+                raise _Unsupported(f"lookup {name!r}")
+            path, name = [*path, name], "exact"
+        field = self.get_field(path[0])
+        if getattr(field, "db_collation", None):
+            raise _Unsupported("db_collation")
+
+        is_json = len(path) > 1 and isinstance(field, m.JSONField)
+        if name == "exact" and rhs is None:
+            if is_json:
+                # Matches JSON null, not a missing key.
+                raise _Unsupported("JSON null")
+            name, rhs = "isnull", True
+        # JSON null is not SQL NULL in lookups.
+        lhs = self.compile_path(LOOKUP_SEP.join(path), strict_null=True)
+
+        if name == "isnull":
+            return lambda obj: (lhs(obj) is None) is bool(rhs)
+        elif hasattr(rhs, "resolve_expression"):
+            rhs_value = self.compile(rhs)
+        elif name == "in":
+            rhs = [*rhs]
+            rhs_value = lambda obj: rhs  # noqa: E731
+        else:
+            rhs_value = lambda obj: rhs  # noqa: E731
+        fn = _LOOKUPS[name]
+
+        # Under negation Django adds `IS NOT NULL` for nullable columns, so that
+        # the negated condition is true for their NULL values.
+        not_null = []
+        if negated and field.null:
+            not_null.append(self.compile_path(path[0]))
+        if negated and type(rhs) is F and LOOKUP_SEP not in rhs.name:
+            if getattr(self.get_field(rhs.name), "null", False):
+                not_null.append(rhs_value)
+        vendors = _STRING_EQUALITY_VENDORS if name in ("exact", "in") else None
+
+        def compare(obj):
+            for column in not_null:
+                if column(obj) is None:
+                    return False
+            a, b = lhs(obj), rhs_value(obj)
+            if a is None or b is None:
+                return None
+            elif name == "in":
+                if isinstance(a, str):
+                    _check_string_vendor(obj, vendors)
+                return any(a == v for v in b if v is not None)
+            elif type(a) is not type(b) and not (_is_number(a) and _is_number(b)):
+                raise _Fallback(a, b)
+            elif isinstance(a, str):
+                _check_string_vendor(obj, vendors or _STRING_ORDER_VENDORS)
+            return fn(a, b)
+
+        return compare
+
+    def get_field(self, name: str) -> m.Field:
+        try:
+            return self.opts.get_field(name)
+        except FieldDoesNotExist as e:
+            raise _Unsupported(name) from e
+
+    _dispatch = {
+        Value: compile_value,
+        F: compile_f,
+        KeyTransform: compile_key_transform,
+        Concat: compile_concat,
+        ConcatPair: compile_concat,
+        Coalesce: compile_coalesce,
+        CombinedExpression: compile_combined,
+        Extract: compile_extract,
+        Cast: compile_cast,
+        ExpressionWrapper: compile_wrapper,
+        Case: compile_case,
+        When: compile_when,
+        m.Q: compile_q,
+    }
+
+
+def compile_expression(
+    model: type["VirtualizedModel"], expr, output_field: m.Field = None, cast=False
+) -> _T_Eval | None:
+    """A Python callable that computes `expr` for an instance of `model`.
+
+    `None` when the expression has nodes without a Python translation.
+    """
+    compiler = _Compiler(model)
+    try:
+        fn = compiler.compile(expr)
+        if output_field is not None:
+            convert = (_cast_converter if cast else _output_converter)(output_field)
+            fn = compiler.chain(fn, convert)
+    except _Unsupported:
+        return None
+    return fn
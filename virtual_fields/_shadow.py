@@ -0,0 +1,100 @@
+from collections import abc
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.apps import apps
+from django.db import models as m
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.signals import post_save
+
+from ._util import _iter_pk_chunks, _update_shadow_columns
+
+if TYPE_CHECKING:
+    from .fields import VirtualField
+
+_relations: dict[type[m.Model], list["_ShadowRelation"]] = {}
+
+
+class _ShadowRelation(NamedTuple):
+    """A shadow field that reads the columns of rows it references.
+
+    `lookup` goes from the field's model to those rows, through forward foreign
+    keys only, and `attnames` are the columns read, `None` when unknown.
+    """
+
+    field: "VirtualField"
+    lookup: str
+    related_model: type[m.Model]
+    attnames: frozenset[str] | None
+
+    def is_affected(self, changed: abc.Set[str] | None):
+        return changed is None or self.attnames is None or bool(self.attnames & changed)
+
+    def refresh(self, using, pks: "abc.Iterable | m.QuerySet"):
+        # A queryset is used whole as a subquery.
+        chunks = [pks] if isinstance(pks, m.QuerySet) else _iter_pk_chunks(pks, using)
+        for chunk in chunks:
+            lookup = {f"{self.lookup}__in": chunk}
+            _update_shadow_columns((self.field,), using, **lookup)
+
+    def connect(self):
+        uid = "virtual_fields.shadow:%s.%s:%s" % (
+            self.field.model._meta.label,
+            self.field.name,
+            self.lookup,
+        )
+        for model in apps.get_models():
+            if issubclass(model, self.related_model):
+                post_save.connect(self.on_save, model, False, uid)
+                if self not in (relations := _relations.setdefault(model, [])):
+                    relations.append(self)
+
+    def on_save(self, sender, instance, created, raw, using, update_fields, **kw):
+        if created or raw:
+            return
+        opts = instance._meta
+        changed = update_fields and {opts.get_field(n).attname for n in update_fields}
+        if self.is_affected(changed or None):
+            self.refresh(using, [instance.pk])
+
+
+def _iter_relations(field: "VirtualField", prefix=(), src: "VirtualField" = None):
+    """The relations of `field` and, as strings, the lookups it cannot follow."""
+    from .fields import VirtualField
+
+    for path in filter(None, field._iter_source_field_paths()):
+        names = [*prefix]
+        for i, info in enumerate(path.info):
+            names.append(info.join_field.name)
+            if not info.direct or info.m2m or info.filtered_relation:
+                yield LOOKUP_SEP.join(names)
+                break
+            elif i + 1 < len(path.info):
+                attnames = frozenset({path.info[i + 1].join_field.attname})
+            elif isinstance(path.field, VirtualField):
+                attnames = path.field.concrete_dependencies
+            else:
+                attnames = frozenset({path.field.attname})
+            model = info.to_opts.model
+            yield _ShadowRelation(src or field, LOOKUP_SEP.join(names), model, attnames)
+        else:
+            if path.info and isinstance(path.field, VirtualField):
+                yield from _iter_relations(path.field, names, src or field)
+
+
+def get_untracked_relations(field: "VirtualField") -> list[str]:
+    """The lookups of `field` whose changes do not refresh its shadow column."""
+    return [r for r in _iter_relations(field) if isinstance(r, str)]
+
+
+def get_related_shadows(model: type[m.Model]) -> list[_ShadowRelation]:
+    return _relations.get(model, [])
+
+
+def connect_shadows(models=None):
+    """Refresh shadow columns when the rows they reference are saved."""
+    for model in apps.get_models() if models is None else models:
+        for field in model._meta.shadow_virtual_fields.values():
+            if field.model is model:
+                for relation in _iter_relations(field):
+                    if isinstance(relation, _ShadowRelation):
+                        relation.connect()
@@ -1,10 +1,461 @@
-from typing import TYPE_CHECKING
+import re
+from collections import abc
+from decimal import Decimal
+from itertools import islice
+from typing import TYPE_CHECKING, ClassVar
+from weakref import WeakSet, ref
 
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
 from django.db import models as m
+from django.db.models.expressions import Col, ResolvedOuterRef
+from django.db.models.functions.datetime import TimezoneMixin
+from django.db.models.sql.datastructures import BaseTable
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.tree import Node
 
 if TYPE_CHECKING:
+    from django.db.models.sql.query import Query
+
+    from .fields import VirtualField
     from .models import _T_Model
 
+_SNAPSHOT = "_virtual_snapshot_"
+_SLOTS = "_virtual_slots_"
+_PACKED = "_virtual_packed_"
+_MUTABLE = (dict, list, set, bytearray)
+_PLACEHOLDER = re.compile(r"%[%s]")
+
+
+class _Peers(list):
+    """Weak references to the instances loaded by the same queryset evaluation.
+
+    Dropped when pickled.
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return self.__class__, ()
+
+
+class _VirtualSlots:
+    """The cached virtual values of an instance, in the fixed slots of its model.
+
+    Each model gets a subclass whose `__slots__` are the names of its slot-stored
+    virtual fields. Only the mapping operations used by the descriptors are
+    implemented, as dunders so that they cannot clash with field names, which
+    cannot end with an underscore either.
+    """
+
+    __slots__ = ()
+    _model_: ClassVar[type["_T_Model"]]
+
+    @classmethod
+    def define(cls, model: type["_T_Model"], names: abc.Iterable[str]):
+        attrs = {"__slots__": tuple(names), "_model_": model}
+        return type(f"{model.__name__}VirtualSlots", (cls,), attrs)
+
+    def __contains__(self, name: str) -> bool:
+        return hasattr(self, name)
+
+    def __getitem__(self, name: str):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __setitem__(self, name: str, val):
+        setattr(self, name, val)
+
+    def __delitem__(self, name: str):
+        try:
+            delattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __reduce__(self):
+        names = [n for n in self.__slots__ if n in self]
+        return _restore_slots, (self._model_, {n: self[n] for n in names})
+
+
+def _restore_slots(model: type["_T_Model"], values: dict):
+    slots = model._meta.virtual_field_slots()
+    for name, val in values.items():
+        slots[name] = val
+    return slots
+
+
+def _drop_virtual(obj: "_T_Model", names: abc.Iterable[str]):
+    """Delete the cached values of the virtual fields `names` from `obj`."""
+    attrs = obj.__dict__
+    slots = attrs.get(_SLOTS, ())
+    for name in names:
+        if name in attrs or name in slots:
+            delattr(obj, name)
+
+
+class _InternPool:
+    """Canonical objects for the values of a virtual field.
+
+    Equal strings, bytes, integers and small decimals loaded from the database are
+    replaced by the first such object seen. Once `maxsize` values are pooled,
+    new ones are returned as they are.
+    """
+
+    __slots__ = ("values", "maxsize")
+
+    max_digits: ClassVar[int] = 18
+
+    def __init__(self, maxsize: int, seed: abc.Iterable = ()):
+        self.values, self.maxsize = {}, maxsize
+        for value in seed:
+            self.convert(value)
+
+    def key(self, value):
+        if (cls := type(value)) in (str, bytes, int):
+            return cls, value
+        elif cls is Decimal and value.is_finite():
+            # Equal decimals can differ in exponent, e.g. 1.0 and 1.00.
+            if len((key := value.as_tuple()).digits) <= self.max_digits:
+                return cls, key
+
+    def convert(self, value, expression=None, connection=None):
+        if (key := self.key(value)) is None:
+            return value
+        elif (canonical := self.values.get(key)) is not None:
+            return canonical
+        elif len(self.values) < self.maxsize:
+            return self.values.setdefault(key, value)
+        return value
+
+
+class _LazyValue:
+    """A value loaded from the database whose converters have not run yet.
+
+    Resolved by the descriptor on first access. Pickled and copied as the
+    converted value.
+    """
+
+    __slots__ = ("value", "converters", "expression", "connection")
+
+    def __init__(self, value, converters: list, expression, connection):
+        self.value, self.converters = value, converters
+        self.expression, self.connection = expression, connection
+
+    def resolve(self):
+        if (converters := self.converters) is not None:
+            value = self.value
+            for converter in converters:
+                value = converter(value, self.expression, self.connection)
+            self.value, self.converters = value, None
+            self.expression = self.connection = None
+        return self.value
+
+    def __reduce__(self):
+        return _identity, (self.resolve(),)
+
+
+def _identity(value):
+    return value
+
+
+class _LazyConversion:
+    """A db converter that defers `converters` until the value is accessed."""
+
+    __slots__ = ("converters",)
+
+    def __init__(self, converters: list):
+        self.converters = converters
+
+    def __call__(self, value, expression, connection):
+        if value is None or not self.converters:
+            return value
+        return _LazyValue(value, self.converters, expression, connection)
+
+
+class _SqlMemo:
+    """Compiled SQL of a long-lived resolved expression.
+
+    Entries are keyed by connection, by how the compiler quotes the
+    expression's table aliases and, when its SQL depends on it, by the current
+    time zone. Copies of the expression share the memo but never use it. With
+    `inline`, params are rendered as literals so that the SQL matches the
+    expression indexes of the field.
+    """
+
+    __slots__ = ("node", "aliases", "entries", "inline", "timezone")
+
+    maxsize: ClassVar[int] = 32
+
+    def __init__(self, node: m.Expression, inline=False):
+        self.node, self.entries, nodes = ref(node), {}, [*node.flatten()]
+        self.inline, self.timezone = inline, _depends_on_timezone(node)
+        if any(getattr(e, "subquery", False) for e in nodes) or any(
+            isinstance(e, ResolvedOuterRef) for e in nodes
+        ):
+            self.aliases = None
+        else:
+            aliases = {e.alias for e in nodes if isinstance(e, Col)}
+            self.aliases = tuple(sorted(aliases - {None}))
+
+    def __reduce__(self):
+        return _detached_memo, (self.inline,)
+
+    @classmethod
+    def attach(cls, node: m.Expression, inline=False):
+        node._virtual_sql_ = cls(node, inline)
+        return node
+
+    def compile(self, compiler, compile: abc.Callable):
+        conn, quote = compiler.connection, compiler.quote_name_unless_alias
+        tz = _timezone_key(self.timezone)
+        key = conn.alias, conn.vendor, tz, *map(quote, self.aliases)
+        if (hit := self.entries.get(key)) is None:
+            sql, params = compile(compiler, self.node())
+            if self.inline and params:
+                sql, params = _inline_params(conn, sql, params)
+            if len(self.entries) >= self.maxsize:
+                self.entries.clear()
+            self.entries[key] = hit = sql, tuple(params), isinstance(params, list)
+
+        sql, params, is_list = hit
+        return sql, [*params] if is_list else params
+
+
+def _detached_memo(inline: bool) -> _SqlMemo:
+    """A memo that is never used, for copies of the expression in other processes."""
+    memo = _SqlMemo.__new__(_SqlMemo)
+    memo.node, memo.aliases, memo.entries, memo.inline = None, None, {}, inline
+    memo.timezone = False
+    return memo
+
+
+def _inline_params(connection, sql: str, params):
+    quote = connection.schema_editor().quote_value
+    try:
+        literals = iter([quote(p).replace("%", "%%") for p in params])
+    except (TypeError, ValueError):
+        return sql, params
+    # Only the literals are escaped, the `%%` of the fragment are kept as they are.
+    sql = _PLACEHOLDER.sub(lambda m: "%%" if m[0] == "%%" else next(literals), sql)
+    return sql, type(params)()
+
+
+class _VirtualTable(BaseTable):
+    """A base table that can select the virtual `fields` as columns.
+
+    The fields a query references are rendered in a derived table with one
+    nesting level per dependency depth, so each expression is computed once
+    per row and referenced by name in the enclosing query.
+    """
+
+    sql_cache: ClassVar[dict] = {}
+    deps_cache: ClassVar[dict] = {}
+    maxsize: ClassVar[int] = 64
+
+    def __init__(self, table_name, alias, model: type["_T_Model"], fields: tuple):
+        super().__init__(table_name, alias)
+        self.model, self.fields = model, fields
+
+    @property
+    def identity(self):
+        return (*super().identity, self.fields)
+
+    def relabeled_clone(self, change_map):
+        alias = change_map.get(self.table_alias, self.table_alias)
+        return self.__class__(self.table_name, alias, self.model, self.fields)
+
+    def get_col(self, field: "VirtualField", alias, query: "Query"):
+        if field.name in self.fields:
+            query._shared_virtual_ = self.shared(query) | {field.name}
+            # Wrapped so backends convert it as a computed value, not a column.
+            return field.wrap(Col(alias, field))
+        return field.final_expression.resolve_expression(query)
+
+    @staticmethod
+    def shared(query: "Query") -> frozenset[str]:
+        return getattr(query, "_shared_virtual_", frozenset())
+
+    def as_sql(self, compiler, connection):
+        if not (used := self.shared(compiler.query)):
+            return super().as_sql(compiler, connection)
+
+        fields = self.model._meta.virtual_fields
+        tz = _timezone_key(any(fields[n].depends_on_timezone for n in used))
+        key = self.model, self.fields, used, connection.alias, connection.vendor, tz
+        if (hit := self.sql_cache.get(key)) is None:
+            if len(self.sql_cache) >= self.maxsize:
+                self.sql_cache.clear()
+            self.sql_cache[key] = hit = self._compile(connection, used)
+
+        sql, params = hit
+        alias = compiler.quote_name_unless_alias(self.table_alias)
+        return f"({sql}) {alias}", [*params]
+
+    def _compile(self, connection, used: abc.Iterable[str]):
+        qn, fields = connection.ops.quote_name, self.model._meta.virtual_fields
+        table, fence = qn(self.table_name), _no_flatten_sql(connection)
+        sql, params, done = table, (), ()
+        for layer in self._layers(used):
+            query = self._query(done)
+            compiler = query.get_compiler(connection=connection)
+            cols, layer_params = [], []
+            for field in map(fields.__getitem__, layer):
+                col = field.get_col(self.table_name, query=query)
+                col_sql, col_params = compiler.compile(col)
+                cols.append(f"{col_sql} AS {qn(field.column)}")
+                layer_params.extend(col_params)
+            if done:
+                sql = f"({sql}{fence}) {table}"
+            sql = f"SELECT {table}.*, {', '.join(cols)} FROM {sql}"
+            params, done = (*layer_params, *params), (*done, *layer)
+        return f"{sql}{fence}", params
+
+    def _query(self, fields: tuple):
+        from django.db.models.sql.query import Query
+
+        query = Query(self.model)
+        alias = query.get_initial_alias()
+        query.alias_map[alias] = self.__class__(alias, alias, self.model, fields)
+        return query
+
+    def _deps(self, name: str) -> frozenset[str]:
+        key = self.model, self.fields, name
+        if (deps := self.deps_cache.get(key)) is None:
+            query = self._query(tuple(n for n in self.fields if n != name))
+            field = self.model._meta.virtual_fields[name]
+            field.final_expression.resolve_expression(query)
+            if len(self.deps_cache) >= self.maxsize:
+                self.deps_cache.clear()
+            self.deps_cache[key] = deps = self.shared(query)
+        return deps
+
+    def _layers(self, used: abc.Iterable[str]):
+        depths, layers = {}, {}
+
+        def depth(name):
+            if (d := depths.get(name)) is None:
+                depths[name] = d = 1 + max(map(depth, self._deps(name)), default=-1)
+            return d
+
+        for name in used:
+            depth(name)
+        for name in self.fields:
+            if name in depths:
+                layers.setdefault(depths[name], []).append(name)
+        return [layers[d] for d in sorted(layers)]
+
+
+def _subquery_aggregates(fields: abc.Iterable["VirtualField"]) -> set[str]:
+    """The aggregate `fields` to select as subqueries when they share a query.
+
+    Grouped in one query, each aggregate would be multiplied by the rows of the
+    relations joined for the others.
+    """
+    names = {field.name for field in fields if field.is_aggregate}
+    return names if len(names) > 1 else set()
+
+
+def _no_flatten_sql(connection):
+    if connection.vendor == "oracle":
+        return ""
+    limit = connection.ops.no_limit_value()
+    return " OFFSET 0" if limit is None else f" LIMIT {limit} OFFSET 0"
+
+
+class _VirtualReload:
+    """Virtual fields to load along with the next `model` instance query."""
+
+    __slots__ = ("model", "fields", "aliases", "values")
+
+    def __init__(self, model: type["_T_Model"], fields: abc.Iterable[str]):
+        self.model, self.fields, self.values = model, tuple(fields), None
+        self.aliases = tuple(f"_virtual_reload_{name}" for name in self.fields)
+
+    def add_to_query(self, qs: m.QuerySet["_T_Model"]):
+        fields, query = qs.model._meta.virtual_fields, qs.query
+        subqueries = _subquery_aggregates(fields[name] for name in self.fields)
+        for name, alias in zip(self.fields, self.aliases):
+            fields[name].add_to_query(qs, alias, subquery=name in subqueries)
+        if any(query.annotations[alias].contains_aggregate for alias in self.aliases):
+            query.group_by = True
+        return qs
+
+    def collect(self, objs: abc.Sequence["_T_Model"]):
+        if objs:
+            obj, self.values = objs[0], []
+            for alias in self.aliases:
+                self.values.append(obj.__dict__.pop(alias, None))
+
+    def assign(self, objs: abc.Iterable["_T_Model"], rows: abc.Iterable[tuple]):
+        for obj, values in zip(objs, rows):
+            for name, val in zip(self.fields, values):
+                setattr(obj, name, val)
+            self.values = values
+
+    def load(self, objs: abc.Iterable["_T_Model"], using=None, chunk_size=None):
+        objs = {obj.pk: obj for obj in objs if obj.pk is not None}
+        qs = self.add_to_query(_db_instance_qs(self.model, using).values_list("pk"))
+        for chunk in _iter_pk_chunks(objs, qs.db, chunk_size):
+            for pk, *values in qs.filter(pk__in=chunk):
+                self.assign((objs[pk],), (values,))
+
+
+class _PkParam(m.Expression):
+    """The pk parameter of a `_PkLookup` query."""
+
+    def as_sql(self, compiler, connection):
+        return "%s", [self]
+
+
+class _PkLookup:
+    """A values query compiled once per database alias and re-executed for a pk.
+
+    Fields whose SQL depends on the current time zone keep one per time zone.
+
+    Holds no connection, so that the threads using the alias share it. The
+    lookups of an alias are dropped whenever one of its connections is opened.
+    """
+
+    __slots__ = ("sql", "params", "pk", "index", "converters")
+    fields: ClassVar["WeakSet[VirtualField]"] = WeakSet()
+
+    def __init__(self, qs: m.QuerySet["_T_Model"]):
+        query = qs.filter(pk=_PkParam(qs.model._meta.pk)).query
+        query.clear_ordering(force=True)
+        compiler = query.get_compiler(qs.db)
+        self.sql, params = compiler.as_sql()
+        self.index = next(i for i, p in enumerate(params) if isinstance(p, _PkParam))
+        self.pk, self.params = params[self.index].output_field, tuple(params)
+        cols = [col for col, *_ in compiler.select[: compiler.col_count]]
+        self.converters = [*compiler.get_converters(cols).items()]
+
+    def execute(self, pk, connection):
+        params, i = self.params, self.index
+        pk = self.pk.get_db_prep_value(pk, connection)
+        with connection.cursor() as cursor:
+            cursor.execute(self.sql, (*params[:i], pk, *params[i + 1 :]))
+            rows = cursor.fetchall()
+
+        if converters := self.converters:
+            rows = [[*row] for row in rows]
+            for row in rows:
+                for pos, (convs, expr) in converters:
+                    for convert in convs:
+                        row[pos] = convert(row[pos], expr, connection)
+        return rows
+
+
+@receiver(connection_created)
+def _drop_pk_lookups(sender, connection, **kwargs):
+    for field in [*_PkLookup.fields]:
+        if lookups := field.__dict__.get("_pk_lookups"):
+            for key in [k for k in lookups if k[0] == connection.alias]:
+                lookups.pop(key, None)
+
 
 def _db_instance_qs(
     obj: "_T_Model | type[_T_Model]", using=None, pk=None, *, filter=None
@@ -21,3 +472,143 @@ def _db_instance_qs(
     man = obj._meta.base_manager
     qs: m.Manager["_T_Model"] = man.db_manager(using, hints=hints)
     return qs.filter(pk=obj.pk) if pk is not None else qs.all()
+
+
+def _update_shadow_columns(fields: abc.Iterable["VirtualField"], using, **lookup):
+    """Recompute the shadow columns of `fields` in the rows matching `lookup`."""
+    by_model = {}
+    for field in fields:
+        by_model.setdefault(field.model, []).append(field)
+    for model, fields in by_model.items():
+        qs = _db_instance_qs(model, using).filter(**lookup)
+        qs.update(**{f.name: f.get_shadow_expression() for f in fields})
+
+
+def _get_snapshot(obj: "_T_Model") -> dict | None:
+    """The column values of `obj` as last loaded or saved, `None` when unknown."""
+    snapshot = obj.__dict__.get(_SNAPSHOT)
+    if type(snapshot) is tuple:
+        # The `field_names` and `values` given to `from_db()`, mapped on first use.
+        snapshot = obj.__dict__[_SNAPSHOT] = dict(zip(*snapshot))
+    return snapshot
+
+
+def _get_changed(obj: "_T_Model", update_fields=None) -> set[str] | None:
+    """The attnames a save of `obj` writes changes to, `None` for all of them."""
+    opts = obj._meta
+    if obj._state.adding:
+        return None
+    elif update_fields is not None:
+        return {opts.get_field(name).attname for name in update_fields}
+    elif (snapshot := _get_snapshot(obj)) is None:
+        return None
+    attrs, missing = obj.__dict__, object()
+    changed = {
+        k
+        for k in opts.virtual_field_dependents
+        if k in attrs
+        and (old := snapshot.get(k, missing)) is not attrs[k]
+        and (old is missing or old != attrs[k])
+    }
+    # Values such as JSON can be changed in place, without an assignment.
+    changed.update(
+        k for k in opts.virtual_field_dependents if isinstance(attrs.get(k), _MUTABLE)
+    )
+    changed.update(f.attname for f in opts.concrete_fields if getattr(f, "auto_now", 0))
+    return changed
+
+
+def _forget_changed(obj: "_T_Model", attnames: abc.Iterable[str] | None = None):
+    """Record the current values of `attnames`, of all columns for `None`."""
+    attrs, snapshot = obj.__dict__, _get_snapshot(obj)
+    if attnames is None or snapshot is None:
+        snapshot = attrs[_SNAPSHOT] = {} if snapshot is None else snapshot
+        attnames = obj._meta.virtual_field_dependents if attnames is None else attnames
+    for k in attnames:
+        if k in attrs:
+            snapshot[k] = attrs[k]
+        else:
+            snapshot.pop(k, None)
+
+
+def _affected_by(
+    fields: abc.Mapping[str, "VirtualField"], changed: abc.Set[str] | None
+) -> abc.Mapping[str, "VirtualField"]:
+    """The `fields` that may depend on the `changed` attnames, all for `None`."""
+    if changed is None:
+        return fields
+    return {
+        name: field
+        for name, field in fields.items()
+        if (deps := field.concrete_dependencies) is None or not deps.isdisjoint(changed)
+    }
+
+
+def _iter_pk_chunks(pks: abc.Iterable, using=None, size: int = None):
+    if size is None:
+        size = connections[using or "default"].features.max_query_params
+    it = iter(pks)
+    while chunk := [*islice(it, size or None)]:
+        yield chunk
+
+
+def _depends_on_timezone(node) -> bool:
+    """Whether the SQL of `node` carries the name of the current time zone."""
+    return any(
+        isinstance(e, TimezoneMixin) and e.tzinfo is None for e in _iter_nodes(node)
+    )
+
+
+def _timezone_key(dependent: bool) -> str | None:
+    if dependent and settings.USE_TZ:
+        return timezone.get_current_timezone_name()
+    return None
+
+
+def _iter_nodes(node):
+    """Like `Expression.flatten()` but also walks into `WhereNode` and `Q` nodes."""
+    yield node
+    if isinstance(node, Node):
+        children = node.children
+    elif hasattr(node, "get_source_expressions"):
+        children = node.get_source_expressions()
+    else:
+        children = ()
+    for child in children:
+        if child is not None:
+            yield from _iter_nodes(child)
+
+
+def _can_return_virtual(connection, *, update=False):
+    if not connection.features.can_return_columns_from_insert:
+        return False
+    vendors = ("postgresql", "sqlite") if update else ("postgresql", "sqlite", "mysql")
+    return connection.vendor in vendors
+
+
+def _update_returning(
+    qs: m.QuerySet["_T_Model"], values: list, fields: abc.Sequence[m.Field]
+):
+    from django.db.models.sql import UpdateQuery
+
+    query = qs.query.chain(UpdateQuery)
+    query.add_update_fields(values)
+    query.annotations = {}
+    compiler = query.get_compiler(qs.db)
+    sql, params = compiler.as_sql()
+    if not sql:
+        return []
+
+    table = query.get_meta().db_table
+    cols = [field.get_col(table) for field in fields]
+    returning = [compiler.compile(col) for col in cols]
+    sql = f"{sql} RETURNING {', '.join(s for s, _ in returning)}"
+    params = (*params, *(p for _, ps in returning for p in ps))
+    with transaction.mark_for_rollback_on_error(using=qs.db):
+        with compiler.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+    if converters := compiler.get_converters(cols):
+        rows = list(compiler.apply_converters(rows, converters))
+    return rows
@@ -0,0 +1,372 @@
+"""Column-wise evaluation of virtual fields with NumPy.
+
+The leaves of a supported expression tree, columns and JSON keys, are fetched
+in chunks of rows. The arithmetic and conditions over them are then computed
+as array operations. NULL is `nan` in numeric arrays and `None` in object ones.
+"""
+from collections import abc
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from django.core.exceptions import FieldDoesNotExist, FieldError, ImproperlyConfigured
+from django.db import models as m
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import (
+    Case,
+    CombinedExpression,
+    ExpressionWrapper,
+    F,
+    Value,
+)
+from django.db.models.fields.json import KeyTransform
+from django.db.models.functions import Cast, Coalesce, Power
+
+from ._eval import _INTEGER_TYPES, _is_lookup
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+if TYPE_CHECKING:
+    from .fields import VirtualField
+    from .models import VirtualizedModel
+
+_T_Columns = dict[str, "np.ndarray"]
+
+
+class _Array(NamedTuple):
+    """A column of values, `integer` when SQL would compute it as an integer."""
+
+    values: Any
+    integer: bool = False
+
+
+_T_Node = abc.Callable[[_T_Columns], _Array]
+
+_LOOKUPS = {"exact", "lt", "lte", "gt", "gte", "in", "isnull"}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImproperlyConfigured(
+            "Vectorized evaluation of virtual fields requires numpy."
+        )
+    return np
+
+
+def _isnull(values):
+    if values.dtype == object:
+        return np.equal(values, None)
+    return np.isnan(values)
+
+
+def _to_array(column: abc.Sequence):
+    try:
+        return np.fromiter(
+            (np.nan if v is None else float(v) for v in column), float, len(column)
+        )
+    except (TypeError, ValueError):
+        return np.array(column, dtype=object)
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _as_float(values):
+    """`values` as floats, values that are not numbers (e.g. JSON null) as NULL."""
+    values = np.asarray(values)
+    if values.dtype == object:
+        return np.frompyfunc(_to_float, 1, 1)(values).astype(float)
+    return values.astype(float, copy=False)
+
+
+class _VectorCompiler:
+    def __init__(self, model: type["VirtualizedModel"]):
+        self.model, self.opts = model, model._meta
+        self.leaves: dict[Any, str] = {}
+
+    def compile(self, expr) -> _T_Node:
+        for cls in type(expr).__mro__:
+            if (method := self._dispatch.get(cls)) is not None:
+                return method(self, expr)
+        raise FieldError(f"{type(expr).__name__} cannot be evaluated vectorized.")
+
+    def compile_field(self, field: "VirtualField") -> _T_Node:
+        if field.fget is not None:
+            raise FieldError(f"{field} has a getter and cannot be vectorized.")
+        elif field.materialize:
+            return self.leaf(F(field.name), self.is_integer(field.output_field))
+        node = self.compile(field.raw_expression)
+        if field.cast:
+            node = self.cast(node, field.output_field)
+        return node
+
+    def leaf(self, expr, integer=False) -> _T_Node:
+        alias = self.leaves.setdefault(expr, f"_vv{len(self.leaves)}")
+        return lambda cols: _Array(cols[alias], integer)
+
+    @staticmethod
+    def is_integer(field: m.Field | None) -> bool:
+        return field is not None and field.get_internal_type() in _INTEGER_TYPES
+
+    def get_field(self, name: str) -> m.Field:
+        try:
+            return self.opts.get_field(name)
+        except FieldDoesNotExist as e:
+            raise FieldError(f"Cannot resolve {name!r}.") from e
+
+    def compile_f(self, expr: F) -> _T_Node:
+        from .fields import VirtualField
+
+        first = expr.name.split(LOOKUP_SEP, 1)[0]
+        field = self.get_field(first)
+        if isinstance(field, VirtualField) and first == expr.name:
+            return self.compile_field(field)
+        return self.leaf(expr, first == expr.name and self.is_integer(field))
+
+    def compile_key_transform(self, expr: KeyTransform) -> _T_Node:
+        return self.leaf(expr)
+
+    def compile_value(self, expr: Value) -> _T_Node:
+        value = expr.value
+        if value is None:
+            value = np.nan
+        elif not isinstance(value, (int, float, Decimal)):
+            value = np.array(value, dtype=object)
+        integer = isinstance(value, int)
+        return lambda cols: _Array(value, integer)
+
+    def compile_wrapper(self, expr: ExpressionWrapper) -> _T_Node:
+        return self.compile(expr.expression)
+
+    def compile_combined(self, expr: CombinedExpression) -> _T_Node:
+        lhs, rhs = map(self.compile, expr.get_source_expressions())
+        connector = expr.connector
+
+        def combine(cols):
+            (a, ai), (b, bi) = lhs(cols), rhs(cols)
+            a, b, integer = _as_float(a), _as_float(b), ai and bi
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if connector == CombinedExpression.ADD:
+                    values = a + b
+                elif connector == CombinedExpression.SUB:
+                    values = a - b
+                elif connector == CombinedExpression.MUL:
+                    values = a * b
+                elif connector == CombinedExpression.DIV:
+                    values = np.where(b == 0, np.nan, a / b)
+                    values = np.trunc(values) if integer else values
+                elif connector == CombinedExpression.MOD:
+                    values = np.where(b == 0, np.nan, np.fmod(a, b))
+                elif connector == CombinedExpression.POW:
+                    values, integer = np.power(a, b), False
+                else:
+                    raise FieldError(f"Unsupported connector {connector!r}.")
+            return _Array(values, integer)
+
+        return combine
+
+    def compile_power(self, expr: Power) -> _T_Node:
+        lhs, rhs = map(self.compile, expr.get_source_expressions())
+
+        def power(cols):
+            a, b = _as_float(lhs(cols).values), rhs(cols).values
+            with np.errstate(invalid="ignore"):
+                return _Array(np.power(a, _as_float(b)))
+
+        return power
+
+    def compile_coalesce(self, expr: Coalesce) -> _T_Node:
+        nodes = [self.compile(e) for e in expr.get_source_expressions()]
+
+        def coalesce(cols):
+            arrays = [node(cols) for node in nodes]
+            values = np.asarray(arrays[-1].values)
+            for array in reversed(arrays[:-1]):
+                current = np.asarray(array.values)
+                values = np.where(_isnull(current), values, current)
+            return _Array(values, all(a.integer for a in arrays))
+
+        return coalesce
+
+    def compile_cast(self, expr: Cast) -> _T_Node:
+        node = self.compile(expr.get_source_expressions()[0])
+        return self.cast(node, expr.output_field)
+
+    def cast(self, node: _T_Node, field: m.Field) -> _T_Node:
+        internal = field.get_internal_type()
+        if internal not in _INTEGER_TYPES | {"FloatField", "DecimalField"}:
+            raise FieldError(f"Cast to {internal} cannot be vectorized.")
+        integer = internal in _INTEGER_TYPES
+
+        def cast(cols):
+            values = _as_float(node(cols).values)
+            return _Array(np.trunc(values) if integer else values, integer)
+
+        return cast
+
+    def compile_case(self, expr: Case) -> _T_Node:
+        whens = [
+            (self.compile_q(when.condition), self.compile(when.result))
+            for when in expr.cases
+        ]
+        default = self.compile(expr.default)
+
+        def case(cols):
+            conds, results = [], []
+            for condition, result in whens:
+                conds.append(condition(cols)[0])
+                results.append(result(cols))
+            arrays, size = [*results, default(cols)], len(cols["pk"])
+            conds = [np.broadcast_to(c, size) for c in conds]
+            values = [np.broadcast_to(a.values, size) for a in arrays]
+            if any(v.dtype == object for v in values):
+                values = [v.astype(object) for v in values]
+            selected = np.select(conds, values[:-1], values[-1])
+            return _Array(selected, all(a.integer for a in arrays))
+
+        return case
+
+    def compile_q(self, q: m.Q) -> abc.Callable:
+        """Three-valued conditions, as masks of the true and the known rows."""
+        if not isinstance(q, m.Q):
+            raise FieldError(f"{type(q).__name__} cannot be evaluated vectorized.")
+        parts = [
+            self.compile_lookup(*c) if isinstance(c, tuple) else self.compile_q(c)
+            for c in q.children
+        ]
+        conjunction, negated = q.connector == m.Q.AND, q.negated
+
+        def condition(cols):
+            (true, known), *rest = (part(cols) for part in parts)
+            for t, k in rest:
+                if conjunction:
+                    known = (known & k) | (known & ~true) | (k & ~t)
+                    true = true & t
+                else:
+                    known = (known & k) | true | t
+                    true = true | t
+            return (known & ~true, known) if negated else (true, known)
+
+        return condition
+
+    def compile_lookup(self, lookup: str, rhs) -> abc.Callable:
+        *path, name = lookup.split(LOOKUP_SEP)
+        if name not in _LOOKUPS:
+            if path and _is_lookup(self.get_field(path[0]), path, name):
+                raise FieldError(f"Lookup {name!r} cannot be evaluated vectorized.")
+            path, name = [*path, name], "exact"
+        lhs = self.compile_f(F(LOOKUP_SEP.join(path)))
+        if name == "isnull":
+
+            def isnull(cols):
+                values = np.asarray(lhs(cols).values)
+                true = _isnull(values) == bool(rhs)
+                return true, np.ones_like(true)
+
+            return isnull
+        elif name == "in":
+            choices = [v for v in rhs if v is not None]
+
+            def isin(cols):
+                values = np.asarray(lhs(cols).values)
+                known = ~_isnull(values)
+                return np.isin(values, choices) & known, known
+
+            return isin
+
+        node = self.compile(rhs) if hasattr(rhs, "resolve_expression") else None
+        op = {
+            "exact": np.equal,
+            "lt": np.less,
+            "lte": np.less_equal,
+            "gt": np.greater,
+            "gte": np.greater_equal,
+        }[name]
+
+        def compare(cols):
+            a = np.asarray(lhs(cols).values)
+            b = np.asarray(rhs if node is None else node(cols).values)
+            known = ~_isnull(a) & ~_isnull(b)
+            return op(a, b) & known, np.broadcast_to(known, a.shape)
+
+        return compare
+
+    _dispatch = {
+        Value: compile_value,
+        F: compile_f,
+        KeyTransform: compile_key_transform,
+        ExpressionWrapper: compile_wrapper,
+        CombinedExpression: compile_combined,
+        Power: compile_power,
+        Coalesce: compile_coalesce,
+        Cast: compile_cast,
+        Case: compile_case,
+    }
+
+
+class _VectorPlan:
+    """The leaf expressions to fetch and the array program over them."""
+
+    __slots__ = ("fields", "leaves", "nodes")
+
+    def __init__(self, model: type["VirtualizedModel"], fields: list["VirtualField"]):
+        compiler = _VectorCompiler(model)
+        self.fields = fields
+        self.nodes = [compiler.compile_field(field) for field in fields]
+        self.leaves = {alias: expr for expr, alias in compiler.leaves.items()}
+
+    def evaluate(self, qs: m.QuerySet, chunk_size: int) -> dict[str, Any]:
+        """The arrays of the fields and of the primary keys, in `pk` order."""
+        _require_numpy()
+        qs = qs.order_by("pk").annotate(**self.leaves)
+        qs = qs.values_list("pk", *self.leaves)
+        pks, chunks = [], []
+        rows = [*qs[:chunk_size]]
+        while rows:
+            pk_column, *columns = zip(*rows)
+            cols = {a: _to_array(c) for a, c in zip(self.leaves, columns)}
+            cols["pk"] = np.array(pk_column)
+            chunks.append([self.output(f, n(cols), len(rows)) for f, n in self.items])
+            pks.extend(pk_column)
+            if len(rows) < chunk_size:
+                break
+            rows = [*qs.filter(pk__gt=pk_column[-1])[:chunk_size]]
+
+        arrays = {"pk": np.array(pks)}
+        for i, field in enumerate(self.fields):
+            parts = [chunk[i] for chunk in chunks]
+            arrays[field.name] = np.concatenate(parts) if parts else np.empty(0)
+        return arrays
+
+    @property
+    def items(self):
+        return zip(self.fields, self.nodes)
+
+    @staticmethod
+    def output(field: "VirtualField", array: _Array, size: int):
+        values = np.broadcast_to(array.values, size)
+        out = field.output_field
+        if values.dtype != object and out.get_internal_type() == "DecimalField":
+            values = np.round(values, out.decimal_places)
+        return np.array(values)
+
+    @staticmethod
+    def to_python(field: "VirtualField", value):
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return None
+        out = field.output_field
+        internal = out.get_internal_type()
+        if internal in _INTEGER_TYPES:
+            return int(value)
+        elif internal == "DecimalField":
+            quantum = Decimal(1).scaleb(-out.decimal_places)
+            return Decimal(repr(float(value))).quantize(quantum)
+        elif internal == "FloatField":
+            return float(value)
+        return value
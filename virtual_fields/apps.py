@@ -1,5 +1,52 @@
-from django.apps import AppConfig
+from django.apps import AppConfig, apps
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+from ._compat import _virtual_options_properties
+from ._counters import connect_counters
+from ._shadow import connect_shadows
+
+
+def warm_up(models=None):
+    """Resolve the lazy metadata of all virtual fields of `models`.
+
+    Defaults to all installed models. Enabled at startup by the
+    `VIRTUAL_FIELDS_WARM_UP` setting.
+    """
+    for model in apps.get_models() if models is None else models:
+        opts = model._meta
+        for name in _virtual_options_properties:
+            getattr(opts, name)
+        for field in opts.virtual_fields.values():
+            try:
+                field.warm_up()
+            except ImproperlyConfigured:
+                raise
+            except Exception as e:
+                raise ImproperlyConfigured(f"Invalid virtual field {field}: {e}") from e
+
+
+def check_virtual_fields(app_configs=None, **kwargs):
+    """Run the checks of virtual fields, which Django skips as private fields."""
+    if app_configs is None:
+        models = apps.get_models()
+    else:
+        models = [model for conf in app_configs for model in conf.get_models()]
+    return [
+        error
+        for model in models
+        for field in model._meta.virtual_fields.values()
+        for error in field.check(**kwargs)
+    ]
 
 
 class VirtualFieldsConfig(AppConfig):
     name = f"{__package__}"
+
+    def ready(self):
+        checks.register(check_virtual_fields, checks.Tags.models)
+        connect_counters()
+        connect_shadows()
+        if getattr(settings, "VIRTUAL_FIELDS_WARM_UP", False):
+            warm_up()
@@ -0,0 +1,131 @@
+from functools import cache
+
+from django.db import NotSupportedError, connections
+from django.db import models as m
+from django.db import router
+from django.db.models.fields import AutoFieldMixin
+
+from ._util import _subquery_aggregates
+
+__all__ = [
+    "create_view",
+    "drop_view",
+    "get_view_name",
+    "get_view_sql",
+    "refresh_view",
+    "view_model",
+]
+
+
+def get_view_name(model: type[m.Model]) -> str:
+    return f"{model._meta.db_table}_virtual"
+
+
+def _get_columns(model: type[m.Model]):
+    opts = model._meta
+    concrete = [f for f in opts.concrete_fields if not getattr(f, "is_virtual", False)]
+    virtual = [f for f in opts.virtual_fields.values() if f.output_field is not None]
+    return concrete, virtual
+
+
+def get_view_sql(model: type[m.Model], using: str = None) -> str:
+    """The `SELECT` of the concrete columns and virtual fields of `model`."""
+    using = using or router.db_for_read(model)
+    concrete, virtual = _get_columns(model)
+    qs = model._base_manager.using(using).values_list(*(f.attname for f in concrete))
+    subqueries = _subquery_aggregates(virtual)
+    for field in virtual:
+        field.add_to_query(qs, subquery=field.name in subqueries)
+    if any(a.contains_aggregate for a in qs.query.annotations.values()):
+        qs.query.set_group_by()
+    sql, params = qs.query.get_compiler(using).as_sql()
+    quote = connections[using].schema_editor().quote_value
+    return sql % tuple(map(quote, params))
+
+
+def create_view(
+    model: type[m.Model], using: str = None, *, materialized=False, replace=False
+):
+    """Create the view of `model`, a materialized one on PostgreSQL if asked."""
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    if materialized and connection.vendor != "postgresql":
+        raise NotSupportedError(
+            f"Materialized views are not supported on {connection.display_name}."
+        )
+
+    concrete, virtual = _get_columns(model)
+    quote, name = connection.ops.quote_name, get_view_name(model)
+    cols = [*(f.column for f in concrete), *(f.name for f in virtual)]
+    kind = "MATERIALIZED VIEW" if materialized else "VIEW"
+    replace and drop_view(model, using, materialized=materialized)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE {kind} {quote(name)} ({', '.join(map(quote, cols))}) "
+            f"AS {get_view_sql(model, using)}"
+        )
+        if materialized:
+            # Needed by `REFRESH MATERIALIZED VIEW CONCURRENTLY`.
+            pk = quote(model._meta.pk.column)
+            cursor.execute(
+                f"CREATE UNIQUE INDEX {quote(f'{name}_pk')} ON {quote(name)} ({pk})"
+            )
+
+
+def drop_view(model: type[m.Model], using: str = None, *, materialized=False):
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    kind = "MATERIALIZED VIEW" if materialized else "VIEW"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DROP {kind} IF EXISTS {connection.ops.quote_name(get_view_name(model))}"
+        )
+
+
+def refresh_view(model: type[m.Model], using: str = None, *, concurrently=False):
+    """Refresh the materialized view of `model`.
+
+    Plain views are always current, so this is a no-op outside PostgreSQL.
+    """
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}"
+            f"{connection.ops.quote_name(get_view_name(model))}"
+        )
+
+
+def _copy_field(field: m.Field, **kwargs) -> m.Field:
+    name, path, args, kw = field.deconstruct()
+    for k in ("primary_key", "unique", "db_index", "parent_link", "db_column"):
+        kw.pop(k, None)
+    if field.is_relation:
+        kw |= {"related_name": "+", "on_delete": m.DO_NOTHING, "db_constraint": False}
+    cls = field.__class__
+    if not kwargs.get("primary_key") and issubclass(cls, AutoFieldMixin):
+        cls = next(c for c in cls.__mro__[1:] if not issubclass(c, AutoFieldMixin))
+    return cls(*args, **kw | kwargs)
+
+
+@cache
+def view_model(model: type[m.Model]) -> type[m.Model]:
+    """An unmanaged model that reads from the view of `model`."""
+    opts = model._meta
+    concrete, virtual = _get_columns(model)
+    attrs = {
+        f.name: _copy_field(
+            f, db_column=f.column, **({"primary_key": True} if f is opts.pk else {})
+        )
+        for f in concrete
+        if f is opts.pk or not f.primary_key
+    }
+    attrs |= {f.name: _copy_field(f.output_field, db_column=f.name) for f in virtual}
+    meta = {"managed": False, "db_table": get_view_name(model)}
+    attrs |= {
+        "Meta": type("Meta", (), meta | {"app_label": opts.app_label}),
+        "__module__": model.__module__,
+    }
+    return type(f"{model.__name__}VirtualView", (m.Model,), attrs)
@@ -1,10 +1,11 @@
-import inspect
 from collections import abc
+from copy import deepcopy
 from enum import Enum
 from functools import reduce
 from logging import getLogger
 from operator import methodcaller, or_
 from threading import RLock
+from time import monotonic
 from types import GenericAlias, new_class
 from typing import (
     TYPE_CHECKING,
@@ -17,30 +18,67 @@ from typing import (
     get_origin,
     overload,
 )
+from weakref import ref
 
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.core import checks
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
 from django.core.exceptions import FieldError, ImproperlyConfigured
+from django.db import connections
 from django.db import models as m
+from django.db import router
 from django.db.models import base as models_mod
 from django.db.models.constants import LOOKUP_SEP
 from django.db.models.expressions import (
     BaseExpression,
+    Col,
     Combinable,
     Expression,
     ExpressionWrapper,
     F,
+    OuterRef,
+    RawSQL,
+    Subquery,
     Value,
 )
-from django.db.models.functions import Cast, Coalesce
+from django.db.models.fields.reverse_related import ForeignObjectRel
+from django.db.models.functions import (
+    Cast,
+    Coalesce,
+    ExtractDay,
+    ExtractMonth,
+    ExtractYear,
+    Now,
+    Random,
+)
 from django.db.models.query_utils import PathInfo
-from django.db.models.sql.compiler import SQLCompiler
 from django.db.models.sql.query import Query
 from django.dispatch import receiver
+from django.utils.deconstruct import deconstructible
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from typing_extensions import Self
 
-from ._compat import add_virtual_field_support
-from ._util import _db_instance_qs
+from ._cache import _LOADED, _Revalidator, _SharedCache
+from ._compat import _active_query, add_virtual_field_support
+from ._counters import _get_counter
+from ._eval import _Fallback, compile_expression
+from ._shadow import get_untracked_relations
+from ._util import (
+    _db_instance_qs,
+    _depends_on_timezone,
+    _get_changed,
+    _iter_nodes,
+    _iter_pk_chunks,
+    _timezone_key,
+    _SLOTS,
+    _InternPool,
+    _LazyValue,
+    _PkLookup,
+    _SqlMemo,
+    _VirtualTable,
+)
 
 if TYPE_CHECKING:
     from .models import VirtualizedModel
@@ -58,6 +96,7 @@ logger = getLogger(__name__)
 
 
 DEFERRED = models_mod.DEFERRED
+_REF = "_virtual_ref_"
 
 
 def _attrsetter_decorator(name: str, typ: type = Any, *, call=False):
@@ -94,6 +133,35 @@ class FieldPath(NamedTuple):
     src: "VirtualField" = None
 
 
+@deconstructible(path="virtual_fields.fields.VirtualRef")
+class VirtualRef(Expression):
+    """A reference to the virtual field `name`, resolved to its expression.
+
+    Used by the indexes of virtual fields, where an `F()` would be rejected
+    by the model checks as not referring to a local field.
+    """
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.name!r})"
+
+    def resolve_expression(
+        self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False
+    ):
+        return query.resolve_ref(self.name, allow_joins, reuse, summarize)
+
+
+class CounterCol(Col):
+    """The column of a counter, which is NULL until the first change is counted."""
+
+    def as_sql(self, compiler, connection):
+        sql, params = super().as_sql(compiler, connection)
+        return f"COALESCE({sql}, 0)", params
+
+
 class VirtualFieldDescriptor:
     field: "VirtualField"
     cache: bool = None
@@ -118,7 +186,9 @@ class VirtualFieldDescriptor:
 
         cache = self.cache
         if cache and (name := self.attname) in (data := self.get_cache_dict(obj)):
-            return data[name]
+            if type(val := data[name]) is _LazyValue:
+                data[name] = val = val.resolve()
+            return val
 
         val = self.get_instance_value(obj)
         if val is NotImplemented:
@@ -138,12 +208,74 @@ class VirtualFieldDescriptor:
         return obj.__dict__
 
     def get_db_value(self, obj: _T_Model):
-        qs = self.field.get_queryset_for_object(obj)
-        return qs.values_list(self.fieldname, flat=True).get()
+        if self.cache and self.field.cache_backend is not None:
+            return self.get_shared_db_value(obj)
+        elif self.cache and len(peers := getattr(obj._state, "virtual_peers", ())) > 1:
+            return self.get_peers_db_value(obj, peers)
+        return self.field.fetch_db_value(obj)
+
+    def get_peers_db_value(self, obj: _T_Model, peers: abc.Iterable):
+        objs = self.get_uncached_peers(peers)
+        if obj.pk not in objs:
+            return self.field.fetch_db_value(obj)
+        values = dict(self.field.iter_db_values(objs, using=obj._state.db))
+        val = self.set_peers_db_values(obj, objs, values.items())
+        # Without its row, raises `DoesNotExist` as for an instance loaded alone.
+        return val if obj.pk in values else self.field.fetch_db_value(obj)
+
+    def get_shared_db_value(self, obj: _T_Model):
+        peers = getattr(obj._state, "virtual_peers", None) or (ref(obj),)
+        objs = self.get_uncached_peers(peers)
+        if obj.pk not in objs:
+            return self.field.fetch_db_value(obj)
+
+        values = self.field.shared_cache.get_many(objs, using=obj._state.db)
+        if obj.pk not in values:
+            return self.field.fetch_db_value(obj)
+        return self.set_peers_db_values(obj, objs, values.items())
+
+    def get_uncached_peers(self, peers: abc.Iterable) -> dict[Any, list[_T_Model]]:
+        objs = {}
+        for peer in peers:
+            if (peer := peer()) is None or peer._state.adding or peer.pk is None:
+                continue
+            elif not self.is_cached(peer):
+                objs.setdefault(peer.pk, []).append(peer)
+        return objs
+
+    def is_cached(self, obj: _T_Model) -> bool:
+        return self.attname in self.get_cache_dict(obj)
+
+    def set_peers_db_values(self, obj: _T_Model, objs: dict, values: abc.Iterable):
+        val = None
+        for pk, v in values:
+            for peer in objs[pk]:
+                if peer is obj:
+                    val = v
+                elif (pv := self.get_default() if v is None else v) is not DEFERRED:
+                    self.set_cached(peer, pv)
+        return val
+
+    def set_cached(self, obj: _T_Model, val):
+        self.get_cache_dict(obj)[self.attname] = val
 
     def get_instance_value(self, obj: _T_Model):
+        evaluate = self.field.python_evaluator
+        # A loaded row is authoritative while the columns it was read with are kept.
+        if evaluate is not None and self.is_changed(obj):
+            try:
+                return evaluate(obj)
+            except _Fallback:
+                pass
         return self.get_default() if obj._state.adding else self.get_db_value(obj)
 
+    def is_changed(self, obj: _T_Model) -> bool:
+        """Whether `obj` is unsaved or its row may not match the columns it holds."""
+        changed = _get_changed(obj)
+        return changed is None or not changed.isdisjoint(
+            self.field.concrete_dependencies
+        )
+
     @overload
     def get_default(self):
         ...
@@ -151,6 +283,171 @@ class VirtualFieldDescriptor:
     get_default = None
 
 
+class ExpiringFieldDescriptor(VirtualFieldDescriptor):
+    """A descriptor whose cached value is reloaded after the field's `cache_ttl`."""
+
+    ttl: float
+
+    def __init__(self, field: "VirtualField"):
+        super().__init__(field)
+        self.ttl = field.cache_ttl
+
+    def __get__(self, obj: _T_Model, cls=None):
+        if obj is None:
+            return self
+        elif (name := self.attname) in (data := self.get_cache_dict(obj)):
+            if not self.is_fresh(obj):
+                del data[name]
+            elif type(val := data[name]) is _LazyValue:
+                data[name] = val = val.resolve()
+                return val
+            else:
+                return val
+
+        val = super().__get__(obj, cls)
+        if name in data:
+            obj.__dict__.setdefault(_LOADED, {})[name] = monotonic()
+        return val
+
+    def __set__(self, obj: _T_Model, val):
+        self.get_cache_dict(obj)[self.attname] = val
+        obj.__dict__.setdefault(_LOADED, {})[self.attname] = monotonic()
+
+    def __delete__(self, obj: _T_Model):
+        if (name := self.attname) not in (data := self.get_cache_dict(obj)):
+            raise AttributeError(name)
+        del data[name]
+        obj.__dict__.get(_LOADED, {}).pop(name, None)
+
+    set_cached = __set__
+
+    def is_cached(self, obj: _T_Model) -> bool:
+        return super().is_cached(obj) and not self.is_expired(obj, monotonic())
+
+    def is_fresh(self, obj: _T_Model) -> bool:
+        now, name = monotonic(), self.attname
+        if obj.__dict__.setdefault(_LOADED, {}).setdefault(name, now) + self.ttl > now:
+            return True
+        elif not self.field.stale_while_revalidate:
+            return False
+        elif (val := self.revalidator.take(obj)) is not DEFERRED:
+            self.set_cached(obj, val)
+        elif not self.revalidator.is_waiting(obj):
+            # Keeps serving the stale value until the reload lands.
+            self.revalidator.schedule(self.get_expired_peers(obj, now))
+        return True
+
+    def is_expired(self, obj: _T_Model, now: float) -> bool:
+        loaded = obj.__dict__.get(_LOADED, {}).get(self.attname)
+        return loaded is not None and loaded + self.ttl <= now
+
+    def get_expired_peers(self, obj: _T_Model, now: float) -> list[_T_Model]:
+        objs = [obj]
+        for peer in getattr(obj._state, "virtual_peers", ()):
+            if (peer := peer()) is not None and peer is not obj and peer.pk is not None:
+                self.is_expired(peer, now) and objs.append(peer)
+        return objs
+
+    @cached_property
+    def revalidator(self) -> _Revalidator:
+        return _Revalidator(self)
+
+
+def _load_field_expression(label: str, name: str, attr: str):
+    return getattr(global_apps.get_model(label)._meta.get_field(name), attr)
+
+
+class _FieldExpression:
+    """An expression computing the values of `target`.
+
+    The field's own `final_expression` and `cached_col` are pickled as references
+    to the field, their copies by value.
+    """
+
+    target: "VirtualField"
+
+    def __reduce_ex__(self, protocol):
+        if (attr := self.__dict__.get(_REF)) is None:
+            return super().__reduce_ex__(protocol)
+        label, name = self.target.model._meta.label, self.target.name
+        return _load_field_expression, (label, name, attr)
+
+    def __copy__(self):
+        obj = self.__class__.__new__(self.__class__)
+        obj.__dict__.update(self.__getstate__())
+        obj.__dict__.pop(_REF, None)
+        return obj
+
+    def __deepcopy__(self, memo):
+        memo[id(self)] = obj = self.__copy__()
+        obj.__dict__.update(deepcopy(obj.__dict__, memo))
+        return obj
+
+
+class VirtualWrapper(_FieldExpression, ExpressionWrapper):
+    pass
+
+
+class VirtualCast(_FieldExpression, Cast):
+    pass
+
+
+class _Interned:
+    """Converts the values of `target` to the objects of its intern pool."""
+
+    target: "VirtualField"
+
+    def get_db_converters(self, connection):
+        return [*super().get_db_converters(connection), self.target.intern_pool.convert]
+
+
+class InternedWrapper(_Interned, VirtualWrapper):
+    pass
+
+
+class InternedCast(_Interned, VirtualCast):
+    pass
+
+
+class SlotFieldDescriptor(VirtualFieldDescriptor):
+    """A descriptor keeping the cached value in the compact slots of the instance.
+
+    The slots are allocated on the first access to one of the model's slot-stored
+    virtual fields.
+    """
+
+    def __set__(self, obj: _T_Model, val):
+        self.get_cache_dict(obj)[self.attname] = val
+
+    def __delete__(self, obj: _T_Model):
+        try:
+            del self.get_cache_dict(obj)[self.attname]
+        except KeyError:
+            raise AttributeError(self.attname) from None
+
+    def get_cache_dict(self, obj: _T_Model):
+        if (slots := (attrs := obj.__dict__).get(_SLOTS)) is None:
+            slots = attrs[_SLOTS] = obj._meta.virtual_field_slots()
+        return slots
+
+
+class LazyFieldDescriptor(VirtualFieldDescriptor):
+    """A descriptor for values whose db converters run on first access.
+
+    A data descriptor, so that the unconverted values loaded from the database
+    cannot shadow it in the instance dict.
+    """
+
+    def __set__(self, obj: _T_Model, val):
+        self.get_cache_dict(obj)[self.attname] = val
+
+    def __delete__(self, obj: _T_Model):
+        try:
+            del self.get_cache_dict(obj)[self.attname]
+        except KeyError:
+            raise AttributeError(self.attname) from None
+
+
 class VirtualField(m.Field, Generic[_T_Field]):
     vars().update(Behaviour.__members__)
     if TYPE_CHECKING:
@@ -170,6 +467,14 @@ class VirtualField(m.Field, Generic[_T_Field]):
     fset: _T_Fn | None
     fdel: _T_Fn | None
     is_virtual: bool = True
+    materialize: str | None = None
+    cache_backend: str | None = None
+    cache_timeout: float | None = DEFAULT_TIMEOUT
+    cache_ttl: float | None = None
+    stale_while_revalidate: bool = False
+    storage: str = "dict"
+    intern: bool | None = None
+    lazy_conversion: bool = False
     __output_typed_: Final = {}
     __out_lock: Final = RLock()
 
@@ -184,6 +489,46 @@ class VirtualField(m.Field, Generic[_T_Field]):
     _output_type_: Final[type[_T_Field]] = None
     _output_args_: ClassVar = None
     _output_kwargs_: ClassVar = None
+    _col_cache_maxsize_: ClassVar[int] = 256
+    _intern_maxsize_: ClassVar[int] = 1024
+    _expression_cached_attrs_: ClassVar = (
+        "source_expressions",
+        "raw_expression",
+        "final_expression",
+        "source_output_field",
+        "output_field",
+        "cached_col",
+        "_col_cache",
+        "_pk_lookups",
+        "depends_on_timezone",
+        "concrete_dependencies",
+        "python_evaluator",
+        "has_joins",
+        "is_returnable",
+        "is_aggregate",
+        "shared_cache",
+        "intern_pool",
+    )
+    _warm_up_attrs_: ClassVar = (
+        "final_expression",
+        "source_output_field",
+        "output_field",
+        "cached_col",
+        "has_joins",
+        "is_returnable",
+        "is_computable",
+        "on_model_add",
+        "on_model_save",
+        "on_model_refresh",
+        "descriptor_class",
+    )
+    _materialize_modes_: ClassVar = (None, "stored", "shadow", "counter")
+    _storage_modes_: ClassVar = ("dict", "slots")
+    _unique_for_parts_: ClassVar = {
+        "date": (ExtractYear, ExtractMonth, ExtractDay),
+        "month": (ExtractMonth,),
+        "year": (ExtractYear,),
+    }
     _init_defaults_ = {
         # "null": True,
         "default": DEFERRED,
@@ -280,6 +625,14 @@ class VirtualField(m.Field, Generic[_T_Field]):
         blank: bool = False,
         null: bool = False,
         cast: bool = False,
+        materialize: str | None = None,
+        cache_backend: str | None = None,
+        cache_timeout: float | None = ...,
+        cache_ttl: float | None = None,
+        stale_while_revalidate: bool = False,
+        storage: str = "dict",
+        intern: bool | None = None,
+        lazy_conversion: bool = False,
         db_index: bool = False,
         default=...,
         editable: bool = False,
@@ -304,20 +657,49 @@ class VirtualField(m.Field, Generic[_T_Field]):
         defer: bool = None,
         cache: bool | None = None,
         cast: bool = None,
+        materialize: str | None = None,
+        cache_backend: str | None = None,
+        cache_timeout: float | None = DEFAULT_TIMEOUT,
+        cache_ttl: float | None = None,
+        stale_while_revalidate: bool = False,
+        storage: str = "dict",
+        intern: bool | None = None,
+        lazy_conversion: bool = False,
         fget: _T_Fn = None,
         fset: _T_Fn = None,
         fdel: _T_Fn = None,
         **kwargs,
     ):
         kwargs, bfk = self._init_defaults_ | kwargs, self._base_field_kwargs_
+        if materialize in ("shadow", "counter"):
+            # rows are inserted before their shadow column is computed.
+            kwargs["null"] = True
         super().__init__(**{k: v for k, v in kwargs.items() if k in bfk})
         self.set_source_expressions(*expressions)
         self.fget, self.fset, self.fdel, self.cast = fget, fset, fdel, cast
 
+        if materialize not in self._materialize_modes_:
+            raise ImproperlyConfigured(
+                f"Invalid argument `materialize`. "
+                f"Expected one of {self._materialize_modes_!r} not {materialize!r}."
+            )
+        self.materialize = materialize
+        if materialize is not None and defer is None:
+            defer = False
+
         if defer is not None:
             self.defer = defer
         if cache is not None:
             self.cache = cache
+        self.cache_backend, self.cache_timeout = cache_backend, cache_timeout
+        self.cache_ttl, self.stale_while_revalidate = cache_ttl, stale_while_revalidate
+        if storage not in self._storage_modes_:
+            raise ImproperlyConfigured(
+                f"Invalid argument `storage`. "
+                f"Expected one of {self._storage_modes_!r} not {storage!r}."
+            )
+        self.storage, self.intern = storage, intern
+        self.lazy_conversion = lazy_conversion
 
         if output_field is None and self._output_type_:
             kwargs = (self._output_kwargs_ or {}) | kwargs
@@ -359,17 +741,28 @@ class VirtualField(m.Field, Generic[_T_Field]):
     def cache(self):
         return (None, None, None) == (self.fget, self.fset, self.fdel)
 
+    @cached_property
+    def shared_cache(self) -> _SharedCache:
+        return _SharedCache(self)
+
     @cached_property
     def output_field(self) -> _T_Field:
         return self._output_field or self.source_output_field
 
     @cached_property
     def final_expression(self):
-        src, out, cast = self.raw_expression, self.output_field, self.cast
-        expr = (Cast if cast else ExpressionWrapper)(src, output_field=out)
-        expr.target = self
+        expr = self.wrap(self.raw_expression, cast=self.cast)
+        expr.__dict__[_REF] = "final_expression"
         return expr
 
+    @cached_property
+    def intern_pool(self) -> _InternPool | None:
+        """The pool of canonical values, by default for fields with `choices`."""
+        choices = self.flatchoices or getattr(self.output_field, "flatchoices", None)
+        if self.intern or (self.intern is None and choices):
+            seed = (value for value, _ in choices or ())
+            return _InternPool(self._intern_maxsize_, seed)
+
     @cached_property
     def source_output_field(self) -> _T_Field | None:
         q, src = self._queryset.query, self.raw_expression
@@ -394,12 +787,43 @@ class VirtualField(m.Field, Generic[_T_Field]):
     def cached_col(self):
         expr, qs = self.final_expression, self._queryset
         annotation = expr.resolve_expression(qs.query)
-        return annotation
+        annotation.__dict__[_REF] = "cached_col"
+        return _SqlMemo.attach(annotation, self._inline_sql)
+
+    @property
+    def _inline_sql(self) -> bool:
+        return bool(self.db_index or self.is_indexed)
+
+    @cached_property
+    def _col_cache(self) -> dict[tuple, tuple[Expression, tuple]]:
+        return {}
+
+    @cached_property
+    def _pk_lookups(self) -> dict[tuple, _PkLookup]:
+        return {}
+
+    @cached_property
+    def depends_on_timezone(self) -> bool:
+        """Whether the SQL of the field carries the name of the current time zone."""
+        return _depends_on_timezone(self.cached_col)
 
     @cached_property
     def descriptor_class(self):
         fget, fset, fdel = self.get_fget(), self.get_fset(), self.get_fdel()
-        return self._define_descriptor_class(fget, fset, fdel, cached=self.cache)
+        bases = []
+        if self.cache and self.cache_ttl is not None:
+            bases.append(ExpiringFieldDescriptor)
+        if self.cache and self.storage == "slots":
+            bases.append(SlotFieldDescriptor)
+        if self.cache and self.lazy_conversion:
+            bases.append(LazyFieldDescriptor)
+        base = bases[0] if len(bases) == 1 else None
+        if len(bases) > 1:
+            name = "".join(b.__name__.removesuffix("FieldDescriptor") for b in bases)
+            base = new_class(f"{name}FieldDescriptor", tuple(bases))
+        return self._define_descriptor_class(
+            fget, fset, fdel, cached=self.cache, base=base
+        )
 
     @cached_property
     def has_joins(self):
@@ -409,30 +833,335 @@ class VirtualField(m.Field, Generic[_T_Field]):
         return False
 
     @cached_property
-    def is_computable(self) -> bool:
-        return self.fget is not None
+    def is_returnable(self) -> bool:
+        if self.has_joins:
+            return False
+        expr = self.cached_col
+        if expr.contains_aggregate or expr.contains_over_clause:
+            return False
+        return not any(getattr(e, "subquery", False) for e in expr.flatten())
 
-    def get_col(self, alias, output_field=None):
-        if not self.has_joins:
-            return self.cached_col
+    @cached_property
+    def is_aggregate(self) -> bool:
+        return not self.materialize and self.cached_col.contains_aggregate
 
-        call = query = this = None
-        try:
-            call = (inspect.stack()[1:2] or (None,))[0]
-            if not (hasattr(call, "frame") and hasattr(call.frame, "f_locals")):
-                pass
-            elif (this := call.frame.f_locals.get("self")) is not None:
-                query = this.query if isinstance(this, SQLCompiler) else this
-                if isinstance(query, Query) and self.name not in query.annotations:
-                    return self.final_expression.resolve_expression(query)
-        finally:
-            del call, query, this
+    @cached_property
+    def is_computable(self) -> bool:
+        return self.fget is not None
 
+    @property
+    def is_stored(self) -> bool:
+        return self.materialize == "stored"
+
+    @property
+    def is_shadow(self) -> bool:
+        return self.materialize == "shadow"
+
+    @property
+    def is_counter(self) -> bool:
+        return self.materialize == "counter"
+
+    def get_col(self, alias, output_field=None, *, query: Query = None):
+        if query is None:
+            query = _active_query.get()
+        if self.materialize and not getattr(query, "_inline_virtual_", False):
+            return (CounterCol if self.is_counter else Col)(
+                alias, self, self.output_field
+            )
+        elif query is not None and isinstance(
+            table := query.alias_map.get(alias), _VirtualTable
+        ):
+            return table.get_col(self, alias, query)
+        elif not self.has_joins:
+            if alias == (table := self.model._meta.db_table):
+                return self.cached_col
+            elif (hit := self._col_cache.get(alias)) is None:
+                col = self.cached_col.relabeled_clone({table: alias})
+                hit = self._cache_col(alias, _SqlMemo.attach(col, self._inline_sql))
+            return hit[0]
+
+        if isinstance(query, Query) and self.name not in query.annotations:
+            return self._resolve_col(query)
         return self.cached_col
 
+    def _resolve_col(self, query: Query):
+        if getattr(query, "_filtered_relations", None):
+            return self.final_expression.resolve_expression(query)
+
+        shape = tuple((a, j, j.join_type) for a, j in query.alias_map.items())
+        key, refcount = (shape, *query.annotations), query.alias_refcount
+        if (hit := self._col_cache.get(key)) is not None:
+            col, refs = hit
+            for a, n in refs:
+                refcount[a] += n
+            return col
+
+        before = dict(refcount)
+        col = self.final_expression.resolve_expression(query)
+        if shape == tuple((a, j, j.join_type) for a, j in query.alias_map.items()):
+            refs = tuple(
+                (a, n - before[a]) for a, n in refcount.items() if n != before[a]
+            )
+            self._cache_col(key, _SqlMemo.attach(col), refs)
+        return col
+
+    def _cache_col(self, key, col: Expression, refs: tuple = ()):
+        if len(cache := self._col_cache) >= self._col_cache_maxsize_:
+            cache.clear()
+        cache[key] = hit = col, refs
+        return hit
+
+    def warm_up(self):
+        for name in self._warm_up_attrs_:
+            getattr(self, name)
+        if self.output_field is None:
+            raise ImproperlyConfigured(
+                f"Unable to resolve the `output_field` of {self}. "
+                f"Pass it explicitly."
+            )
+
     def get_internal_type(self):  # pragma: no cover
         return "VirtualField"
 
+    def db_type(self, connection):
+        if not self.materialize:
+            return super().db_type(connection)
+        db_type = self.output_field.db_type(connection)
+        if self.is_shadow or self.is_counter:
+            return db_type
+        sql = self.generated_sql(connection)
+        return f"{db_type} GENERATED ALWAYS AS ({sql}) STORED"
+
+    def generated_sql(self, connection) -> str:
+        query = Query(self.model, alias_cols=False)
+        query._inline_virtual_ = True
+        expr = self.final_expression.resolve_expression(query, allow_joins=False)
+        sql, params = query.get_compiler(connection=connection).compile(expr)
+        if getattr(expr, "conditional", False) and not (
+            connection.features.supports_boolean_expr_in_select_clause
+        ):
+            sql = f"CASE WHEN {sql} THEN 1 ELSE 0 END"
+        quote = connection.schema_editor().quote_value
+        return sql % tuple(map(quote, params))
+
+    def get_db_prep_save(self, value, connection):
+        if value is DEFERRED:
+            return None
+        return super().get_db_prep_save(value, connection)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        path = f"{VirtualField.__module__}.{VirtualField.__name__}"
+        for k, v in self._init_defaults_.items():
+            if kwargs.get(k, v) == v:
+                kwargs.pop(k, None)
+
+        bound = hasattr(self, "model")
+        args = [*(self.source_expressions if bound else self.expressions)]
+        if out := self.output_field if bound else self._output_field:
+            *_, out_args, out_kwargs = out.deconstruct()
+            skip = {*self._init_defaults_, "db_index", "unique"}
+            skip.update(f"unique_for_{k}" for k in self._unique_for_parts_)
+            out_kwargs = {k: v for k, v in out_kwargs.items() if k not in skip}
+            kwargs["output_field"] = out.__class__(*out_args, **out_kwargs)
+        kwargs.update(
+            (k, v)
+            for k, v in (
+                ("defer", self.__dict__.get("defer")),
+                ("cast", self.cast),
+                ("materialize", self.materialize),
+            )
+            if v is not None
+        )
+        return name, path, args, kwargs
+
+    def check(self, **kwargs):
+        return [
+            *super().check(**kwargs),
+            *self._check_materialize(),
+            *self._check_shadow(),
+            *self._check_indexes(),
+            *self._check_cache(),
+        ]
+
+    def _check_materialize(self):
+        hint = "Remove `materialize` or use a same-table expression."
+        if self.is_shadow and self.output_field is None:
+            reason = "its `output_field` cannot be resolved"
+            hint = "Pass `output_field` explicitly."
+        elif self.is_stored:
+            reason = self._get_ineligible_reason(inline=False)
+        elif self.is_counter and isinstance(reason := _get_counter(self), str):
+            hint = "Remove `materialize` or use `materialize=\"shadow\"`."
+        else:
+            reason = None
+        if reason:
+            return [
+                checks.Error(
+                    f"{self.__class__.__name__} cannot be stored because {reason}.",
+                    hint=hint,
+                    obj=self,
+                    id="virtual_fields.E001",
+                )
+            ]
+        return []
+
+    def _check_shadow(self):
+        if not self.is_shadow or self.output_field is None:
+            return []
+        return [
+            checks.Warning(
+                f"The shadow column of {self} is not refreshed when the rows of "
+                f"`{lookup}` change.",
+                hint="Recompute it with the `virtualfields_backfill` command.",
+                obj=self,
+                id="virtual_fields.W001",
+            )
+            for lookup in get_untracked_relations(self)
+        ]
+
+    def _check_indexes(self):
+        unique_for = (getattr(self, f"unique_for_{k}") for k in self._unique_for_parts_)
+        if self.materialize or not (
+            self.db_index or self.unique or self.is_indexed or any(unique_for)
+        ):
+            return []
+        elif reason := self._get_ineligible_reason(inline=True):
+            return [
+                checks.Error(
+                    f"{self.__class__.__name__} cannot be indexed because {reason}.",
+                    hint=(
+                        "Remove `db_index`, `unique` and the indexes or constraints "
+                        "naming this field."
+                    ),
+                    obj=self,
+                    id="virtual_fields.E002",
+                )
+            ]
+        return []
+
+    def _check_cache(self):
+        options = [
+            f"`{k}`"
+            for k in ("cache_backend", "cache_ttl")
+            if getattr(self, k) is not None
+        ]
+        if self.storage != "dict":
+            options.append("`storage`")
+        if self.lazy_conversion:
+            options.append("`lazy_conversion`")
+        if not options:
+            return []
+        elif not self.cache:
+            reason = "its values are not cached on the instance"
+        elif (alias := self.cache_backend) and alias not in settings.CACHES:
+            reason = f"the cache {alias!r} is not configured in `CACHES`"
+        else:
+            return []
+        return [
+            checks.Error(
+                f"{self.__class__.__name__} cannot use {' and '.join(options)} "
+                f"because {reason}.",
+                hint="Remove the option or fix the cache configuration.",
+                obj=self,
+                id="virtual_fields.E003",
+            )
+        ]
+
+    def _get_ineligible_reason(self, *, inline: bool) -> str | None:
+        if self.output_field is None:
+            return "its `output_field` cannot be resolved"
+        elif not self.is_returnable:
+            return (
+                "it spans relations or uses aggregates, window functions or "
+                "subqueries"
+            )
+        elif not inline and any(not f.is_stored for f in self.dependencies):
+            return "it references virtual fields that are not stored"
+        elif any(isinstance(e, (Now, Random)) for e in _iter_nodes(self.cached_col)):
+            return "its expression is not deterministic"
+
+    @property
+    def dependencies(self) -> list["VirtualField"]:
+        """The virtual fields this field's expression resolves, at any depth."""
+        deps = (getattr(e, "target", None) for e in _iter_nodes(self.cached_col))
+        return [*{f: f for f in deps if isinstance(f, VirtualField) and f is not self}]
+
+    @cached_property
+    def concrete_dependencies(self) -> frozenset[str] | None:
+        """The attnames of the model's columns this field is computed from.
+
+        `None` when they cannot be derived, as for getters, subqueries or raw SQL.
+        """
+        opaque = (Subquery, RawSQL)
+        if self.fget is not None:
+            return None
+        elif any(isinstance(e, opaque) for e in self.raw_expression.flatten()):
+            return None
+        elif any(f.concrete_dependencies is None for f in self.dependencies):
+            return None
+
+        attnames = set()
+        for path in filter(None, self._iter_source_field_paths()):
+            if not path.info:
+                attnames.add(path.field.attname)
+            elif isinstance(rel := path.info[0].join_field, ForeignObjectRel):
+                attnames.update(f.attname for f in rel.field.foreign_related_fields)
+            else:
+                attnames.update(f.attname for f in rel.local_related_fields)
+        return frozenset(attnames)
+
+    @cached_property
+    def python_evaluator(self) -> abc.Callable[[_T_Model], Any] | None:
+        """Computes the value from the loaded columns of an instance, without a query.
+
+        `None` when the expression has nodes without a Python translation. The
+        evaluator raises `_Fallback` when a column is not loaded, and for string
+        comparisons on backends whose collations may disagree with Python's.
+        """
+        if self.fget is not None or self.materialize:
+            return None
+        src, out, cast = self.raw_expression, self.output_field, self.cast
+        evaluate = compile_expression(self.model, src, out, cast=cast)
+        if evaluate is None or (pool := self.intern_pool) is None:
+            return evaluate
+        convert = pool.convert
+        return lambda obj: convert(evaluate(obj))
+
+    @property
+    def is_indexed(self) -> bool:
+        opts = self.model._meta
+        return any(
+            isinstance(e, VirtualRef) and e.name == self.name
+            for index in (*opts.indexes, *opts.constraints)
+            for expr in getattr(index, "expressions", ())
+            for e in _iter_nodes(expr)
+        )
+
+    def wrap(self, expr, cast=False) -> VirtualWrapper | VirtualCast:
+        """`expr` with this field's output field, converted to its values."""
+        if self.intern_pool is None:
+            cls = VirtualCast if cast else VirtualWrapper
+        else:
+            cls = InternedCast if cast else InternedWrapper
+        wrapped = cls(expr, output_field=self.output_field)
+        wrapped.target = self
+        return wrapped
+
+    def get_db_converters(self, connection):
+        converters = super().get_db_converters(connection)
+        if (pool := self.intern_pool) is not None:
+            converters.append(pool.convert)
+        return converters
+
+    def get_unique_expressions(self, lookup: str = None) -> list[Expression]:
+        """The expressions of the unique constraint for `unique` or `unique_for_*`."""
+        expressions = [VirtualRef(self.name)]
+        if lookup is not None:
+            date_field = getattr(self, f"unique_for_{lookup}")
+            expressions += [f(date_field) for f in self._unique_for_parts_[lookup]]
+        return expressions
+
     def clean(self, value, model_instance):
         return self.output_field.clean(value, model_instance)
 
@@ -442,7 +1171,11 @@ class VirtualField(m.Field, Generic[_T_Field]):
     def contribute_to_class(self, cls, name, private_only=None):
         from .models import ImplementsVirtualFields, VirtualizedModel
 
-        super().contribute_to_class(cls, name, private_only is not False)
+        historical = self.materialize and cls._meta.apps is not global_apps
+        private_only = private_only is not False and not historical
+        super().contribute_to_class(cls, name, private_only)
+        if historical:
+            self.concrete = True
 
         add_virtual_field_support(cls)
         assert isinstance(getattr(cls, self.attname), self.descriptor_class)
@@ -453,14 +1186,74 @@ class VirtualField(m.Field, Generic[_T_Field]):
 
     def set_source_expressions(self, *expressions):
         self.expressions = expressions
+        for name in self._expression_cached_attrs_:
+            self.__dict__.pop(name, None)
+        _VirtualTable.sql_cache.clear()
+        _VirtualTable.deps_cache.clear()
 
-    def add_to_query(self, qs: m.QuerySet[_T_Model], alias=None, select=True):
-        qs.query.add_annotation(self.final_expression, alias or self.name, select)
+    def add_to_query(
+        self, qs: m.QuerySet[_T_Model], alias=None, select=True, subquery=False
+    ):
+        if self.materialize:
+            expr = F(self.name)
+        elif subquery:
+            expr = self.get_subquery()
+        else:
+            expr = self.final_expression
+        qs.query.add_annotation(expr, alias or self.name, select)
         return qs
 
+    def get_subquery(self) -> Subquery:
+        """The value of this field as a subquery correlated on the outer pk.
+
+        Aggregates computed this way are not multiplied by the joins of the other
+        fields selected with them.
+        """
+        qs = _db_instance_qs(self.model).filter(pk=OuterRef("pk"))
+        qs.query._inline_virtual_ = True
+        qs.query.add_annotation(self.final_expression, self.name)
+        return Subquery(qs.values(self.name)[:1], output_field=self.output_field)
+
+    def get_shadow_expression(self) -> Subquery:
+        """The correlated subquery that recomputes this field's shadow column."""
+        sub = self.get_subquery()
+        if self.is_counter:
+            return Coalesce(sub, Value(0), output_field=self.output_field)
+        return sub
+
     def get_queryset_for_object(self, obj: _T_Model):
         return self.add_to_query(_db_instance_qs(obj))
 
+    def fetch_db_value(self, obj: _T_Model, using=None):
+        if using is None:
+            using = obj._state.db or router.db_for_read(self.model, instance=obj)
+        connection = connections[using]
+        key = using, _timezone_key(self.depends_on_timezone)
+        if (lookup := self._pk_lookups.get(key)) is None:
+            # Connected first, as a new connection drops the lookups of its alias.
+            connection.ensure_connection()
+            qs = self.get_pk_values_queryset(using).values_list(self.name)
+            lookup = self._pk_lookups[key] = _PkLookup(qs)
+            _PkLookup.fields.add(self)
+
+        if rows := lookup.execute(obj.pk, connection):
+            return rows[0][0]
+        raise self.model.DoesNotExist(
+            f"{self.model._meta.object_name} matching query does not exist."
+        )
+
+    def get_pk_values_queryset(self, using=None) -> m.QuerySet:
+        """`(pk, value)` rows, grouped by pk so that a missing row yields none."""
+        qs = self.add_to_query(_db_instance_qs(self.model, using).values_list("pk"))
+        if qs.query.annotations[self.name].contains_aggregate:
+            qs.query.set_group_by()
+        return qs
+
+    def iter_db_values(self, pks: abc.Iterable, using=None, chunk_size: int = None):
+        qs = self.get_pk_values_queryset(using)
+        for chunk in _iter_pk_chunks(pks, qs.db, chunk_size):
+            yield from qs.filter(pk__in=chunk)
+
     def get_fget(self):
         fget = self.fget
         return fget
@@ -526,12 +1319,19 @@ class VirtualField(m.Field, Generic[_T_Field]):
         to_path = qs.query.names_to_path.__get__(qs.query)
 
         for expr in raw.flatten():
-            if not isinstance(expr, F):
-                yield None
+            if isinstance(expr, F):
+                names = [expr.name]
+            elif isinstance(expr, m.Q):
+                names = [c[0] for c in expr.children if isinstance(c, tuple)]
             else:
-                path = to_path(expr.name.split(LOOKUP_SEP), opts)
+                yield None
+                continue
+
+            for name in names:
+                path = to_path(name.split(LOOKUP_SEP), opts)
                 info = FieldPath(*path, src=src)
-                if deep is True is hasattr(f := info.field, "_iter_source_field_paths"):
+                f = info.field
+                if deep is True and not info.info and isinstance(f, VirtualField):
                     yield from f._iter_source_field_paths(recursive=recursive, src=self)
                 else:
                     yield info
@@ -0,0 +1,159 @@
+import json
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def _init_worker():
+    if not apps.ready:
+        django.setup()
+
+
+def _backfill_chunk(label: str, names: list[str], using: str, lo, hi) -> int:
+    model = apps.get_model(label)
+    qs = model._base_manager.using(using)
+    if lo is not None:
+        qs = qs.filter(pk__gt=lo)
+    if hi is not None:
+        qs = qs.filter(pk__lte=hi)
+    fields = [model._meta.get_field(name) for name in names]
+    updates = {f.name: f.get_shadow_expression() for f in fields}
+    if not any(f.is_counter for f in fields):
+        return qs.update(**updates)
+    # Counters are only written where they drifted.
+    return sum(qs.exclude(**{n: e}).update(**{n: e}) for n, e in updates.items())
+
+
+def _iter_chunks(model, using: str, start, size: int):
+    pks = model._base_manager.using(using).order_by("pk").values_list("pk", flat=True)
+    lo = start
+    while True:
+        qs = pks if lo is None else pks.filter(pk__gt=lo)
+        hi = next(iter(qs[size - 1 : size]), None)
+        yield lo, hi
+        if hi is None:
+            return
+        lo = hi
+
+
+def _map_chunks(executor: ProcessPoolExecutor | None, chunks, *args, backlog: int):
+    pending = deque()
+    for lo, hi in chunks:
+        if executor is None:
+            yield hi, _backfill_chunk(*args, lo, hi)
+            continue
+        pending.append((hi, executor.submit(_backfill_chunk, *args, lo, hi)))
+        if len(pending) > backlog:
+            hi, future = pending.popleft()
+            yield hi, future.result()
+    for hi, future in pending:
+        yield hi, future.result()
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the shadow columns of virtual fields with `UPDATE` statements "
+        "over keyset-paginated chunks of rows."
+    )
+    materialize = "shadow"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "targets",
+            nargs="*",
+            metavar="app_label[.ModelName[.field_name]]",
+            help="Limit the backfill to these apps, models or fields.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help='The database to backfill. Defaults to the "default" database.',
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="The number of rows updated per statement.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Run the updates in a pool of this many processes.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Record the progress in this JSON file and resume from it.",
+        )
+
+    def handle(self, *args, targets, database, chunk_size, workers, checkpoint, **kw):
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be a positive integer.")
+        jobs = self.get_jobs(targets)
+        path = checkpoint and Path(checkpoint)
+        state = json.loads(path.read_text()) if path and path.exists() else {}
+
+        executor = None
+        if workers > 0:
+            # Workers open their own connections.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        try:
+            for model, names in jobs.items():
+                label, total = model._meta.label, 0
+                chunks = _iter_chunks(model, database, state.get(label), chunk_size)
+                args = label, names, database
+                for hi, count in _map_chunks(executor, chunks, *args, backlog=workers):
+                    total += count
+                    if hi is None:
+                        state.pop(label, None)
+                    else:
+                        state[label] = hi
+                    if path:
+                        path.write_text(json.dumps(state, cls=DjangoJSONEncoder))
+                self.stdout.write(f"{label}: {total} rows ({', '.join(names)}).")
+        finally:
+            executor and executor.shutdown(cancel_futures=True)
+
+        if path and not state:
+            path.unlink(missing_ok=True)
+
+    def get_jobs(self, targets: list[str]) -> dict[type, list[str]]:
+        jobs = {}
+        for target in targets or [c.label for c in apps.get_app_configs()]:
+            app_label, _, rest = target.partition(".")
+            model_name, _, field_name = rest.partition(".")
+            try:
+                if model_name:
+                    models = [apps.get_model(app_label, model_name)]
+                else:
+                    models = apps.get_app_config(app_label).get_models()
+            except LookupError as e:
+                raise CommandError(str(e)) from e
+
+            for model in models:
+                fields = {
+                    name: field
+                    for name, field in model._meta.virtual_fields.items()
+                    if field.materialize == self.materialize and field.model is model
+                }
+                if field_name and field_name not in fields:
+                    raise CommandError(
+                        f"{model._meta.label}.{field_name} is not a "
+                        f"{self.materialize} virtual field."
+                    )
+                names = jobs.setdefault(model, [])
+                for name in [field_name] if field_name else fields:
+                    name in names or names.append(name)
+        return {model: names for model, names in jobs.items() if names}
@@ -0,0 +1,62 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, NotSupportedError
+
+from ...db_views import create_view, get_view_name
+
+
+def _get_models(targets: list[str]) -> list[type]:
+    models = {}
+    for target in targets:
+        app_label, _, model_name = target.partition(".")
+        try:
+            if model_name:
+                found = [apps.get_model(app_label, model_name)]
+            else:
+                found = apps.get_app_config(app_label).get_models()
+        except LookupError as e:
+            raise CommandError(str(e)) from e
+        for model in found:
+            if model._meta.virtual_fields or model_name:
+                models[model] = None
+    return [*models]
+
+
+class Command(BaseCommand):
+    help = (
+        "Create a database view with the concrete columns and the virtual fields "
+        "of each model."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "targets",
+            nargs="+",
+            metavar="app_label[.ModelName]",
+            help="The apps or models to create views for.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help='The database to use. Defaults to the "default" database.',
+        )
+        parser.add_argument(
+            "--materialized",
+            action="store_true",
+            help="Create materialized views. Only supported on PostgreSQL.",
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Drop the existing views first.",
+        )
+
+    def handle(self, *args, targets, database, materialized, replace, **kwargs):
+        for model in _get_models(targets):
+            try:
+                create_view(
+                    model, database, materialized=materialized, replace=replace
+                )
+            except NotSupportedError as e:
+                raise CommandError(str(e)) from e
+            self.stdout.write(f"{model._meta.label}: {get_view_name(model)}")
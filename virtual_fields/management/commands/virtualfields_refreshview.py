@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from ...db_views import get_view_name, refresh_view
+
+from .virtualfields_createview import _get_models
+
+
+class Command(BaseCommand):
+    help = "Refresh the materialized views created by virtualfields_createview."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "targets",
+            nargs="+",
+            metavar="app_label[.ModelName]",
+            help="The apps or models to refresh the views of.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help='The database to use. Defaults to the "default" database.',
+        )
+        parser.add_argument(
+            "--concurrently",
+            action="store_true",
+            help="Refresh without locking out reads of the views.",
+        )
+
+    def handle(self, *args, targets, database, concurrently, **kwargs):
+        for model in _get_models(targets):
+            refresh_view(model, database, concurrently=concurrently)
+            self.stdout.write(f"{model._meta.label}: {get_view_name(model)}")
@@ -0,0 +1,9 @@
+from .virtualfields_backfill import Command as BackfillCommand
+
+
+class Command(BackfillCommand):
+    help = (
+        "Recompute the counter columns of virtual fields that drifted from their "
+        "aggregate, over keyset-paginated chunks of rows."
+    )
+    materialize = "counter"
@@ -1,13 +1,40 @@
 from abc import ABC, abstractmethod
 from collections import abc
-from functools import wraps
+from functools import reduce, wraps
+from operator import or_
 from typing import TYPE_CHECKING, ClassVar, Final, TypeVar
 
+from django.apps import apps as global_apps
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import connections
 from django.db import models as m
+from django.db import router
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import ExpressionWrapper, OrderBy, Value
+from django.db.models.lookups import Exact
 from django.db.models.options import Options
 from typing_extensions import Self
 
-from ._util import _db_instance_qs
+from ._cache import _LOADED, _invalidate_shared
+from ._compat import _pending_reload, _pending_returning
+from ._eval import _Fallback
+from ._util import (
+    _PACKED,
+    _SLOTS,
+    _SNAPSHOT,
+    _affected_by,
+    _can_return_virtual,
+    _db_instance_qs,
+    _forget_changed,
+    _get_changed,
+    _iter_nodes,
+    _update_returning,
+    _update_shadow_columns,
+    _drop_virtual,
+    _LazyValue,
+    _VirtualReload,
+    _VirtualSlots,
+)
 
 if TYPE_CHECKING:
     from .fields import VirtualField
@@ -55,6 +82,26 @@ class VirtualizedOptions(Options, ABC):
     def concrete_virtual_fields(self) -> abc.Mapping[str, "VirtualField"]:
         ...
 
+    @property
+    @abstractmethod
+    def shadow_virtual_fields(self) -> abc.Mapping[str, "VirtualField"]:
+        ...
+
+    @property
+    @abstractmethod
+    def virtual_field_dependents(self) -> abc.Mapping[str, tuple[str, ...]]:
+        ...
+
+    @property
+    @abstractmethod
+    def virtual_field_slots(self) -> type[_VirtualSlots]:
+        ...
+
+    @property
+    @abstractmethod
+    def virtual_field_layout(self) -> tuple[int, tuple["VirtualField", ...]]:
+        ...
+
     @property
     @abstractmethod
     def virtual_fields_to_delete_on_add(self) -> abc.Mapping[str, "VirtualField"]:
@@ -94,8 +141,15 @@ class ImplementsVirtualFields(ABC, m.Model if TYPE_CHECKING else object):
     def setup(self, cls: type[_T_Model]):
         if not "_implements_virtual_fields_" in cls.__dict__:
             cls._implements_virtual_fields_ = True
+            self._setup_from_db(cls)
             self._setup_refresh_from_db(cls)
             self._setup_save_base(cls)
+            self._setup_do_update(cls)
+            self._setup_indexes(cls)
+            self._setup_constraints(cls)
+            self._setup_validate_constraints(cls)
+            self._setup_reduce(cls)
+            self._setup_setstate(cls)
 
         self.register(cls)
         return cls
@@ -110,6 +164,98 @@ class ImplementsVirtualFields(ABC, m.Model if TYPE_CHECKING else object):
         setattr(obj, check or "_supports_virtual_fields_", value)
         return obj
 
+    @classmethod
+    def _setup_indexes(self, cls: type[_T_Model]):
+        from .fields import VirtualRef
+
+        opts = cls._meta
+        virtual = {
+            f.name: f for f in opts.private_fields if getattr(f, "is_virtual", False)
+        }
+        indexes = [*opts.indexes]
+        if opts.apps is global_apps:
+            for field in virtual.values():
+                if field.db_index and not (field.materialize or field.unique):
+                    name = _auto_index_name(cls, [field.name])
+                    indexes.append(m.Index(fields=[field.name], name=name))
+
+        for i, index in enumerate(indexes):
+            if index.opclasses or not any(
+                name in virtual for name, _ in index.fields_orders
+            ):
+                continue
+            *_, kwargs = index.deconstruct()
+            del kwargs["fields"]
+            expressions = []
+            for name, order in index.fields_orders:
+                expr = (VirtualRef if name in virtual else m.F)(name)
+                expressions.append(expr.desc() if order else expr)
+            indexes[i] = index.__class__(*expressions, **kwargs)
+        opts.indexes = indexes
+
+    @classmethod
+    def _setup_constraints(self, cls: type[_T_Model]):
+        opts = cls._meta
+        if opts.apps is not global_apps:
+            return
+
+        constraints = [*opts.constraints]
+        for field in opts.private_fields:
+            if not getattr(field, "is_virtual", False):
+                continue
+            if field.unique and not field.materialize:
+                name = _auto_index_name(cls, [field.name], "uq")
+                expressions = field.get_unique_expressions()
+                constraints.append(m.UniqueConstraint(*expressions, name=name))
+            for lookup in field._unique_for_parts_:
+                if date_field := getattr(field, f"unique_for_{lookup}"):
+                    name = _auto_index_name(cls, [field.name, date_field], "uq")
+                    expressions = field.get_unique_expressions(lookup)
+                    constraints.append(m.UniqueConstraint(*expressions, name=name))
+        opts.constraints = constraints
+
+    @classmethod
+    def _setup_validate_constraints(self, cls: type[_T_Model]):
+        if self._has_support_in_mro(cls, "validate_constraints"):
+            return
+
+        _orig = _mro_get(cls, "validate_constraints")
+
+        @wraps(_orig)
+        def impl(self: _T_Model, exclude=None):
+            constraints, virtual = [], []
+            for model, items in self.get_constraints():
+                constraints.append((model, []))
+                for c in items:
+                    (virtual if _is_virtual_unique(c) else constraints[-1][1]).append(c)
+            if not virtual:
+                return _orig(self, exclude)
+
+            using = router.db_for_write(self.__class__, instance=self)
+            errors = _validate_constraints(self, constraints, exclude, using)
+            for key, error in _validate_virtual_unique(self, virtual, exclude, using):
+                errors.setdefault(key, []).append(error)
+            if errors:
+                raise ValidationError(errors)
+
+        cls.validate_constraints = self._set_support_marker(impl)
+
+    @classmethod
+    def _setup_from_db(self, cls: type[_T_Model]):
+        if self._has_support_in_mro(cls, "from_db"):
+            return
+
+        _orig = _mro_get(cls, "from_db").__func__
+
+        @wraps(_orig)
+        def impl(cls: type[_T_Model], db, field_names, values):
+            obj = _orig(cls, db, field_names, values)
+            # Compared with the columns on save, instead of tracking assignments.
+            obj.__dict__[_SNAPSHOT] = field_names, values
+            return obj
+
+        cls.from_db = self._set_support_marker(classmethod(impl))
+
     @classmethod
     def _setup_refresh_from_db(self, cls: type[_T_Model]):
         if self._has_support_in_mro(cls, "refresh_from_db"):
@@ -120,31 +266,44 @@ class ImplementsVirtualFields(ABC, m.Model if TYPE_CHECKING else object):
         @wraps(_orig)
         def impl(self: _T_Model, using=None, fields: list[str] = None):
             nonlocal _orig
-            opts, attrs = self._meta, self.__dict__
-            concrete = opts.concrete_virtual_fields
-            deferred = opts.deferred_virtual_fields
+            opts = self._meta
             if fields is None:
                 reloads = list(opts.virtual_fields_to_reload_on_refresh)
-                for field in opts.virtual_fields_to_delete_on_refresh:
-                    field in attrs and delattr(self, field)
-            elif concrete or deferred:
-                fields, reloads, virtual = list(fields), [], []
-                for field in fields:
-                    if field in deferred:
-                        reloads.append(field)
-                        fields.remove(field)
-                    elif field in concrete:
-                        virtual.append(field)
-
-                if reloads and virtual == fields:
-                    fields, reloads = [], reloads + virtual
-
-            _orig(self, using, fields)
-
-            if reloads:
-                qs = _db_instance_qs(self, using)
-                for name, val in zip(reloads, qs.values_list(*reloads).get()):
-                    setattr(self, name, val)
+                _drop_virtual(self, opts.virtual_fields_to_delete_on_refresh)
+                _invalidate_shared(
+                    (self,),
+                    [
+                        *opts.virtual_fields_to_delete_on_refresh.values(),
+                        *opts.virtual_fields_to_reload_on_refresh.values(),
+                    ],
+                )
+            else:
+                deferred, fields = opts.deferred_virtual_fields, list(fields)
+                reloads = [f for f in fields if f in deferred]
+                fields = [f for f in fields if f not in deferred]
+                if reloads and all(f in opts.virtual_fields for f in fields):
+                    fields, reloads = [], reloads + fields
+
+            if not reloads:
+                _orig(self, using, fields)
+                return _forget_changed(self, _get_attnames(self, fields))
+
+            values = None
+            if fields != []:
+                reload = _VirtualReload(self.__class__, reloads)
+                token = _pending_reload.set(reload)
+                try:
+                    _orig(self, using, fields)
+                finally:
+                    _pending_reload.reset(token)
+                values = reload.values
+
+            if values is None:
+                values = _db_instance_qs(self, using).values_list(*reloads).get()
+
+            for name, val in zip(reloads, values):
+                setattr(self, name, val)
+            _forget_changed(self, _get_attnames(self, fields))
 
         cls.refresh_from_db = self._set_support_marker(impl)
 
@@ -165,25 +324,280 @@ class ImplementsVirtualFields(ABC, m.Model if TYPE_CHECKING else object):
             update_fields=None,
         ):
             nonlocal _orig
-            adding = self._state.adding
-            _orig(self, raw, force_insert, force_update, using, update_fields)
-            if not raw:
-                opts, attrs = self._meta, self.__dict__
-
-                if adding:
-                    deletes = opts.virtual_fields_to_delete_on_add
-                    reloads = opts.virtual_fields_to_reload_on_add
-                else:
-                    deletes = opts.virtual_fields_to_delete_on_save
-                    reloads = opts.virtual_fields_to_reload_on_save
+            opts, adding, returning = self._meta, self._state.adding, None
+            if adding:
+                deletes = opts.virtual_fields_to_delete_on_add
+                reloads = opts.virtual_fields_to_reload_on_add
+                shadows = opts.shadow_virtual_fields
+            else:
+                changed = _get_changed(self, update_fields)
+                deletes = _affected_by(opts.virtual_fields_to_delete_on_save, changed)
+                reloads = _affected_by(opts.virtual_fields_to_reload_on_save, changed)
+                shadows = _affected_by(opts.shadow_virtual_fields, changed)
+
+            if reloads and not raw:
+                using = using or router.db_for_write(self.__class__, instance=self)
+                if _can_return_virtual(connections[using], update=not adding):
+                    model = opts.concrete_model
+                    names = [
+                        n
+                        for n, f in reloads.items()
+                        if f.is_returnable
+                        and not f.is_shadow
+                        and f.model._meta.concrete_model is model
+                    ]
+                    returning = _VirtualReload(model, names) if names else None
+
+            token = _pending_returning.set(returning)
+            try:
+                _orig(self, raw, force_insert, force_update, using, update_fields)
+            finally:
+                _pending_returning.reset(token)
+
+            if not raw and shadows:
+                _update_shadow_columns(shadows.values(), self._state.db, pk=self.pk)
 
-                for field in deletes:
-                    field in attrs and delattr(self, field)
+            if not raw:
+                _forget_changed(self, None if adding else changed)
+                _invalidate_shared((self,), [*deletes.values(), *reloads.values()])
+                if returning and returning.values is not None:
+                    reloads = [n for n in reloads if n not in returning.fields]
 
+                _drop_virtual(self, deletes)
                 reloads and self.refresh_from_db(self._state.db, list(reloads))
 
         cls.save_base = self._set_support_marker(impl)
 
+    @classmethod
+    def _setup_do_update(self, cls: type[_T_Model]):
+        if self._has_support_in_mro(cls, "_do_update"):
+            return
+
+        _orig = _mro_get(cls, "_do_update")
+
+        @wraps(_orig)
+        def impl(
+            self: _T_Model, base_qs, using, pk_val, values, update_fields, forced_update
+        ):
+            nonlocal _orig
+            values = [v for v in values if not getattr(v[0], "is_virtual", False)]
+            args = base_qs, using, pk_val, values, update_fields, forced_update
+            returning = _pending_returning.get()
+            if returning is None or returning.values is not None:
+                return _orig(self, *args)
+            elif base_qs.model is not returning.model or not values:
+                return _orig(self, *args)
+            elif self._meta.select_on_save and not forced_update:
+                return _orig(self, *args)
+
+            virtual = self._meta.virtual_fields
+            fields = [virtual[name] for name in returning.fields]
+            rows = _update_returning(base_qs.filter(pk=pk_val), values, fields)
+            returning.assign((self,), rows)
+            return bool(rows)
+
+        cls._do_update = self._set_support_marker(impl)
+
+    @classmethod
+    def _setup_reduce(self, cls: type[_T_Model]):
+        if self._has_support_in_mro(cls, "__reduce__"):
+            return
+
+        _orig = _mro_get(cls, "__reduce__")
+
+        @wraps(_orig)
+        def impl(self: _T_Model):
+            func, args, state = _orig(self)
+            return func, args, _pack_virtual(self, state)
+
+        cls.__reduce__ = self._set_support_marker(impl)
+
+    @classmethod
+    def _setup_setstate(self, cls: type[_T_Model]):
+        if self._has_support_in_mro(cls, "__setstate__"):
+            return
+
+        _orig = _mro_get(cls, "__setstate__")
+
+        @wraps(_orig)
+        def impl(self: _T_Model, state: dict):
+            packed = state.pop(_PACKED, None)
+            _orig(self, state)
+            packed and _unpack_virtual(self, packed)
+
+        cls.__setstate__ = self._set_support_marker(impl)
+
+
+def _get_attnames(obj: _T_Model, fields: list[str] | None) -> list[str] | None:
+    if fields is not None:
+        opts = obj._meta
+        return [opts.get_field(name).attname for name in fields]
+
+
+def _pack_virtual(obj: _T_Model, state: dict) -> dict:
+    """Replace the cached virtual values in the pickled `state` by a single tuple.
+
+    Values that the fields compute again in Python from the pickled columns are
+    left out.
+    """
+    key, fields = obj._meta.virtual_field_layout
+    slots, mask, values = state.pop(_SLOTS, ()), 0, []
+    state.pop(_LOADED, None)
+    # Without it, a save of the unpickled instance treats every column as changed.
+    state.pop(_SNAPSHOT, None)
+    for i, field in enumerate(fields):
+        if (name := field.attname) in slots:
+            val = slots[name]
+        elif name in state:
+            val = state.pop(name)
+        else:
+            continue
+        if type(val) is _LazyValue:
+            val = val.resolve()
+        if not _recomputes(obj, field, val):
+            mask |= 1 << i
+            values.append(val)
+    if mask:
+        state[_PACKED] = key, mask, tuple(values)
+    return state
+
+
+def _unpack_virtual(obj: _T_Model, packed: tuple):
+    key, fields = obj._meta.virtual_field_layout
+    if packed[0] != key:
+        # The fields changed since pickling, the values are loaded again.
+        return
+    _, mask, values = packed
+    values = iter(values)
+    for i, field in enumerate(fields):
+        if mask >> i & 1:
+            getattr(obj.__class__, field.attname).set_cached(obj, next(values))
+
+
+def _recomputes(obj: _T_Model, field: "VirtualField", val) -> bool:
+    if (evaluate := field.python_evaluator) is None:
+        return False
+    try:
+        computed = evaluate(obj)
+    except _Fallback:
+        return False
+    return type(computed) is type(val) and computed == val
+
+
+def _auto_index_name(cls: type[_T_Model], fields: list[str], suffix="idx"):
+    index = m.Index(fields=fields)
+    index.suffix = suffix
+    index.set_name_with_model(cls)
+    return index.name
+
+
+def _is_virtual_unique(constraint) -> bool:
+    from .fields import VirtualRef
+
+    return isinstance(constraint, m.UniqueConstraint) and any(
+        isinstance(e, VirtualRef)
+        for expr in constraint.expressions
+        for e in _iter_nodes(expr)
+    )
+
+
+def _validate_constraints(obj: _T_Model, constraints: list, exclude, using) -> dict:
+    """The errors of `Model.validate_constraints()` for the given `constraints`."""
+    errors = {}
+    for model, items in constraints:
+        for constraint in items:
+            try:
+                constraint.validate(model, obj, exclude=exclude, using=using)
+            except ValidationError as e:
+                if getattr(e, "code", None) == "unique" and len(constraint.fields) == 1:
+                    errors.setdefault(constraint.fields[0], []).append(e)
+                else:
+                    errors = e.update_error_dict(errors)
+    return errors
+
+
+def _validate_virtual_unique(
+    obj: _T_Model, constraints: list[m.UniqueConstraint], exclude, using
+):
+    """Check the unique constraints naming virtual fields in a single query.
+
+    `UniqueConstraint.validate()` cannot match a `VirtualRef` against the
+    instance, so each virtual field is inlined with the instance's values.
+    Expressions that cannot be inlined are left to the database.
+    """
+    from .fields import VirtualField, VirtualRef
+
+    opts, exclude, inlined = obj._meta, set(exclude or ()), {}
+
+    def inline(expr):
+        replacements, refs = {}, set()
+        for node in _iter_nodes(expr):
+            if isinstance(node, m.Q):
+                return None, refs
+            elif not isinstance(node, (m.F, VirtualRef)) or node in replacements:
+                continue
+            elif LOOKUP_SEP in node.name:
+                return None, refs
+            elif not isinstance(field := opts.get_field(node.name), VirtualField):
+                replacements[node] = Value(getattr(obj, field.attname), field)
+                refs.add(field.name)
+                continue
+            elif (hit := inlined.get(field.name)) is None:
+                inlined[field.name] = hit = inline(field.final_expression)
+            if hit[0] is None:
+                return None, refs
+            replacements[node] = hit[0]
+            refs |= hit[1]
+        return expr.replace_expressions(replacements), refs
+
+    checks = []
+    for constraint in constraints:
+        lhs = [
+            e.expression if isinstance(e, OrderBy) else e
+            for e in constraint.expressions
+        ]
+        rhs = [inline(e) for e in lhs]
+        if any(v is None for v, _ in rhs):
+            continue
+        elif exclude & set().union(*(refs for _, refs in rhs)):
+            continue
+        q = m.Q(*(Exact(e, v) for e, (v, _) in zip(lhs, rhs)))
+        if (condition := constraint.condition) is not None:
+            against = obj._get_field_value_map(meta=opts, exclude=exclude)
+            if not condition.check(against, using=using):
+                continue
+            q &= condition
+        checks.append((constraint, q))
+
+    if not checks:
+        return []
+
+    qs = obj.__class__._default_manager.using(using)
+    if not obj._state.adding and (pk := obj._get_pk_val(opts)) is not None:
+        qs = qs.exclude(pk=pk)
+    flags = {
+        f"_virtual_unique_{i}": ExpressionWrapper(q, m.BooleanField())
+        for i, (_, q) in enumerate(checks)
+    }
+    qs = qs.filter(reduce(or_, (q for _, q in checks))).annotate(**flags)
+    violated = {i for row in qs.values_list(*flags) for i, hit in enumerate(row) if hit}
+    return [_unique_error(obj, checks[i][0], exclude) for i in sorted(violated)]
+
+
+def _unique_error(obj: _T_Model, constraint: m.UniqueConstraint, exclude: set):
+    for field in obj._meta.virtual_fields.values():
+        for lookup in (None, *field._unique_for_parts_):
+            unique_for = lookup and getattr(field, f"unique_for_{lookup}")
+            if not (unique_for or lookup is None and field.unique):
+                continue
+            elif tuple(field.get_unique_expressions(lookup)) != constraint.expressions:
+                continue
+            key = NON_FIELD_ERRORS if field.name in exclude else field.name
+            if lookup is None:
+                return key, obj.unique_error_message(obj.__class__, (field.name,))
+            return key, obj.date_error_message(lookup, field.name, unique_for)
+    return NON_FIELD_ERRORS, ValidationError(constraint.get_violation_error_message())
+
 
 class VirtualizedModel(m.Model):
     _meta: ClassVar["VirtualizedOptions[Self]"]